@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 助手的服务端缓存代理 (OpenAI 兼容的 /v1/chat/completions)
+
+toolbox.js 的 callDeepSeekAPI 原本由每个浏览器直接请求 api.deepseek.com，同一步骤的相同问题
+每次都重新计费、重新等待。代理在中间做三件事：
+  - 响应缓存：键为 规范化的问题 + 系统提示 + 对话上下文 + 步骤上下文 (step_context) + 模型参数，
+    带 TTL 和 LRU 淘汰
+  - 请求合并：相同问题并发到达时只向上游发一次请求，其余请求跟随同一个上游流
+  - 流式透传：stream=true 时以 SSE 逐段转发上游输出 (缓存命中时也以流的形式返回)
+上游可插拔：deepseek (真实 API，密钥取自环境变量 DEEPSEEK_API_KEY) 或 fake (本地假模型，
+按固定延迟和速度生成确定的回答，用于测试和基准)。
+
+前端通过 globalThis.TB_AI_ENDPOINT 指向代理，例如 http://127.0.0.1:8787/v1/chat/completions；
+请求体可额外带 step_context (如 "law_of_large_numbers.html#3") 区分不同推导步骤。
+
+用法:
+    python ai_proxy.py --upstream deepseek --port 8787
+    python ai_proxy.py --upstream fake --port 8787 --ttl 3600 --max-entries 5000
+    python ai_proxy.py --bench                                  # 用假模型对比直连与代理
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+DEEPSEEK_URL = 'https://api.deepseek.com/v1/chat/completions'
+ROUTE = '/v1/chat/completions'
+STATS_ROUTE = '/stats'
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 2000
+# 与 toolbox.js 一致：只保留最近 10 条消息作为上下文
+CONTEXT_MESSAGES = 10
+# 参与缓存键的模型参数
+KEY_PARAMS = ('model', 'temperature', 'max_tokens')
+
+_CJK_SPACE = re.compile(r'(?<=[\u3000-\u9fff])\s+|\s+(?=[\u3000-\u9fff])')
+
+
+def normalize_text(text):
+    """全角转半角、合并空白 (去掉中文两侧的空白)
+
+    大小写和标点保持原样：F(x) 与 f(x)、"5!" 与 "5" 在概率题里是不同的问题。
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    return _CJK_SPACE.sub('', ' '.join(text.split()))
+
+
+def cache_key(payload):
+    """请求体 -> 缓存键；最后一条 user 消息视为问题，之前的消息视为上下文"""
+    messages = payload.get('messages') or []
+    normalized = [(m.get('role', ''), normalize_text(m.get('content', ''))) for m in messages]
+    system = [content for role, content in normalized if role == 'system']
+    dialog = [(role, content) for role, content in normalized if role != 'system']
+    question = dialog[-1][1] if dialog else ''
+    key = {
+        'system': system,
+        'context': dialog[:-1][-CONTEXT_MESSAGES:],
+        'question': question,
+        'step': normalize_text(str(payload.get('step_context', ''))),
+        'params': {name: payload.get(name) for name in KEY_PARAMS},
+    }
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class TTLCache:
+    """带过期时间的 LRU 缓存 (线程安全)"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= self.clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Flight:
+    """一次进行中的上游请求：上游线程追加片段，任意多个客户端同时读取 (先回放已有片段，再等待新片段)"""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def append(self, chunk):
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.chunks) and not self.done:
+                    self._cond.wait()
+                pending = self.chunks[index:]
+                finished, error = self.done, self.error
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if finished and index >= len(self.chunks):
+                if error is not None:
+                    raise UpstreamError(error)
+                return
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class DeepSeekUpstream:
+    """DeepSeek (OpenAI 兼容) 流式接口"""
+    name = 'deepseek'
+
+    def __init__(self, url=DEEPSEEK_URL, api_key=None, timeout=60):
+        self.url = url
+        self.api_key = api_key or os.getenv('DEEPSEEK_API_KEY', '')
+        self.timeout = timeout
+
+    def stream(self, payload):
+        """逐段产生回答文本"""
+        body = {key: value for key, value in payload.items() if key != 'step_context'}
+        body['stream'] = True
+        request = urllib.request.Request(self.url, data=json.dumps(body).encode('utf-8'), method='POST',
+                                         headers={'Content-Type': 'application/json',
+                                                  'Authorization': f'Bearer {self.api_key}'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                for raw in response:
+                    line = raw.decode('utf-8').strip()
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        return
+                    choices = json.loads(data).get('choices') or [{}]
+                    content = (choices[0].get('delta') or {}).get('content')
+                    if content:
+                        yield content
+        except urllib.error.HTTPError as e:
+            raise UpstreamError(f"HTTP {e.code}: {e.read().decode('utf-8', errors='replace')[:200]}")
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise UpstreamError(str(e))
+
+
+class FakeUpstream:
+    """本地假模型：首字延迟 + 固定输出速度，回答由问题内容确定"""
+    name = 'fake'
+
+    def __init__(self, first_token_ms=800, chars_per_second=200, chunk_chars=8, answer_chars=400):
+        self.first_token = first_token_ms / 1000.0
+        self.chars_per_second = chars_per_second
+        self.chunk_chars = chunk_chars
+        self.answer_chars = answer_chars
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def answer(self, payload):
+        question = (payload.get('messages') or [{}])[-1].get('content', '')
+        digest = hashlib.sha256(f"{payload.get('step_context', '')}|{question}".encode('utf-8')).hexdigest()
+        text = f"关于“{question}”：这是假模型 {digest[:8]} 的回答。\\(\\mathbb{{E}}[X]=\\mu\\)。"
+        return (text * (self.answer_chars // len(text) + 1))[:self.answer_chars]
+
+    def stream(self, payload):
+        with self._lock:
+            self.calls += 1
+        text = self.answer(payload)
+        time.sleep(self.first_token)
+        for start in range(0, len(text), self.chunk_chars):
+            yield text[start:start + self.chunk_chars]
+            time.sleep(self.chunk_chars / self.chars_per_second)
+
+
+class TutorProxy:
+    """缓存 + 请求合并；stream() 返回 (来源, 文本片段迭代器)，来源为 hit / coalesced / miss"""
+
+    def __init__(self, upstream, cache=None):
+        self.upstream = upstream
+        self.cache = cache if cache is not None else TTLCache()
+        self.stats = {'hit': 0, 'coalesced': 0, 'miss': 0, 'error': 0}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def stream(self, payload):
+        key = cache_key(payload)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count('hit')
+            return 'hit', iter([cached])
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.stats['coalesced'] += 1
+                return 'coalesced', iter(flight)
+            flight = self._flights[key] = Flight()
+            self.stats['miss'] += 1
+        # 上游请求在独立线程中完成，发起请求的客户端断开不影响跟随者和缓存
+        threading.Thread(target=self._fetch, args=(key, payload, flight), daemon=True).start()
+        return 'miss', iter(flight)
+
+    def complete(self, payload):
+        """非流式：返回 (来源, 完整回答)"""
+        source, chunks = self.stream(payload)
+        return source, ''.join(chunks)
+
+    def _fetch(self, key, payload, flight):
+        error = None
+        try:
+            for chunk in self.upstream.stream(payload):
+                flight.append(chunk)
+        except Exception as e:  # 上游的任何异常都转交给等待中的客户端
+            error = str(e)
+            self._count('error')
+        else:
+            self.cache.put(key, ''.join(flight.chunks))
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.finish(error)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+
+def _sse(obj):
+    return f"data: {json.dumps(obj, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+def make_app(proxy, allow_origin='*'):
+    """代理的 WSGI 应用"""
+    cors = [('Access-Control-Allow-Origin', allow_origin),
+            ('Access-Control-Allow-Headers', 'Content-Type, Authorization'),
+            ('Access-Control-Allow-Methods', 'POST, OPTIONS')]
+
+    def respond_json(start_response, status, obj, extra=()):
+        body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        start_response(status, cors + list(extra) + [('Content-Type', 'application/json; charset=utf-8'),
+                                                     ('Content-Length', str(len(body)))])
+        return [body]
+
+    def app(environ, start_response):
+        path = environ.get('PATH_INFO', '/')
+        method = environ.get('REQUEST_METHOD', 'GET')
+        if method == 'OPTIONS':
+            start_response('204 No Content', cors)
+            return [b'']
+        if path == STATS_ROUTE:
+            return respond_json(start_response, '200 OK', dict(proxy.stats, entries=len(proxy.cache)))
+        if path != ROUTE or method != 'POST':
+            return respond_json(start_response, '404 Not Found', {'error': 'not found'})
+
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            payload = json.loads(environ['wsgi.input'].read(length).decode('utf-8'))
+            if not isinstance(payload.get('messages'), list) or not payload['messages']:
+                raise ValueError('messages 不能为空')
+        except (ValueError, UnicodeDecodeError) as e:
+            return respond_json(start_response, '400 Bad Request', {'error': str(e)})
+
+        model = payload.get('model', '')
+        if not payload.get('stream'):
+            try:
+                source, content = proxy.complete(payload)
+            except UpstreamError as e:
+                return respond_json(start_response, '502 Bad Gateway', {'error': str(e)})
+            return respond_json(start_response, '200 OK', {
+                'object': 'chat.completion', 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                             'finish_reason': 'stop'}],
+            }, [('X-Cache', source.upper())])
+
+        source, chunks = proxy.stream(payload)
+        start_response('200 OK', cors + [('Content-Type', 'text/event-stream; charset=utf-8'),
+                                         ('Cache-Control', 'no-cache'), ('X-Cache', source.upper())])
+
+        def events():
+            try:
+                for chunk in chunks:
+                    yield _sse({'object': 'chat.completion.chunk', 'model': model,
+                                'choices': [{'index': 0, 'delta': {'content': chunk}}]})
+            except UpstreamError as e:
+                yield _sse({'error': str(e)})
+            yield b'data: [DONE]\n\n'
+
+        return events()
+
+    return app
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(proxy, host='127.0.0.1', port=8787, allow_origin='*'):
+    httpd = make_server(host, port, make_app(proxy, allow_origin),
+                        server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    print(f"AI 代理: http://{host}:{port}{ROUTE} (上游: {proxy.upstream.name})")
+    httpd.serve_forever()
+
+
+def _percentile(values, q):
+    return values[max(1, math.ceil(q / 100 * len(values))) - 1] if values else 0.0
+
+
+def run_benchmark(requests_count=300, distinct=40, threads=32, first_token_ms=300, seed=0):
+    """假模型上对比直连与代理：问题按 Zipf 分布从 distinct 个中抽取"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    questions = rng.choices(range(distinct), weights, k=requests_count)
+    payloads = [{'model': 'deepseek-chat', 'step_context': f'law_of_large_numbers.html#{q % 5}',
+                 'messages': [{'role': 'user', 'content': f'第 {q} 个问题：为什么样本均值的方差是 σ²/n？'}]}
+                for q in questions]
+
+    print(f"{requests_count} 个请求 ({distinct} 个不同问题，Zipf 分布)，{threads} 个并发")
+    print(f"  {'mode':<7} {'上游调用':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in ('direct', 'proxy'):
+        upstream = FakeUpstream(first_token_ms=first_token_ms, chars_per_second=2000)
+        proxy = TutorProxy(upstream)
+
+        def one(payload):
+            t0 = time.perf_counter()
+            if mode == 'direct':
+                ''.join(upstream.stream(payload))
+            else:
+                proxy.complete(payload)
+            return (time.perf_counter() - t0) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = sorted(pool.map(one, payloads))
+        elapsed = time.perf_counter() - start
+        print(f"  {mode:<7} {upstream.calls:>8} {requests_count / elapsed:>8.1f} "
+              f"{_percentile(latencies, 50):>8.0f} {_percentile(latencies, 95):>8.0f}")
+        if mode == 'proxy':
+            print(f"          {proxy.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caching proxy for the AI tutor chat API")
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--upstream', choices=['deepseek', 'fake'], default='deepseek', help="上游模型")
+    parser.add_argument('--upstream-url', type=str, default=DEEPSEEK_URL, help="deepseek 上游地址")
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="缓存有效期 (秒)")
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES, help="缓存条目上限，0 表示不缓存")
+    parser.add_argument('--allow-origin', type=str, default='*', help="CORS Access-Control-Allow-Origin")
+    parser.add_argument('--bench', action='store_true', help="用假模型对比直连与代理")
+    args = parser.parse_args()
+
+    if args.bench:
+        run_benchmark()
+        return
+
+    if args.upstream == 'deepseek':
+        upstream = DeepSeekUpstream(url=args.upstream_url)
+        if not upstream.api_key:
+            print("⚠️ 未设置 DEEPSEEK_API_KEY，上游请求将被拒绝")
+    else:
+        upstream = FakeUpstream()
+    serve(TutorProxy(upstream, TTLCache(args.max_entries, args.ttl)), args.host, args.port, args.allow_origin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计每个卡片中的derivation-step / property-step，自动生成理解度图表配置
+
+对每个页面做一次 html_transform 扫描 (只收集、不修改)：
+  - theory-card 内按出现顺序收集 derivation-step 和 property-step
+  - 标签取步骤中第一个 <strong> 的文字 (去掉末尾冒号)；若为"步骤 N:"则取其后的说明文字；
+    步骤元素上的 data-step-label 属性优先
+  - 卡片内 understanding-chart-* 画布对应的 initUnderstandingChart* 函数 (由 js_functions 索引确定)
+
+分析结果按文件内容的 sha1 缓存在 .cache/chart_steps.json，页面未变化时不再解析。
+生成的配置写入 chart_configs.json，并用 chart-config 规则同步到页面。
+
+用法:
+    python analyze_chart_steps.py                  # 分析 templates/*.html，更新配置和页面
+    python analyze_chart_steps.py --dry-run        # 只打印统计结果
+"""
+
+import argparse
+import glob
+import hashlib
+import html
+import json
+import os
+import re
+import time
+
+from html_transform import Rule, transform, transform_file
+from js_functions import JSIndex
+from update_chart_configs import CONFIG_PATH, ChartConfigRule, load_chart_configs
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(ROOT, '.cache', 'chart_steps.json')
+CACHE_VERSION = 1
+
+STEP_CLASSES = ('derivation-step', 'property-step')
+
+_STRONG_RE = re.compile(r'<strong[^>]*>(.*?)</strong>([^<]*)', re.S)
+_TAG_RE = re.compile(r'<[^>]+>')
+_NUMBERED_STEP_RE = re.compile(r'^步骤\s*\d+$')
+
+
+def _clean(fragment):
+    return ' '.join(html.unescape(_TAG_RE.sub('', fragment)).split())
+
+
+def step_label(inner_html):
+    """步骤标题：第一个 <strong> 的文字，"步骤 N" 时改用其后的说明"""
+    m = _STRONG_RE.search(inner_html)
+    if not m:
+        return _clean(inner_html)[:20]
+    title = _clean(m.group(1)).rstrip(':：').strip()
+    if _NUMBERED_STEP_RE.match(title):
+        following = _clean(m.group(2))
+        return following or title
+    return title
+
+
+class _CardCollector(Rule):
+    """收集卡片、步骤和图表画布 (不产生任何插入)"""
+    name = 'chart-steps'
+
+    def __init__(self):
+        self.cards = []
+
+    def start(self, el, ctx):
+        if el.has_class('theory-card'):
+            card = {'card': el.attrs.get('data-card', str(len(self.cards) + 1)), 'steps': [], 'canvas': None}
+            el.state['card'] = card
+            self.cards.append(card)
+            return None
+        owner = ctx.closest(lambda e: 'card' in e.state)
+        if owner is None:
+            return None
+        card = owner.state['card']
+        if el.tag == 'canvas' and el.attrs.get('id', '').startswith('understanding-chart') and card['canvas'] is None:
+            card['canvas'] = el.attrs['id']
+        return None
+
+    def end(self, el, ctx):
+        kind = next((cls for cls in STEP_CLASSES if el.has_class(cls)), None)
+        if kind is None:
+            return None
+        owner = ctx.closest(lambda e: 'card' in e.state)
+        if owner is not None:
+            label = el.attrs.get('data-step-label') or step_label(ctx.text[el.inner_start:el.inner_end])
+            owner.state['card']['steps'].append({'kind': kind, 'label': label})
+        return None
+
+
+def analyze_text(text):
+    """返回 [{card, canvas, function, steps: [{kind, label}]}]"""
+    collector = _CardCollector()
+    transform(text, [collector])
+
+    index = JSIndex(text)
+    for card in collector.cards:
+        card['function'] = None
+        if not card['canvas']:
+            continue
+        needle = re.compile(r'getElementById\(\s*["\']%s["\']\s*\)' % re.escape(card['canvas']))
+        for fn in index.functions.values():
+            if fn.name.startswith('initUnderstandingChart') and needle.search(text, fn.body_start, fn.end):
+                card['function'] = fn.name
+                break
+    return collector.cards
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cache['version'] = CACHE_VERSION
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+
+def analyze_file(path, cache):
+    """带缓存的分析，返回 (cards, 是否命中缓存)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    key = os.path.relpath(os.path.abspath(path), ROOT)
+    entry = cache.setdefault('files', {}).get(key)
+    if entry and entry['sha1'] == digest:
+        return entry['cards'], True
+    cards = analyze_text(raw.decode('utf-8'))
+    cache['files'][key] = {'sha1': digest, 'cards': cards}
+    return cards, False
+
+
+def build_page_config(cards):
+    """由卡片分析结果生成某个页面的图表配置"""
+    return {card['function']: {'labels': [step['label'] for step in card['steps']]}
+            for card in cards if card['function'] and card['steps']}
+
+
+def write_configs(configs, path=CONFIG_PATH):
+    """写回 chart_configs.json (标签数组保持单行，便于审阅)"""
+    text = json.dumps(configs, ensure_ascii=False, indent=2)
+    text = re.sub(r'\[\s*\n\s*((?:"(?:[^"\\]|\\.)*",?\s*)+)\]',
+                  lambda m: '[' + ', '.join(re.findall(r'"(?:[^"\\]|\\.)*"', m.group(1))) + ']', text)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive understanding chart configs from card steps")
+    parser.add_argument('patterns', nargs='*', default=['templates/*.html'])
+    parser.add_argument('--dry-run', action='store_true', help="只打印统计结果，不写配置和页面")
+    parser.add_argument('--no-cache', action='store_true', help="忽略解析缓存")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    cache = {} if args.no_cache else load_cache()
+    files = sorted({f for pattern in args.patterns for f in glob.glob(pattern)})
+    configs = dict(load_chart_configs())
+    hits = 0
+    pages = {}
+    for path in files:
+        try:
+            cards, hit = analyze_file(path, cache)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"⚠️  {path}: {e}")
+            continue
+        hits += hit
+        page_config = build_page_config(cards)
+        if not page_config:
+            continue
+        pages[path] = page_config
+        print(f"📄 {path}")
+        for card in cards:
+            counts = {kind: sum(1 for s in card['steps'] if s['kind'] == kind) for kind in STEP_CLASSES}
+            print(f"  卡片 {card['card']}: {card['function'] or '(无图表)'}  "
+                  f"推导 {counts['derivation-step']} + 性质 {counts['property-step']} = {len(card['steps'])}")
+        configs[os.path.basename(path)] = page_config
+
+    if not args.no_cache:
+        save_cache(cache)
+
+    if not args.dry_run and pages:
+        if configs != load_chart_configs():
+            write_configs(configs)
+            print(f"✅ 已更新 {os.path.relpath(CONFIG_PATH)}")
+        rule = ChartConfigRule(configs)
+        for path, page_config in pages.items():
+            changes, _ = transform_file(path, [rule])
+            if changes:
+                print(f"✅ 已同步图表配置: {path}")
+
+    print(f"\n{len(files)} 个文件，缓存命中 {hits} 个，用时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态资源引用图：找出无人引用的资源和重复文件
+
+从入口页面 (默认 templates/index.html 和 templates/*.php) 出发，沿引用关系遍历部署目录
+(templates/、static/，与 build_site.py 一致)：
+  - HTML：src / href / poster / data-src / action 属性、内联样式和 <style> 中的 url()、
+    内联脚本中的 JS 引用
+  - JS / TS：fetch('...')、import ... from '...' / import('...')，以及字符串字面量中
+    形如资源路径的值 (如 '../static/js/tests/x.test.js'，覆盖动态创建 <script> 的情况)；
+    后面紧跟 + 的路径字符串按前缀处理，前缀下的文件都视为被引用
+  - CSS：url() / @import
+JS 中的相对路径在浏览器里相对于页面解析，这里依次尝试脚本所在目录、templates/ 和站点根目录。
+
+重复检测：
+  - 完全相同：按 sha1 分组 (空文件单独列出)
+  - 近似重复：文本文件按连续 SHINGLE_LINES 行 (去掉首尾空白和空行) 分块哈希，
+    二进制文件按 CHUNK_BYTES 定长分块，同扩展名文件之间按块集合的 Jaccard 相似度比较
+每一项都给出部署体积影响。--prune 从构建输出中删除不可达的文件，
+连同其指纹副本 (manifest.json) 和 .gz / .br 预压缩副本。
+
+用法:
+    python asset_graph.py                          # 打印报告
+    python asset_graph.py --report asset_graph.json
+    python asset_graph.py --prune dist --dry-run   # 列出将从 dist/ 删除的文件
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import posixpath
+import re
+import time
+from collections import Counter, defaultdict
+
+from build_site import COPY_DIRS, TEMPLATE_DIR
+from fingerprint_assets import MANIFEST_NAME, css_refs, resolve_ref
+from js_functions import iter_inline_scripts
+from precompress import SUFFIXES, TEXT_EXTENSIONS
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEPLOY_DIRS = (TEMPLATE_DIR, *COPY_DIRS)
+ENTRY_PATTERNS = ('templates/index.html', 'templates/*.php')
+
+PARSED_EXTENSIONS = ('.html', '.htm', '.php', '.js', '.mjs', '.ts', '.css')
+SHINGLE_LINES = 4
+CHUNK_BYTES = 4096
+NEAR_THRESHOLD = 0.8
+# 出现在过多文件中的块 (版权头、通用样板) 不参与配对
+COMMON_CHUNK_LIMIT = 20
+
+_ATTR_REF_RE = re.compile(r'''\s(?:src|href|poster|data-src|action)\s*=\s*(["'])([^"']+)\1''', re.I)
+_FETCH_RE = re.compile(r'''\bfetch\(\s*(["'`])([^"'`$]+)\1''')
+_IMPORT_RE = re.compile(r'''\bimport\s*(?:[\w$*{}\s,]+?\s*from\s*|\(\s*)(["'])([^"']+)\1''')
+_ASSET_STRING_RE = re.compile(
+    r'''(["'`])([^"'`\s<>()]+?\.(?:m?js|ts|css|json|html?|php|md|svg|png|jpe?g|gif|webp|ico|mp4|webm|woff2?|ttf|bin))'''
+    r'''(?:[?#][^"'`\s]*)?\1''', re.I)
+# "../static/img/covers/" + slug + ".png" 这类拼接出的路径：按前缀匹配
+_PREFIX_STRING_RE = re.compile(r'''(["'`])([^"'`\s<>()+]*/[^"'`\s<>()+]*)\1\s*\+''')
+_IMPORT_SUFFIXES = ('', '.js', '.ts', '/index.js', '/index.ts')
+
+
+def scan_deploy_files(src_root=ROOT, dirs=DEPLOY_DIRS):
+    """部署目录下的全部文件，返回 {相对路径: 字节数}"""
+    files = {}
+    for directory in dirs:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(src_root, directory)):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                files[os.path.relpath(path, src_root).replace(os.sep, '/')] = os.path.getsize(path)
+    return files
+
+
+def js_refs(js):
+    """JS 源码中的引用，返回 [(类型, 原始字符串)]"""
+    refs = [('fetch', m.group(2)) for m in _FETCH_RE.finditer(js)]
+    refs += [('import', m.group(2)) for m in _IMPORT_RE.finditer(js)]
+    refs += [('string', m.group(2)) for m in _ASSET_STRING_RE.finditer(js)]
+    refs += [('prefix', m.group(2)) for m in _PREFIX_STRING_RE.finditer(js)]
+    return refs
+
+
+def html_refs(html):
+    refs = [('attr', m.group(2)) for m in _ATTR_REF_RE.finditer(html)]
+    refs += [('css', ref) for ref in css_refs(html)]
+    for start, end in iter_inline_scripts(html):
+        refs += js_refs(html[start:end])
+    return refs
+
+
+def file_refs(rel, text):
+    ext = posixpath.splitext(rel)[1].lower()
+    if ext == '.css':
+        return [('css', ref) for ref in css_refs(text)]
+    if ext in ('.js', '.mjs', '.ts'):
+        return js_refs(text)
+    return html_refs(text)
+
+
+def resolve_candidates(kind, ref, rel, files):
+    """把引用解析为存在的部署文件列表 (前缀引用可能对应多个文件)"""
+    bases = [rel]
+    if kind in ('fetch', 'string', 'prefix') and not rel.startswith(TEMPLATE_DIR + '/'):
+        # 外部脚本中的相对路径按引用它的页面解析
+        bases += [f'{TEMPLATE_DIR}/index.html', 'index.html']
+    suffixes = _IMPORT_SUFFIXES if kind == 'import' else ('',)
+    for base in bases:
+        target = resolve_ref(ref, base)
+        if target is None:
+            return []
+        if kind == 'prefix':
+            # normpath 会去掉末尾的 /，这里补回，避免 covers/ 匹配到 covers-old/
+            prefix = target + '/' if ref.endswith('/') else target
+            matched = [path for path in files if path.startswith(prefix)]
+            if matched:
+                return matched
+            continue
+        for suffix in suffixes:
+            if target + suffix in files:
+                return [target + suffix]
+    return []
+
+
+def build_graph(files, src_root=ROOT):
+    """返回 {文件: {被引用文件: 引用类型}}"""
+    graph = {}
+    for rel in files:
+        if not rel.lower().endswith(PARSED_EXTENSIONS):
+            continue
+        with open(os.path.join(src_root, rel), 'rb') as f:
+            text = f.read().decode('utf-8', errors='replace')
+        edges = {}
+        for kind, ref in file_refs(rel, text):
+            for target in resolve_candidates(kind, ref, rel, files):
+                if target != rel:
+                    edges.setdefault(target, kind)
+        graph[rel] = edges
+    return graph
+
+
+def reachable_from(graph, entries):
+    seen = set(entries)
+    stack = list(entries)
+    while stack:
+        for target in graph.get(stack.pop(), ()):
+            if target not in seen:
+                seen.add(target)
+                stack.append(target)
+    return seen
+
+
+def _sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def exact_duplicates(files, src_root=ROOT):
+    """返回 (重复组列表, 空文件列表)；只对大小相同的文件计算哈希"""
+    by_size = defaultdict(list)
+    for rel, size in files.items():
+        by_size[size].append(rel)
+    empty = sorted(by_size.pop(0, []))
+    groups = []
+    for size, rels in by_size.items():
+        if len(rels) < 2:
+            continue
+        by_hash = defaultdict(list)
+        for rel in rels:
+            by_hash[_sha1_file(os.path.join(src_root, rel))].append(rel)
+        groups += [sorted(group) for group in by_hash.values() if len(group) > 1]
+    return sorted(groups, key=lambda g: -files[g[0]] * (len(g) - 1)), empty
+
+
+def content_chunks(path):
+    """文本按行分块、二进制按定长分块，返回块哈希集合"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.lower().endswith(TEXT_EXTENSIONS + PARSED_EXTENSIONS):
+        lines = [line.strip() for line in data.splitlines()]
+        lines = [line for line in lines if line]
+        pieces = (b'\n'.join(lines[i:i + SHINGLE_LINES])
+                  for i in range(max(1, len(lines) - SHINGLE_LINES + 1)))
+    else:
+        pieces = (data[i:i + CHUNK_BYTES] for i in range(0, len(data), CHUNK_BYTES))
+    return {hashlib.blake2b(piece, digest_size=8).digest() for piece in pieces}
+
+
+def near_duplicates(files, exclude=(), threshold=NEAR_THRESHOLD, src_root=ROOT):
+    """同扩展名文件之间块集合相似度不低于 threshold 的文件对，返回 [(相似度, a, b)]"""
+    candidates = [rel for rel, size in files.items() if size and rel not in exclude]
+    chunks = {rel: content_chunks(os.path.join(src_root, rel)) for rel in candidates}
+    index = defaultdict(list)
+    for rel in candidates:
+        ext = posixpath.splitext(rel)[1].lower()
+        for chunk in chunks[rel]:
+            index[(ext, chunk)].append(rel)
+
+    shared = Counter()
+    for rels in index.values():
+        if 1 < len(rels) <= COMMON_CHUNK_LIMIT:
+            for i, a in enumerate(rels):
+                for b in rels[i + 1:]:
+                    shared[(a, b) if a < b else (b, a)] += 1
+
+    pairs = []
+    for (a, b), common in shared.items():
+        similarity = common / (len(chunks[a]) + len(chunks[b]) - common)
+        if similarity >= threshold:
+            pairs.append((similarity, a, b))
+    return sorted(pairs, key=lambda p: (-p[0], p[1]))
+
+
+def analyze(src_root=ROOT, entries=None, threshold=NEAR_THRESHOLD):
+    """返回报告字典 (路径均为相对仓库根目录的 posix 路径)"""
+    files = scan_deploy_files(src_root)
+    if entries is None:
+        entries = sorted({os.path.relpath(p, src_root).replace(os.sep, '/')
+                          for pattern in ENTRY_PATTERNS for p in glob.glob(os.path.join(src_root, pattern))})
+    graph = build_graph(files, src_root)
+    reachable = reachable_from(graph, [e for e in entries if e in files])
+    unreachable = sorted((rel for rel in files if rel not in reachable), key=lambda r: (-files[r], r))
+
+    groups, empty = exact_duplicates(files, src_root)
+    duplicates_of = {rel for group in groups for rel in group[1:]}
+    near = near_duplicates(files, duplicates_of, threshold, src_root)
+
+    referenced_by = defaultdict(list)
+    for rel, edges in graph.items():
+        for target, kind in edges.items():
+            referenced_by[target].append((rel, kind))
+
+    return {
+        'entries': entries,
+        'threshold': threshold,
+        'files': len(files),
+        'total_bytes': sum(files.values()),
+        'reachable': len(reachable & files.keys()),
+        'unreachable': [{'path': rel, 'bytes': files[rel]} for rel in unreachable],
+        'unreachable_bytes': sum(files[rel] for rel in unreachable),
+        'duplicates': [{'paths': group, 'bytes': files[group[0]],
+                        'wasted_bytes': files[group[0]] * (len(group) - 1),
+                        'reachable': [rel for rel in group if rel in reachable]} for group in groups],
+        'empty': empty,
+        'near_duplicates': [{'similarity': round(sim, 3), 'paths': [a, b],
+                             'bytes': [files[a], files[b]],
+                             'reachable': [rel for rel in (a, b) if rel in reachable]} for sim, a, b in near],
+        'referenced_by': {rel: referenced_by[rel] for rel in sorted(referenced_by)},
+    }
+
+
+def print_report(report, top=25):
+    print(f"📊 {report['files']} 个部署文件 ({report['total_bytes']:,} 字节)，"
+          f"从 {len(report['entries'])} 个入口可达 {report['reachable']} 个")
+
+    unreachable = report['unreachable']
+    print(f"\n🗑️  不可达: {len(unreachable)} 个文件，{report['unreachable_bytes']:,} 字节")
+    for item in unreachable[:top]:
+        print(f"  {item['bytes']:>12,}  {item['path']}")
+    if len(unreachable) > top:
+        print(f"  ... 另有 {len(unreachable) - top} 个")
+
+    duplicates = report['duplicates']
+    wasted = sum(d['wasted_bytes'] for d in duplicates)
+    print(f"\n🧬 完全相同: {len(duplicates)} 组，可节省 {wasted:,} 字节")
+    for dup in duplicates[:top]:
+        print(f"  {dup['bytes']:>12,} × {len(dup['paths'])}  (可达: {len(dup['reachable'])})")
+        for rel in dup['paths']:
+            print(f"      {'✅' if rel in dup['reachable'] else '  '} {rel}")
+    if report['empty']:
+        print(f"\n📭 空文件: {len(report['empty'])} 个")
+        for rel in report['empty']:
+            print(f"      {rel}")
+
+    near = report['near_duplicates']
+    print(f"\n🔍 近似重复 (相似度 ≥ {report['threshold']:.0%}): {len(near)} 对")
+    for item in near[:top]:
+        a, b = item['paths']
+        print(f"  {item['similarity']:>6.1%}  {a} ({item['bytes'][0]:,})  ~  {b} ({item['bytes'][1]:,})")
+
+
+def prune_output(out_dir, unreachable, dry_run=False):
+    """从构建输出中删除不可达文件及其指纹副本、预压缩副本，返回 (删除的文件数, 字节数)"""
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+
+    removed = 0
+    freed = 0
+    for rel in unreachable:
+        variants = [rel]
+        if manifest and rel in manifest:
+            variants.append(manifest[rel])
+        for variant in variants:
+            for path in [variant] + [variant + suffix for suffix in SUFFIXES.values()]:
+                full = os.path.join(out_dir, path)
+                if not os.path.isfile(full):
+                    continue
+                freed += os.path.getsize(full)
+                removed += 1
+                print(f"  {'将删除' if dry_run else '已删除'} {path}")
+                if not dry_run:
+                    os.remove(full)
+
+    if manifest and not dry_run:
+        pruned = {k: v for k, v in manifest.items() if k not in set(unreachable)}
+        if pruned != manifest:
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(pruned, f, ensure_ascii=False, indent=2)
+    return removed, freed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find unreachable and duplicate static assets")
+    parser.add_argument('--entry', action='append', help="入口文件 (可多次指定，默认 index.html 和 *.php)")
+    parser.add_argument('--threshold', type=float, default=NEAR_THRESHOLD, help="近似重复的相似度阈值")
+    parser.add_argument('--report', type=str, help="把完整报告写入 JSON 文件")
+    parser.add_argument('--prune', type=str, metavar='OUT_DIR', help="从构建输出目录中删除不可达文件")
+    parser.add_argument('--dry-run', action='store_true', help="与 --prune 一起使用，只列出不删除")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = analyze(entries=args.entry, threshold=args.threshold)
+    print_report(report)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 报告已写入 {args.report}")
+
+    if args.prune:
+        print(f"\n✂️  清理 {args.prune}/")
+        removed, freed = prune_output(args.prune, [item['path'] for item in report['unreachable']],
+                                      dry_run=args.dry_run)
+        print(f"  {removed} 个文件，{freed:,} 字节")
+
+    print(f"\n用时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态站点构建：构建时内联导航栏 / 页脚 partial
+
+浏览器端的 include-navbar.js / include-footer.js 每次访问都要 fetch 两个 partial，
+多两次阻塞请求且内容到达后页面会跳动。构建步骤把 partial 直接写进每个页面：
+  - 导航栏：替换页面中第一个 <nav>，没有时插在 <body> 开头 (与 include-navbar.js 相同)
+  - 当前页高亮：按 NAV_CONFIG.active (缺省为文件名) 给首页链接 / 章节链接加 active-glow，
+    即 applyActiveLink 在浏览器中做的事
+  - 页脚：替换 footer.bg-dark-card，否则填入 #site-footer，否则追加到 </body> 前
+只处理引用了对应脚本的页面。内联的元素带 data-prerendered 属性，脚本检测到后跳过 fetch，只做事件绑定。
+
+输出目录 (默认 dist/) 与仓库布局一致：templates/ 下的页面渲染后写入，其余文件和 static/、docs/ 原样复制。
+构建清单记录每个页面输入 (页面 + 两个 partial) 的哈希，未变化的页面跳过；页面在进程池中并行渲染。
+--fingerprint 时先由 fingerprint_assets 生成资源指纹，页面中的引用改写为指纹路径。
+--precompress 时最后由 precompress 为输出目录中的文本资源写出 .gz / .br 副本。
+
+用法:
+    python build_site.py                 # 增量构建到 dist/
+    python build_site.py --force --jobs 8
+    python build_site.py --fingerprint   # 同时生成资源指纹与 dist/manifest.json
+    python build_site.py --fingerprint --precompress
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fingerprint_assets import fingerprint_assets, rewrite_html
+from html_transform import Rule, transform, write_atomic
+from precompress import precompress_tree, print_ratio_report
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools'))
+try:
+    import montecarlo_store  # 需要 NumPy
+except ImportError:  # 可选依赖
+    montecarlo_store = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = 'templates'
+PARTIAL_DIR = os.path.join(TEMPLATE_DIR, 'partials')
+# docs/ 由页面在运行时读取 (index.html 的 fetch("../docs/目录.md"))
+COPY_DIRS = ['static', 'docs']
+MANIFEST_NAME = '.build-manifest.json'
+
+# 渲染逻辑变化时修改，使所有页面重新构建
+BUILD_VERSION = 1
+
+ACTIVE_CLASS = 'active-glow'
+
+_NAV_ACTIVE_RE = re.compile(r'NAV_CONFIG\s*=\s*\{[^<]*?\bactive\s*:\s*["\']([\w-]+)["\']', re.S)
+_CLASS_ATTR_RE = re.compile(r'(\sclass\s*=\s*")([^"]*)(")')
+
+
+class _LayoutCollector(Rule):
+    """记录页面中导航栏、页脚和 <body> 的位置 (不产生插入)"""
+    name = 'layout'
+
+    def __init__(self):
+        self.ranges = {}
+
+    def start(self, el, ctx):
+        if el.tag == 'body':
+            self.ranges.setdefault('body', (el.inner_start, el.inner_start))
+        elif el.attrs.get('id') == 'site-footer':
+            el.state['layout'] = 'site-footer'
+        elif el.tag == 'nav' and 'nav' not in ctx.counters:
+            ctx.counters['nav'] = 1
+            el.state['layout'] = 'nav'
+        elif el.tag == 'footer' and el.has_class('bg-dark-card') and 'footer' not in ctx.counters:
+            ctx.counters['footer'] = 1
+            el.state['layout'] = 'footer'
+        return None
+
+    def end(self, el, ctx):
+        kind = el.state.get('layout')
+        if kind == 'site-footer':
+            # 只替换容器内部，保留容器本身的 class
+            self.ranges.setdefault(kind, (el.inner_start, el.inner_end))
+        elif kind:
+            self.ranges.setdefault(kind, (el.start, ctx.text.find('>', el.inner_end) + 1))
+        elif el.tag == 'body':
+            self.ranges['body_end'] = (el.inner_end, el.inner_end)
+        return None
+
+
+class _ActiveLinkCollector(Rule):
+    """记录导航栏中需要切换高亮的链接 (首页链接、#chapters-list 中带 data-route 的链接)"""
+    name = 'active-link'
+
+    def __init__(self):
+        self.links = []
+
+    def start(self, el, ctx):
+        if el.tag != 'a':
+            return None
+        if el.attrs.get('id') == 'nav-home-link':
+            self.links.append((el.start, el.inner_start, 'index'))
+        elif 'data-route' in el.attrs and ctx.closest(lambda e: e.attrs.get('id') == 'chapters-list'):
+            self.links.append((el.start, el.inner_start, el.attrs['data-route']))
+        return None
+
+
+def set_class(start_tag, name, enabled):
+    """在开始标签的 class 属性中加入或移除一个类名"""
+    m = _CLASS_ATTR_RE.search(start_tag)
+    if m is None:
+        if not enabled:
+            return start_tag
+        return re.sub(r'(/?>)$', f' class="{name}"\\1', start_tag, count=1)
+    classes = [c for c in m.group(2).split() if c != name]
+    if enabled:
+        classes.append(name)
+    return start_tag[:m.start(2)] + ' '.join(classes) + start_tag[m.end(2):]
+
+
+def mark_prerendered(fragment, tag):
+    """给片段中第一个 <tag> 开始标签加上 data-prerendered 属性"""
+    return re.sub(r'<%s\b' % tag, f'<{tag} data-prerendered="1"', fragment, count=1)
+
+
+def render_navbar(navbar_html, slug):
+    """applyActiveLink 的构建期版本"""
+    collector = _ActiveLinkCollector()
+    transform(navbar_html, [collector])
+    parts = []
+    pos = 0
+    for start, end, route in collector.links:
+        parts.append(navbar_html[pos:start])
+        parts.append(set_class(navbar_html[start:end], ACTIVE_CLASS, route == slug))
+        pos = end
+    parts.append(navbar_html[pos:])
+    return mark_prerendered(''.join(parts), 'nav')
+
+
+def page_slug(path, text):
+    """NAV_CONFIG.active 优先，否则取文件名 (与 slugFromPath 一致)"""
+    m = _NAV_ACTIVE_RE.search(text)
+    if m:
+        return m.group(1)
+    return os.path.splitext(os.path.basename(path))[0] or 'index'
+
+
+def render_page(text, path, navbar_html, footer_html):
+    """返回内联了导航栏和页脚的页面"""
+    collector = _LayoutCollector()
+    transform(text, [collector])
+    ranges = collector.ranges
+    edits = []
+
+    # 只处理引用了相应脚本的页面，其余页面保持浏览器中看到的样子
+    if 'include-navbar.js' in text:
+        navbar = render_navbar(navbar_html, page_slug(path, text))
+        if 'nav' in ranges:
+            edits.append((*ranges['nav'], navbar))
+        elif 'body' in ranges:
+            edits.append((*ranges['body'], '\n' + navbar + '\n'))
+
+    if 'include-footer.js' in text:
+        footer = mark_prerendered(footer_html, 'footer')
+        if 'footer' in ranges:
+            edits.append((*ranges['footer'], footer))
+        elif 'site-footer' in ranges:
+            edits.append((*ranges['site-footer'], footer))
+        elif 'body_end' in ranges:
+            edits.append((*ranges['body_end'], footer + '\n'))
+
+    for start, end, replacement in sorted(edits, key=lambda e: e[0], reverse=True):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def _sha1(*chunks):
+    h = hashlib.sha1(str(BUILD_VERSION).encode())
+    for chunk in chunks:
+        h.update(hashlib.sha1(chunk).digest())
+    return h.hexdigest()
+
+
+def _build_page(args):
+    src, dst, navbar_html, footer_html, assets = args
+    start = time.perf_counter()
+    with open(src, 'rb') as f:
+        raw = f.read()
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        # 非 UTF-8 的历史页面原样复制
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copy2(src, dst)
+        return src, time.perf_counter() - start, False
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    html = render_page(text, src, navbar_html, footer_html)
+    if assets:
+        html = rewrite_html(html, f"{TEMPLATE_DIR}/{os.path.basename(src)}", assets)
+    write_atomic(dst, html)
+    return src, time.perf_counter() - start, True
+
+
+def sync_tree(src_dir, dst_dir, skip=None):
+    """按大小和修改时间增量复制目录，返回复制的文件数"""
+    copied = 0
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        for filename in filenames:
+            src = os.path.join(dirpath, filename)
+            if skip and skip(src):
+                continue
+            dst = os.path.join(dst_dir, os.path.relpath(src, src_dir))
+            st = os.stat(src)
+            try:
+                dt = os.stat(dst)
+                if dt.st_size == st.st_size and dt.st_mtime_ns == st.st_mtime_ns:
+                    continue
+            except FileNotFoundError:
+                pass
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+            copied += 1
+    return copied
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def build(out_dir='dist', jobs=1, force=False, fingerprint=False):
+    """构建站点，返回 (重建的页面列表, 跳过的页面数, 复制的文件数)"""
+    template_dir = os.path.join(ROOT, TEMPLATE_DIR)
+    with open(os.path.join(ROOT, PARTIAL_DIR, 'navbar.html'), 'rb') as f:
+        navbar_raw = f.read()
+    with open(os.path.join(ROOT, PARTIAL_DIR, 'footer.html'), 'rb') as f:
+        footer_raw = f.read()
+    navbar_html, footer_html = navbar_raw.decode('utf-8'), footer_raw.decode('utf-8')
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(out_dir)
+    pages = manifest.setdefault('pages', {})
+
+    # 模板目录中的其他文件 (partial、PHP 等) 与静态资源原样复制
+    copied = sync_tree(template_dir, os.path.join(out_dir, TEMPLATE_DIR),
+                       skip=lambda p: os.path.dirname(p) == template_dir and p.endswith('.html'))
+    for directory in COPY_DIRS:
+        copied += sync_tree(os.path.join(ROOT, directory), os.path.join(out_dir, directory))
+
+    # 已接入页面的蒙特卡洛分块在构建时生成，不提交到仓库；缺少 NumPy 时页面回退到现场模拟
+    if montecarlo_store is not None and montecarlo_store.WIRED:
+        summary = montecarlo_store.export_store(
+            os.path.join(out_dir, 'static', 'data', 'montecarlo'), set(montecarlo_store.WIRED))
+        copied += sum(written for _, _, written, _ in summary.values())
+
+    # 资源指纹先于页面生成；清单本身也是页面的输入，任何资源变化都会让引用它的页面重建
+    assets = {}
+    if fingerprint:
+        assets, written = fingerprint_assets(out_dir)
+        copied += written
+    assets_raw = json.dumps(assets, sort_keys=True).encode()
+
+    tasks = []
+    hashes = {}
+    skipped = 0
+    for name in sorted(os.listdir(template_dir)):
+        src = os.path.join(template_dir, name)
+        if not name.endswith('.html') or not os.path.isfile(src):
+            continue
+        dst = os.path.join(out_dir, TEMPLATE_DIR, name)
+        with open(src, 'rb') as f:
+            digest = _sha1(f.read(), navbar_raw, footer_raw, assets_raw)
+        hashes[src] = (name, digest)
+        if pages.get(name) == digest and os.path.exists(dst):
+            skipped += 1
+            continue
+        tasks.append((src, dst, navbar_html, footer_html, assets))
+
+    built = []
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_build_page, tasks))
+    else:
+        results = [_build_page(task) for task in tasks]
+    for src, seconds, rendered in results:
+        name, digest = hashes[src]
+        pages[name] = digest
+        built.append((name, seconds, rendered))
+
+    save_manifest(out_dir, manifest)
+    return built, skipped, copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build static pages with navbar/footer inlined")
+    parser.add_argument('--out', type=str, default='dist', help="输出目录")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument('--force', action='store_true', help="忽略构建清单，全部重建")
+    parser.add_argument('--fingerprint', action='store_true', help="为 static 资源生成内容指纹并改写引用")
+    parser.add_argument('--precompress', action='store_true', help="为文本资源写出 .gz / .br 预压缩副本")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    built, skipped, copied = build(args.out, jobs=max(1, args.jobs), force=args.force,
+                                   fingerprint=args.fingerprint)
+    for name, seconds, rendered in built:
+        print(f"  {'✅' if rendered else '📄'} {name:<32} {seconds * 1000:7.1f} ms")
+    print(f"\n重建 {len(built)} 个页面，跳过 {skipped} 个未变化页面，复制 {copied} 个文件，"
+          f"用时 {time.perf_counter() - start:.2f}s → {args.out}/")
+
+    if args.precompress:
+        start = time.perf_counter()
+        print("\n📦 预压缩")
+        print_ratio_report(precompress_tree(args.out, jobs=max(1, args.jobs)), args.out)
+        print(f"  用时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态资源指纹：按内容哈希重命名，支持长期缓存
+
+static/js、static/css、static/img、static/libs 下的每个文件以
+<原名>.<sha1前10位>.<扩展名> 写入输出目录 (原文件也保留，供脚本按固定名称动态加载)，
+并生成 manifest.json (原路径 -> 指纹路径)。
+  - CSS 中的 url() / @import 先改写为指纹路径再计算哈希，被引用的文件变化时 CSS 的指纹随之变化
+  - HTML 中 src / href / poster / data-src 属性和内联样式里的 url() 按页面位置解析后改写，
+    保持原来的相对 / 绝对写法
+指纹文件的内容永不变化，可以配置 Cache-Control: public, max-age=31536000, immutable。
+
+增量：源文件的 (大小, mtime) 未变化时复用上次的哈希，目标文件已存在时不再写入。
+
+用法:
+    python fingerprint_assets.py --out dist      # 通常由 build_site.py --fingerprint 调用
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIRS = ('static/js', 'static/css', 'static/img', 'static/libs')
+HASH_LENGTH = 10
+MANIFEST_NAME = 'manifest.json'
+CACHE_NAME = '.fingerprint-cache.json'
+
+_CSS_URL_RE = re.compile(r'''url\(\s*(['"]?)([^'")]+?)\1\s*\)|@import\s+(['"])([^'"]+)\3''')
+_HTML_ATTR_RE = re.compile(r'''(\s(?:src|href|poster|data-src)\s*=\s*)(["'])([^"']+)\2''', re.I)
+_HTML_URL_RE = re.compile(r'''url\(\s*(&quot;|['"]?)([^'")&]+?)\1\s*\)''')
+
+
+def fingerprint_name(rel, digest):
+    base, ext = posixpath.splitext(rel)
+    return f"{base}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def _split_ref(ref):
+    """拆出 ?query / #fragment，返回 (路径, 后缀)"""
+    m = re.search(r'[?#]', ref)
+    return (ref[:m.start()], ref[m.start():]) if m else (ref, '')
+
+
+def _is_external(ref):
+    return ref.startswith(('data:', 'http:', 'https:', '//', '#', 'mailto:', 'javascript:', 'blob:'))
+
+
+def resolve_ref(ref, base_rel):
+    """把引用解析为仓库内路径 (posix)；外部链接返回 None"""
+    if not ref or _is_external(ref):
+        return None
+    path, _ = _split_ref(ref)
+    if not path:
+        return None
+    if path.startswith('/'):
+        return posixpath.normpath(path.lstrip('/'))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base_rel), path))
+
+
+def relocate_ref(ref, base_rel, manifest):
+    """若引用指向有指纹的资源，返回改写后的引用 (保持相对/绝对写法)，否则返回 None"""
+    target = resolve_ref(ref, base_rel)
+    if target not in manifest:
+        return None
+    _, suffix = _split_ref(ref)
+    new_rel = manifest[target]
+    if ref.startswith('/'):
+        return '/' + new_rel + suffix
+    return posixpath.relpath(new_rel, posixpath.dirname(base_rel) or '.') + suffix
+
+
+def css_refs(css):
+    """CSS 中 url() / @import 引用的原始字符串"""
+    return [m.group(2) or m.group(4) for m in _CSS_URL_RE.finditer(css)]
+
+
+def rewrite_css(css, css_rel, manifest):
+    def replace(m):
+        ref = m.group(2) or m.group(4)
+        new_ref = relocate_ref(ref, css_rel, manifest)
+        if new_ref is None:
+            return m.group(0)
+        return m.group(0).replace(ref, new_ref, 1)
+    return _CSS_URL_RE.sub(replace, css)
+
+
+def rewrite_html(html, page_rel, manifest):
+    """改写页面中的资源引用"""
+    def replace_attr(m):
+        new_ref = relocate_ref(m.group(3), page_rel, manifest)
+        return m.group(0) if new_ref is None else f"{m.group(1)}{m.group(2)}{new_ref}{m.group(2)}"
+
+    def replace_url(m):
+        new_ref = relocate_ref(m.group(2), page_rel, manifest)
+        return m.group(0) if new_ref is None else f"url({m.group(1)}{new_ref}{m.group(1)})"
+
+    html = _HTML_ATTR_RE.sub(replace_attr, html)
+    return _HTML_URL_RE.sub(replace_url, html)
+
+
+def scan_assets(src_root=ROOT, asset_dirs=ASSET_DIRS):
+    assets = []
+    for directory in asset_dirs:
+        for dirpath, _, filenames in os.walk(os.path.join(src_root, directory)):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                assets.append(os.path.relpath(path, src_root).replace(os.sep, '/'))
+    return sorted(assets)
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_if_missing(path, data=None, src=None):
+    if os.path.exists(path):
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if src is not None:
+        shutil.copy2(src, path)
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+    return True
+
+
+def fingerprint_assets(out_dir, src_root=ROOT, asset_dirs=ASSET_DIRS):
+    """
+    为资源生成指纹副本，返回 (manifest, 新写入的文件数)
+    manifest 的键和值都是相对仓库根目录的 posix 路径
+    """
+    cache_path = os.path.join(out_dir, CACHE_NAME)
+    cache = _load_json(cache_path)
+    assets = scan_assets(src_root, asset_dirs)
+    manifest = {}
+    written = 0
+
+    # 先处理非 CSS 文件，CSS 引用的资源需要先有指纹
+    css_files = []
+    for rel in assets:
+        if rel.endswith('.css'):
+            css_files.append(rel)
+            continue
+        src = os.path.join(src_root, rel)
+        st = os.stat(src)
+        entry = cache.get(rel)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            digest = entry['sha1']
+        else:
+            h = hashlib.sha1()
+            with open(src, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            cache[rel] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha1': digest}
+        manifest[rel] = fingerprint_name(rel, digest)
+        written += _write_if_missing(os.path.join(out_dir, manifest[rel]), src=src)
+
+    # CSS 之间可能互相 @import，按依赖顺序处理；CSS 内容很小，每次都重新改写
+    css_set = set(css_files)
+    visiting = set()
+
+    def process_css(rel):
+        nonlocal written
+        if rel in manifest or rel in visiting:
+            return
+        visiting.add(rel)
+        with open(os.path.join(src_root, rel), 'rb') as f:
+            raw = f.read()
+        css = raw.decode('utf-8', errors='surrogateescape')
+        for ref in css_refs(css):
+            target = resolve_ref(ref, rel)
+            if target in css_set:
+                process_css(target)
+        data = rewrite_css(css, rel, manifest).encode('utf-8', errors='surrogateescape')
+        manifest[rel] = fingerprint_name(rel, hashlib.sha1(data).hexdigest())
+        written += _write_if_missing(os.path.join(out_dir, manifest[rel]), data=data)
+        visiting.discard(rel)
+
+    for rel in css_files:
+        process_css(rel)
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({rel: cache[rel] for rel in assets if rel in cache}, f)
+    # 清单未变化时不重写，保持 mtime 不变 (预压缩副本据此判断是否过期)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = dict(sorted(manifest.items()))
+    if _load_json(manifest_path) != manifest:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-hash static assets for long-lived caching")
+    parser.add_argument('--out', type=str, default='dist', help="输出目录")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest, written = fingerprint_assets(args.out)
+    print(f"{len(manifest)} 个资源，新写入 {written} 个指纹文件，用时 {time.perf_counter() - start:.2f}s")
+    print(f"清单: {os.path.join(args.out, MANIFEST_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单遍HTML改写引擎
+
+按标记顺序扫描一次源文本，维护真实的元素栈 (开始标签入栈、结束标签出栈)，
+把原文片段和规则产生的插入内容依次写入缓冲区，最后一次性拼接。
+不做整体重新序列化：未被规则触及的字节原样保留，所以没有改动时输出与输入完全相同。
+
+规则通过 @register_rule 注册，可以实现三个钩子:
+  - start(el, ctx):     元素的开始标签之后，返回要插入的文本或 None
+  - end(el, ctx):       元素的结束标签之前，返回要插入的文本或 None
+  - rewrite(text, ctx): 标记扫描结束后对整段文本的改写 (如内联脚本中的配置)，返回新文本
+钩子可以在 el.state 中记录状态 (例如子元素中是否已存在某个块)，保证规则幂等。
+
+批量模式：每个文件只读一次，所有规则在内存中依次应用，内容变化时才原子写回
+(同目录临时文件 + os.replace)，文件分发到进程池并行处理；--dry-run 只打印 diff。
+
+用法:
+    python html_transform.py                                  # 全部规则作用于 templates/*.html
+    python html_transform.py --rules ai-help "templates/*.html" --dry-run
+    python html_transform.py --rules ai-help,chart-config --jobs 8
+"""
+
+import argparse
+import difflib
+import glob
+import importlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# 没有结束标签的元素
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr',
+])
+
+# 内容按纯文本处理的元素，内部的 "<" 不是标签
+RAW_TEXT_ELEMENTS = frozenset(['script', 'style', 'textarea', 'title'])
+
+_TOKEN_RE = re.compile(r'''
+    (?P<comment><!--.*?-->)
+  | (?P<decl><![^>]*>|<\?.*?\?>)
+  | </(?P<end>[a-zA-Z][\w:.-]*)\s*>
+  | <(?P<start>[a-zA-Z][\w:.-]*)
+      (?P<attrs>(?:\s+[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]+))?)*)
+      \s*(?P<selfclose>/?)>
+''', re.S | re.X)
+
+_ATTR_RE = re.compile(r'''([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?''')
+
+RULES = {}
+
+# 定义规则的模块，批量模式 (包括进程池中的子进程) 导入它们以完成注册
+RULE_MODULES = ['add_ai_help', 'update_chart_configs']
+
+DEFAULT_PATTERNS = ['templates/*.html']
+
+
+def register_rule(name):
+    """注册改写规则 (类)，name 用于命令行或 get_rules 选择"""
+    def decorator(cls):
+        cls.name = name
+        RULES[name] = cls
+        return cls
+    return decorator
+
+
+def load_rule_modules():
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    # 作为脚本运行时，让规则模块 import 到的是同一份注册表
+    sys.modules.setdefault('html_transform', sys.modules[__name__])
+    for module in RULE_MODULES:
+        importlib.import_module(module)
+
+
+def get_rules(names=None):
+    """按名称实例化规则，names 为 None 时返回全部已注册规则"""
+    names = list(RULES) if names is None else names
+    return [RULES[name]() for name in names]
+
+
+class Rule:
+    """规则基类，子类按需覆盖 start / end / rewrite"""
+    name = ''
+
+    def start(self, el, ctx):
+        return None
+
+    def end(self, el, ctx):
+        return None
+
+    def rewrite(self, text, ctx):
+        return text
+
+
+class Element:
+    """元素栈中的一个打开的元素"""
+    __slots__ = ('tag', 'raw_attrs', '_attrs', 'start', 'inner_start', 'inner_end', 'indent', 'state')
+
+    def __init__(self, tag, raw_attrs, start, inner_start, indent):
+        self.tag = tag
+        self.raw_attrs = raw_attrs
+        self._attrs = None
+        self.start = start
+        self.inner_start = inner_start
+        self.inner_end = None  # 结束标签的位置，end 钩子调用前设置
+        self.indent = indent
+        self.state = {}
+
+    @property
+    def attrs(self):
+        if self._attrs is None:
+            self._attrs = {}
+            for m in _ATTR_RE.finditer(self.raw_attrs):
+                value = next((g for g in m.group(2, 3, 4) if g is not None), '')
+                self._attrs.setdefault(m.group(1).lower(), value)
+        return self._attrs
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    def has_class(self, name):
+        # 先做一次子串判断，绝大多数元素无需解析属性
+        return name in self.raw_attrs and name in self.classes
+
+
+class Context:
+    """一次改写过程的共享状态，传给规则钩子"""
+
+    def __init__(self, text, path=None):
+        self.text = text
+        self.path = path
+        self.stack = []
+        self.counters = {}
+        self.changes = {}
+
+    def ancestors(self):
+        """由近到远的祖先元素 (不含当前元素本身)"""
+        return reversed(self.stack[:-1])
+
+    def closest(self, predicate, include_self=False):
+        items = reversed(self.stack) if include_self else self.ancestors()
+        return next((el for el in items if predicate(el)), None)
+
+    def line_indent(self, offset):
+        line_start = self.text.rfind('\n', 0, offset) + 1
+        prefix = self.text[line_start:offset]
+        return prefix if not prefix.strip() else prefix[:len(prefix) - len(prefix.lstrip())]
+
+    def count(self, rule):
+        self.changes[rule.name] = self.changes.get(rule.name, 0) + 1
+
+
+def transform(text, rules, path=None):
+    """
+    对文本应用规则，返回 (新文本, {规则名: 插入次数})
+    没有任何插入时返回的就是原字符串对象
+    """
+    ctx = Context(text, path)
+    out = []
+    copied = 0  # text[:copied] 已写入 out
+    pos = 0
+    length = len(text)
+
+    def emit_until(offset):
+        nonlocal copied
+        if offset > copied:
+            out.append(text[copied:offset])
+            copied = offset
+
+    def close(el, end_offset):
+        # 结束标签独占一行时插在该行行首，保持缩进
+        line_start = text.rfind('\n', 0, end_offset) + 1
+        at_line_start = not text[line_start:end_offset].strip()
+        el.inner_end = end_offset
+        for rule in rules:
+            inserted = rule.end(el, ctx)
+            if inserted:
+                ctx.count(rule)
+                if at_line_start:
+                    emit_until(line_start)
+                    out.append(inserted + '\n')
+                else:
+                    emit_until(end_offset)
+                    out.append('\n' + inserted + '\n' + ctx.line_indent(end_offset))
+
+    while pos < length:
+        m = _TOKEN_RE.search(text, pos)
+        if m is None:
+            break
+        pos = m.end()
+        tag = m.group('start')
+        if tag is not None:
+            tag = tag.lower()
+            el = Element(tag, m.group('attrs'), m.start(), m.end(), ctx.line_indent(m.start()))
+            void = tag in VOID_ELEMENTS or m.group('selfclose')
+            ctx.stack.append(el)
+            for rule in rules:
+                inserted = rule.start(el, ctx)
+                if inserted:
+                    ctx.count(rule)
+                    emit_until(m.end())
+                    out.append(inserted)
+            if void:
+                ctx.stack.pop()
+            elif tag in RAW_TEXT_ELEMENTS:
+                close_re = re.compile(r'</%s\s*>' % tag, re.I)
+                raw_end = close_re.search(text, pos)
+                end_offset = raw_end.start() if raw_end else length
+                close(el, end_offset)
+                ctx.stack.pop()
+                pos = raw_end.end() if raw_end else length
+            continue
+
+        tag = m.group('end')
+        if tag is not None:
+            tag = tag.lower()
+            # 容错：结束标签会先关闭栈中未闭合的内层元素；栈中没有同名元素时忽略
+            if any(el.tag == tag for el in ctx.stack):
+                while ctx.stack:
+                    el = ctx.stack[-1]
+                    close(el, m.start())
+                    ctx.stack.pop()
+                    if el.tag == tag:
+                        break
+
+    if ctx.changes:
+        emit_until(length)
+        result = ''.join(out)
+    else:
+        result = text
+
+    for rule in rules:
+        rewritten = rule.rewrite(result, ctx)
+        if rewritten != result:
+            ctx.count(rule)
+            result = rewritten
+
+    return (result, ctx.changes) if ctx.changes else (text, {})
+
+
+def write_atomic(path, text):
+    """写入同目录临时文件后 os.replace，中途失败不会留下半个文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def transform_file(path, rules, write=True):
+    """
+    改写单个文件，只有内容变化时才写回
+    返回 (changes, new_text)；changes 为空表示文件无需修改
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    new_text, changes = transform(text, rules, path)
+    if changes and write and new_text != text:
+        write_atomic(path, new_text)
+    return changes, new_text
+
+
+def iter_html_files(root, extensions=('.html', '.htm')):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(extensions):
+                yield os.path.join(dirpath, filename)
+
+
+def expand_patterns(patterns):
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.update(iter_html_files(pattern))
+        else:
+            files.update(glob.glob(pattern, recursive=True))
+    return sorted(files)
+
+
+def _batch_worker(args):
+    path, rule_names, dry_run = args
+    load_rule_modules()
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+        new_text, changes = transform(text, get_rules(rule_names), path)
+        diff = None
+        if changes and new_text != text:
+            if dry_run:
+                diff = ''.join(difflib.unified_diff(
+                    text.splitlines(True), new_text.splitlines(True), fromfile=path, tofile=path))
+            else:
+                write_atomic(path, new_text)
+        return path, changes, diff, None
+    except (OSError, UnicodeDecodeError) as e:
+        return path, {}, None, str(e)
+
+
+def run_batch(patterns=DEFAULT_PATTERNS, rule_names=None, jobs=1, dry_run=False):
+    """
+    对匹配的所有文件应用规则，返回 [(path, changes, diff, error)]
+    """
+    load_rule_modules()
+    rule_names = list(RULES) if rule_names is None else rule_names
+    unknown = [name for name in rule_names if name not in RULES]
+    if unknown:
+        raise ValueError(f"未知规则: {', '.join(unknown)} (可用: {', '.join(RULES)})")
+
+    tasks = [(path, rule_names, dry_run) for path in expand_patterns(patterns)]
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_batch_worker, tasks))
+    return [_batch_worker(task) for task in tasks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply HTML transform rules to templates in one pass")
+    parser.add_argument('patterns', nargs='*', default=DEFAULT_PATTERNS, help="文件、目录或glob (默认 templates/*.html)")
+    parser.add_argument('--rules', type=str, default=None, help="逗号分隔的规则名 (默认全部)")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument('--dry-run', action='store_true', help="只打印diff，不写文件")
+    parser.add_argument('--list', action='store_true', help="列出已注册的规则")
+    args = parser.parse_args()
+
+    if args.list:
+        load_rule_modules()
+        for name, cls in RULES.items():
+            print(f"  {name:<16} {(cls.__doc__ or '').strip()}")
+        return
+
+    rule_names = [r.strip() for r in args.rules.split(',') if r.strip()] if args.rules else None
+    start = time.perf_counter()
+    try:
+        results = run_batch(args.patterns, rule_names, jobs=max(1, args.jobs), dry_run=args.dry_run)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    changed = 0
+    for path, changes, diff, error in results:
+        if error:
+            print(f"⚠️  {path}: {error}")
+        elif changes:
+            changed += 1
+            summary = ', '.join(f"{name}×{count}" for name, count in changes.items())
+            print(f"{'📝' if args.dry_run else '✅'} {path}: {summary}")
+            if diff:
+                sys.stdout.write(diff)
+    verb = "需要修改" if args.dry_run else "已修改"
+    print(f"\n{len(results)} 个文件，{verb} {changed} 个，用时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内联脚本中的JS函数定位
+
+对HTML中每个内联 <script> 块做一次词法扫描 (识别字符串、模板字符串及其 ${} 嵌套、
+注释和正则字面量)，在平衡的花括号栈上记录每个 `function 名称(...) {...}` 的范围，
+得到 名称 -> 源码偏移 的索引。之后的修改按偏移直接拼接，不再用跨越整个文件的正则。
+
+用法:
+    python js_functions.py templates/law_of_large_numbers.html      # 列出函数及其行号
+"""
+
+import re
+import sys
+from collections import namedtuple
+
+# start: "function" 关键字位置；body_start: 函数体 "{"；end: 函数体 "}" 之后
+FunctionRange = namedtuple('FunctionRange', ['name', 'start', 'body_start', 'end'])
+
+_SCRIPT_RE = re.compile(r'<script\b([^>]*)>', re.I)
+_SCRIPT_END_RE = re.compile(r'</script\s*>', re.I)
+_JS_TOKEN_RE = re.compile(r'''["'`{}()\[\]/]|\bfunction\b''')
+_FUNCTION_DECL_RE = re.compile(r'function\s*\*?\s*([A-Za-z_$][\w$]*)\s*\(')
+# 这些字符或关键字之后的 "/" 是正则字面量而不是除号
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'delete', 'void', 'throw', 'new')
+
+
+class JSIndex:
+    """一个HTML文件的函数索引"""
+
+    def __init__(self, text):
+        self.text = text
+        self.functions = {}
+        self.duplicates = set()
+        self.scripts = []
+        for start, end in iter_inline_scripts(text):
+            self.scripts.append((start, end))
+            for fn in scan_functions(text, start, end):
+                if fn.name in self.functions:
+                    self.duplicates.add(fn.name)
+                else:
+                    self.functions[fn.name] = fn
+
+    def locate(self, name):
+        """返回函数范围；不存在返回 None，重名时抛出 ValueError"""
+        if name in self.duplicates:
+            raise ValueError(f"函数 {name} 定义了多次，无法确定修改位置")
+        return self.functions.get(name)
+
+
+def iter_inline_scripts(text):
+    """内联 <script> 的内容范围 (跳过 src 外链和非JS类型)"""
+    pos = 0
+    while True:
+        m = _SCRIPT_RE.search(text, pos)
+        if not m:
+            return
+        end = _SCRIPT_END_RE.search(text, m.end())
+        content_end = end.start() if end else len(text)
+        attrs = m.group(1).lower()
+        type_match = re.search(r'type\s*=\s*["\']?([^"\'\s>]+)', attrs)
+        is_js = type_match is None or 'javascript' in type_match.group(1) or type_match.group(1) == 'module'
+        if is_js and not re.search(r'\bsrc\s*=', attrs):
+            yield m.end(), content_end
+        pos = end.end() if end else len(text)
+
+
+def _skip_string(text, i, end, quote):
+    """i 指向开头引号，返回字符串结束后的位置"""
+    i += 1
+    while i < end:
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == quote or c == '\n':
+            return i + 1
+        i += 1
+    return end
+
+
+def _skip_template(text, i, end):
+    """
+    从模板字符串内部位置 i 扫描，返回 (位置, 是否遇到 ${)
+    遇到 ${ 时位置指向 { 之后，由调用方按代码继续扫描
+    """
+    while i < end:
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '`':
+            return i + 1, False
+        if c == '$' and text.startswith('{', i + 1):
+            return i + 2, True
+        i += 1
+    return end, False
+
+
+def _skip_regex(text, i, end):
+    """i 指向开头的 "/"，返回正则字面量 (含标志) 结束后的位置"""
+    i += 1
+    in_class = False
+    while i < end:
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            i += 1
+            while i < end and (text[i].isalnum() or text[i] in '_$'):
+                i += 1
+            return i
+        i += 1
+    return end
+
+
+def _slash_starts_regex(text, start, i):
+    j = i - 1
+    while j >= start and text[j] in ' \t\r\n':
+        j -= 1
+    if j < start or text[j] in _REGEX_PRECEDERS:
+        return True
+    word_end = j + 1
+    while j >= start and (text[j].isalnum() or text[j] in '_$'):
+        j -= 1
+    return text[j + 1:word_end] in _REGEX_KEYWORDS
+
+
+def scan_functions(text, start, end):
+    """扫描 text[start:end] 中的JS代码，按结束顺序返回 FunctionRange 列表"""
+    found = []
+    stack = []        # 每个 "{" 对应一项: None / ('tmpl',) / ('func', name, decl_start)
+    pending = None    # 已看到函数声明、尚未进入函数体: (name, decl_start, paren_depth)
+    parens = 0
+    i = start
+    while i < end:
+        m = _JS_TOKEN_RE.search(text, i, end)
+        if not m:
+            break
+        i = m.start()
+        c = text[i]
+        if c in '"\'':
+            i = _skip_string(text, i, end, c)
+        elif c == '`':
+            i, in_expr = _skip_template(text, i + 1, end)
+            if in_expr:
+                stack.append(('tmpl',))
+        elif c == '/':
+            nxt = text[i + 1:i + 2]
+            if nxt == '/':
+                newline = text.find('\n', i, end)
+                i = end if newline < 0 else newline + 1
+            elif nxt == '*':
+                close = text.find('*/', i + 2, end)
+                i = end if close < 0 else close + 2
+            elif _slash_starts_regex(text, start, i):
+                i = _skip_regex(text, i, end)
+            else:
+                i += 1
+        elif c == '(' or c == '[':
+            parens += 1
+            i += 1
+        elif c == ')' or c == ']':
+            parens -= 1
+            i += 1
+        elif c == '{':
+            if pending is not None and parens == pending[2]:
+                stack.append(('func', pending[0], pending[1]))
+                pending = None
+            else:
+                stack.append(None)
+            i += 1
+        elif c == '}':
+            entry = stack.pop() if stack else None
+            i += 1
+            if entry is None:
+                continue
+            if entry[0] == 'tmpl':
+                i, in_expr = _skip_template(text, i, end)
+                if in_expr:
+                    stack.append(('tmpl',))
+            else:
+                body_start = _find_body_start(text, entry[2], end)
+                found.append(FunctionRange(entry[1], entry[2], body_start, i))
+        else:
+            decl = _FUNCTION_DECL_RE.match(text, i)
+            if decl:
+                pending = (decl.group(1), i, parens)
+            i = m.end()
+    return found
+
+
+def _find_body_start(text, decl_start, end):
+    """函数声明之后第一个位于参数列表之外的 "{" """
+    depth = 0
+    for j in range(decl_start, end):
+        c = text[j]
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '{' and depth == 0:
+            return j
+    return decl_start
+
+
+def match_bracket(text, open_pos, end=None):
+    """
+    open_pos 处为 "[" / "{" / "("，返回与之匹配的闭括号之后的位置
+    跳过字符串和注释中的括号；找不到时返回 None
+    """
+    end = len(text) if end is None else end
+    pairs = {'[': ']', '{': '}', '(': ')'}
+    depth = 0
+    i = open_pos
+    while i < end:
+        c = text[i]
+        if c in '"\'':
+            i = _skip_string(text, i, end, c)
+            continue
+        if c == '`':
+            # 模板字符串中的 ${} 表达式极少出现在配置数组里，按整体跳过
+            i += 1
+            while i < end and text[i] != '`':
+                i += 2 if text[i] == '\\' else 1
+            i += 1
+            continue
+        if c == '/' and text[i + 1:i + 2] in ('/', '*'):
+            close = text.find('\n' if text[i + 1] == '/' else '*/', i + 2, end)
+            i = end if close < 0 else close + (1 if text[i + 1] == '/' else 2)
+            continue
+        if c in pairs:
+            depth += 1
+        elif c in ']})':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return None
+
+
+def main():
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        index = JSIndex(text)
+        print(f"{path}: {len(index.scripts)} 个内联脚本，{len(index.functions)} 个函数")
+        for fn in sorted(index.functions.values(), key=lambda f: f.start):
+            line = text.count('\n', 0, fn.start) + 1
+            print(f"  {line:>6}  {fn.name}  ({fn.end - fn.start} 字符)")
+        if index.duplicates:
+            print(f"  ⚠️  重名函数: {', '.join(sorted(index.duplicates))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面关键路径体积预算
+
+对 templates/ 下的每个页面解析完整的依赖闭包并统计字节数：
+  - <script src>：区分 sync / defer / async / module；<head> 中的同步脚本阻塞渲染，
+    <body> 中的同步脚本阻塞解析
+  - <link rel="stylesheet">：除 media="print" 外都阻塞渲染；CSS 中的 @import 同样阻塞，
+    @font-face 只计第一个 (最优先) 格式，按需加载；其余 url() 记为图片
+  - <img> / <link rel=icon> 等：图片，loading="lazy" 单独标记；<video> / <audio> 只列出不计入
+  - 运行时请求：页面及其本地脚本中 fetch('...') 的目标，以及字符串形式出现的 .html / .json
+    路径 (如 include-navbar.js 拉取的导航栏 partial)
+  - CDN 引用：大小按 vendor_usage 中同名库的本地副本估算，无法估算的计入 unknown_size
+文本资源同时给出 gzip 传输大小的估算。同一资源被引入多次时只计一次，并给出警告。
+
+预算在 page_budgets.json 中配置 (default + 按页面文件名覆盖)，超出预算或与 --baseline
+报告相比增长超过 --tolerance 时以非零状态退出，可用于发布前检查。
+
+用法:
+    python page_budget.py                                  # 检查全部页面，报告写入 .cache/page_budget.json
+    python page_budget.py templates/index.html --report report.json
+    python page_budget.py --baseline last_release.json --tolerance 0.05
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+
+from asset_graph import js_refs, resolve_candidates, scan_deploy_files
+from build_site import TEMPLATE_DIR
+from fingerprint_assets import css_refs, resolve_ref
+from js_functions import iter_inline_scripts
+from precompress import TEXT_EXTENSIONS
+from vendor_usage import LIBRARIES, identify_library, split_css_blocks
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BUDGET_PATH = os.path.join(ROOT, 'page_budgets.json')
+REPORT_PATH = os.path.join(ROOT, '.cache', 'page_budget.json')
+TOLERANCE = 0.05
+
+# 参与预算检查的指标 (报告 totals 中的键)
+METRICS = ('html_bytes', 'blocking_bytes', 'total_bytes', 'requests')
+
+_TAG_RE = re.compile(r'<(script|link|img|video|audio|source|iframe)\b([^>]*)>', re.I)
+_ATTR_RE = re.compile(r'''([\w:-]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?''')
+_BODY_RE = re.compile(r'<body\b', re.I)
+_RUNTIME_EXTENSIONS = ('.html', '.json', '.md')
+_FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf', '.eot')
+
+_gzip_cache = {}
+
+
+def _read_text(rel):
+    with open(os.path.join(ROOT, rel), 'rb') as f:
+        return f.read().decode('utf-8', errors='replace')
+
+
+def parse_attrs(raw):
+    attrs = {}
+    for m in _ATTR_RE.finditer(raw):
+        value = next((v for v in m.group(2, 3, 4) if v is not None), '')
+        attrs.setdefault(m.group(1).lower(), value)
+    return attrs
+
+
+def file_sizes(rel):
+    """(字节数, gzip 估算)；非文本文件的 gzip 估算等于原大小"""
+    if rel not in _gzip_cache:
+        path = os.path.join(ROOT, rel)
+        with open(path, 'rb') as f:
+            data = f.read()
+        packed = len(gzip.compress(data, compresslevel=6)) if rel.lower().endswith(TEXT_EXTENSIONS) else len(data)
+        _gzip_cache[rel] = (len(data), min(packed, len(data)))
+    return _gzip_cache[rel]
+
+
+class PageScan:
+    """一个页面的资源清单"""
+
+    def __init__(self, page, files):
+        self.page = page
+        self.files = files
+        self.resources = []
+        self.seen = {}
+        self.warnings = []
+
+    def add(self, url, path, kind, loading, parent=None):
+        key = path or url
+        if key in self.seen:
+            if parent is None and kind in ('script', 'style'):
+                self.warnings.append(f"重复引入 {url}")
+            return None
+        entry = {'url': url, 'path': path, 'kind': kind, 'loading': loading,
+                 'bytes': None, 'gzip_bytes': None, 'external': path is None, 'estimated': False}
+        if parent:
+            entry['via'] = parent
+        if path is not None:
+            entry['bytes'], entry['gzip_bytes'] = file_sizes(path)
+        else:
+            library = identify_library(url) if kind in ('script', 'style') else None
+            local = [rel for rel in LIBRARIES[library].local if rel in self.files] if library else []
+            if local:
+                sizes = [file_sizes(rel) for rel in local]
+                entry['bytes'] = sum(size for size, _ in sizes)
+                entry['gzip_bytes'] = sum(packed for _, packed in sizes)
+                entry['estimated'] = True
+        self.seen[key] = entry
+        self.resources.append(entry)
+        return entry
+
+    def local(self, ref, base):
+        target = resolve_ref(ref, base)
+        return target if target in self.files else None
+
+
+def _is_external(ref):
+    return ref.startswith(('http:', 'https:', '//'))
+
+
+def scan_css(scan, rel, blocking):
+    """CSS 依赖：@import 与 CSS 本身阻塞程度相同；字体按需；其余 url() 视为图片"""
+    css = _read_text(rel)
+    font_refs = set()
+    for prelude, body in split_css_blocks(css):
+        if prelude.strip().startswith('@font-face'):
+            refs = css_refs(body)
+            if refs:
+                first = refs[0]
+                font_refs.update(refs)
+                target = scan.local(first, rel)
+                if target or _is_external(first):
+                    scan.add(first, target, 'font', 'on-demand', parent=rel)
+    for ref in css_refs(css):
+        if ref in font_refs or ref.startswith('data:'):
+            continue
+        is_import = re.search(r'@import\s+(?:url\(\s*)?["\']?%s' % re.escape(ref), css) is not None
+        target = scan.local(ref, rel)
+        if target is None and not (_is_external(ref) and is_import):
+            continue
+        if is_import:
+            entry = scan.add(ref, target, 'style', blocking, parent=rel)
+            if entry and target:
+                scan_css(scan, target, blocking)
+        elif target:
+            kind = 'font' if target.lower().endswith(_FONT_EXTENSIONS) else 'image'
+            scan.add(ref, target, kind, 'on-demand', parent=rel)
+
+
+def scan_runtime(scan, code, base, parent=None):
+    """脚本中的运行时请求"""
+    for kind, ref in js_refs(code):
+        if kind not in ('fetch', 'string'):
+            continue
+        for target in resolve_candidates(kind, ref, base, scan.files):
+            # 字符串中的页面路径是导航链接，不是请求
+            if kind == 'string' and posixpath.dirname(target) == TEMPLATE_DIR and target.endswith('.html'):
+                continue
+            if kind == 'fetch' or target.lower().endswith(_RUNTIME_EXTENSIONS):
+                scan.add(ref, target, 'data', 'runtime', parent=parent)
+
+
+def scan_page(page, files):
+    with open(os.path.join(ROOT, page), 'rb') as f:
+        raw = f.read()
+    html = raw.decode('utf-8')
+    scan = PageScan(page, files)
+    body = _BODY_RE.search(html)
+    body_start = body.start() if body else 0
+
+    for m in _TAG_RE.finditer(html):
+        tag = m.group(1).lower()
+        attrs = parse_attrs(m.group(2))
+        in_head = m.start() < body_start
+        if tag == 'script':
+            src = attrs.get('src')
+            if not src:
+                continue
+            if attrs.get('type') == 'module':
+                loading = 'async' if 'async' in attrs else 'defer'
+            elif 'async' in attrs:
+                loading = 'async'
+            elif 'defer' in attrs:
+                loading = 'defer'
+            else:
+                loading = 'blocking' if in_head else 'parser-blocking'
+            target = scan.local(src, page)
+            entry = scan.add(src, target, 'script', loading)
+            if entry and target and target.startswith('static/js/'):
+                scan_runtime(scan, _read_text(target), target, parent=target)
+        elif tag == 'link':
+            rel = attrs.get('rel', '').lower().split()
+            href = attrs.get('href')
+            if not href:
+                continue
+            target = scan.local(href, page)
+            if 'stylesheet' in rel:
+                loading = 'on-demand' if attrs.get('media', '').strip() == 'print' else 'blocking'
+                entry = scan.add(href, target, 'style', loading)
+                if entry and target:
+                    scan_css(scan, target, loading)
+            elif 'icon' in rel and target:
+                scan.add(href, target, 'image', 'on-demand')
+            elif 'preload' in rel or 'modulepreload' in rel:
+                scan.add(href, target, attrs.get('as', 'preload'), 'preload')
+        elif tag in ('img', 'iframe'):
+            src = attrs.get('src')
+            target = scan.local(src, page) if src else None
+            if target or (src and _is_external(src)):
+                loading = 'lazy' if attrs.get('loading') == 'lazy' else 'eager'
+                scan.add(src, target, 'image' if tag == 'img' else 'frame', loading)
+        else:
+            for name in ('src', 'poster'):
+                ref = attrs.get(name)
+                target = scan.local(ref, page) if ref else None
+                if target:
+                    scan.add(ref, target, 'media', 'media')
+
+    for start, end in iter_inline_scripts(html):
+        scan_runtime(scan, html[start:end], page)
+
+    html_gzip = len(gzip.compress(raw, compresslevel=6))
+    counted = [r for r in scan.resources if r['loading'] != 'media']
+    totals = {
+        'html_bytes': len(raw),
+        'html_gzip_bytes': html_gzip,
+        'requests': 1 + len(counted),
+        'blocking_bytes': len(raw) + sum(r['bytes'] or 0 for r in counted if r['loading'] == 'blocking'),
+        'blocking_gzip_bytes': html_gzip + sum(r['gzip_bytes'] or 0 for r in counted if r['loading'] == 'blocking'),
+        'parser_blocking_bytes': sum(r['bytes'] or 0 for r in counted if r['loading'] == 'parser-blocking'),
+        'total_bytes': len(raw) + sum(r['bytes'] or 0 for r in counted),
+        'total_gzip_bytes': html_gzip + sum(r['gzip_bytes'] or 0 for r in counted),
+        'external_requests': sum(1 for r in counted if r['external']),
+        'unknown_size': sum(1 for r in counted if r['bytes'] is None),
+    }
+    return {'page': page, 'totals': totals, 'resources': scan.resources, 'warnings': scan.warnings}
+
+
+def load_budgets(path=BUDGET_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def page_budget(budgets, page):
+    budget = dict(budgets.get('default', {}))
+    budget.update(budgets.get('pages', {}).get(os.path.basename(page), {}))
+    return budget
+
+
+def check_page(result, budget, baseline=None, tolerance=TOLERANCE):
+    """返回违规列表 [说明]"""
+    violations = []
+    totals = result['totals']
+    for metric in METRICS:
+        limit = budget.get(metric)
+        if limit is not None and totals[metric] > limit:
+            violations.append(f"{metric} {totals[metric]:,} > 预算 {limit:,}")
+        if baseline and metric in baseline:
+            previous = baseline[metric]
+            if previous and totals[metric] > previous * (1 + tolerance):
+                violations.append(f"{metric} {previous:,} → {totals[metric]:,} "
+                                  f"(+{totals[metric] / previous - 1:.1%}，超出容差 {tolerance:.0%})")
+    return violations
+
+
+def print_page(result, violations):
+    t = result['totals']
+    mark = '❌' if violations else '✅'
+    print(f"{mark} {os.path.basename(result['page']):<30} html {t['html_bytes']:>9,}  "
+          f"阻塞 {t['blocking_bytes']:>10,}  总计 {t['total_bytes']:>10,} (gzip {t['total_gzip_bytes']:>9,})  "
+          f"请求 {t['requests']:>3} (CDN {t['external_requests']}, 大小未知 {t['unknown_size']})")
+    blocking = [r for r in result['resources'] if r['loading'] == 'blocking']
+    for r in sorted(blocking, key=lambda r: -(r['bytes'] or 0))[:5]:
+        size = '?' if r['bytes'] is None else f"{r['bytes']:,}{'~' if r['estimated'] else ''}"
+        print(f"      阻塞 {r['kind']:<6} {size:>10}  {r['url']}")
+    for warning in result['warnings']:
+        print(f"      ⚠️  {warning}")
+    for violation in violations:
+        print(f"      ❌ {violation}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page critical-path byte budgets")
+    parser.add_argument('patterns', nargs='*', default=['templates/*.html'])
+    parser.add_argument('--budgets', type=str, default=BUDGET_PATH, help="预算配置 JSON")
+    parser.add_argument('--report', type=str, default=REPORT_PATH, help="JSON 报告输出路径")
+    parser.add_argument('--baseline', type=str, help="上一次的报告，用于检查增长")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="相对 baseline 允许的增长比例")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    budgets = load_budgets(args.budgets)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = {page['page']: page['totals'] for page in json.load(f)['pages']}
+
+    files = scan_deploy_files(ROOT)
+    pages = sorted({os.path.relpath(p, ROOT).replace(os.sep, '/')
+                    for pattern in args.patterns for p in glob.glob(os.path.join(ROOT, pattern))})
+    results = []
+    failed = 0
+    for page in pages:
+        try:
+            result = scan_page(page, files)
+        except UnicodeDecodeError:
+            print(f"⚠️  {page}: 不是 UTF-8，跳过")
+            continue
+        result['budget'] = page_budget(budgets, page)
+        result['violations'] = check_page(result, result['budget'], baseline.get(page), args.tolerance)
+        failed += bool(result['violations'])
+        print_page(result, result['violations'])
+        results.append(result)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'pages': results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\n{len(results)} 个页面，{failed} 个超出预算，用时 {time.perf_counter() - start:.2f}s → {args.report}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
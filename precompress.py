@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态资源预压缩：为文本资源写出 .gz / .br 副本
+
+静态服务器开启 gzip_static / brotli_static (或同类选项) 后直接发送预压缩文件，
+高并发时不再为每个请求现场压缩。
+  - 只处理文本类型 (TEXT_EXTENSIONS) 且不小于 --min-size 的文件
+  - gzip 用最高级别 9，brotli 用 quality 11 (需要安装 brotli 包，未安装时只生成 .gz)
+  - 压缩副本比源文件新时跳过；压缩后没有变小的不写出 (已有的旧副本一并删除)
+  - 文件在进程池中并行压缩，结束后打印压缩率
+
+用法:
+    python precompress.py dist                     # 通常由 build_site.py --precompress 调用
+    python precompress.py dist --formats gzip --min-size 4096 --jobs 8
+"""
+
+import argparse
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+TEXT_EXTENSIONS = ('.html', '.htm', '.css', '.js', '.mjs', '.json', '.map', '.svg',
+                   '.xml', '.txt', '.md', '.csv', '.ico', '.webmanifest')
+MIN_SIZE = 1024
+SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+def available_formats(formats):
+    """去掉当前环境无法生成的格式"""
+    return tuple(fmt for fmt in formats if fmt in SUFFIXES and (fmt != 'br' or brotli is not None))
+
+
+def compress_bytes(data, fmt):
+    if fmt == 'gzip':
+        # mtime=0 使输出可复现，内容不变时副本字节也不变
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def _write_bytes(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def compress_file(path, formats=('gzip', 'br'), force=False):
+    """
+    为单个文件写出压缩副本，返回 (路径, 源文件字节数, {格式: 字节数或 None})
+    None 表示副本已是最新而跳过；压缩后没有变小的格式不出现在结果中
+    """
+    st = os.stat(path)
+    data = None
+    sizes = {}
+    for fmt in formats:
+        sibling = path + SUFFIXES[fmt]
+        try:
+            if not force and os.stat(sibling).st_mtime_ns >= st.st_mtime_ns:
+                sizes[fmt] = None
+                continue
+        except FileNotFoundError:
+            pass
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        packed = compress_bytes(data, fmt)
+        if len(packed) >= len(data):
+            if os.path.exists(sibling):
+                os.remove(sibling)
+            continue
+        _write_bytes(sibling, packed)
+        sizes[fmt] = len(packed)
+    return path, st.st_size, sizes
+
+
+def _compress_task(args):
+    return compress_file(*args)
+
+
+def find_text_assets(root, min_size=MIN_SIZE, extensions=TEXT_EXTENSIONS):
+    """root 下需要预压缩的文件 (跳过隐藏文件和已有的压缩副本)"""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            if filename.startswith('.') or not filename.lower().endswith(extensions):
+                continue
+            path = os.path.join(dirpath, filename)
+            if os.path.getsize(path) >= min_size:
+                found.append(path)
+    return sorted(found)
+
+
+def precompress_tree(root, formats=('gzip', 'br'), min_size=MIN_SIZE, jobs=1, force=False):
+    """压缩 root 下的文本资源，返回 [(路径, 源文件字节数, {格式: 字节数或 None})]"""
+    formats = available_formats(formats)
+    tasks = [(path, formats, force) for path in find_text_assets(root, min_size)]
+    if not formats or not tasks:
+        return []
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_compress_task, tasks, chunksize=8))
+    return [_compress_task(task) for task in tasks]
+
+
+def print_ratio_report(results, root, formats=('gzip', 'br'), top=15):
+    """打印本次写出的文件中最大的若干个及总体压缩率"""
+    formats = available_formats(formats)
+    written = [r for r in results if any(size is not None for size in r[2].values())]
+    skipped = len(results) - len(written)
+    if written:
+        header = ''.join(f" {fmt:>10} {'ratio':>7}" for fmt in formats)
+        print(f"  {'file':<48} {'size':>10}{header}")
+        for path, size, sizes in sorted(written, key=lambda r: -r[1])[:top]:
+            cells = ''
+            for fmt in formats:
+                packed = sizes.get(fmt)
+                cells += f" {packed:>10,} {packed / size:>6.1%}" if packed else f" {'-':>10} {'-':>7}"
+            print(f"  {os.path.relpath(path, root):<48} {size:>10,}{cells}")
+        if len(written) > top:
+            print(f"  ... 另有 {len(written) - top} 个文件")
+
+    total = sum(r[1] for r in written)
+    for fmt in formats:
+        packed = sum(r[2][fmt] for r in written if r[2].get(fmt))
+        source = sum(r[1] for r in written if r[2].get(fmt))
+        if source:
+            print(f"  {fmt:<5} {source:>12,} → {packed:>12,} 字节 ({packed / source:.1%})")
+    print(f"  写出 {len(written)} 个文件 ({total:,} 字节)，{skipped} 个已是最新")
+    if 'br' not in formats:
+        print("  ℹ️  未安装 brotli 包或未启用，只生成 .gz (pip install brotli)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for text assets")
+    parser.add_argument('root', nargs='?', default='dist', help="要处理的目录")
+    parser.add_argument('--formats', type=str, default='gzip,br', help="逗号分隔: gzip,br")
+    parser.add_argument('--min-size', type=int, default=MIN_SIZE, help="小于该字节数的文件不压缩")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument('--force', action='store_true', help="忽略已有副本，全部重新压缩")
+    args = parser.parse_args()
+
+    formats = tuple(fmt.strip() for fmt in args.formats.split(',') if fmt.strip())
+    start = time.perf_counter()
+    results = precompress_tree(args.root, formats, args.min_size, max(1, args.jobs), args.force)
+    print_ratio_report(results, args.root, formats)
+    print(f"用时 {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
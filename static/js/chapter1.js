@@ -1114,7 +1114,35 @@
     let rareView = "4plus";
     let pitySeries5 = [];
     let pitySeries4 = [];
+    // 预计算的抽卡随机数 (tools/montecarlo_store.py)：每次试验只存不超过 cap 的 (抽数, 值)
+    const GACHA_STORE_URL = "/static/data/montecarlo/gacha.bin";
+    let gachaSession = -1;
+    if (typeof MCStore !== "undefined") MCStore.load(GACHA_STORE_URL);
+    // 按顺序取下一次试验的随机数，参数超出预计算范围或未加载时返回 null
+    function nextStoredTrial(n, p5, p4) {
+      const store =
+        typeof MCStore !== "undefined" ? MCStore.cached(GACHA_STORE_URL) : null;
+      if (!store || n > store.params.draws || p5 + p4 > store.params.cap) {
+        return null;
+      }
+      const sessions = store.params.sessions;
+      // 从随机位置开始，刷新页面后不会重放同一批试验
+      gachaSession =
+        gachaSession < 0
+          ? Math.floor(Math.random() * sessions)
+          : (gachaSession + 1) % sessions;
+      const offsets = store.arrays.offsets.data;
+      const draws = store.arrays.draw.data;
+      const values = store.arrays.value.data;
+      // 未列出的抽数随机数大于 cap，取 1 即可
+      const r = new Float64Array(n + 1).fill(1);
+      for (let i = offsets[gachaSession]; i < offsets[gachaSession + 1]; i++) {
+        if (draws[i] <= n) r[draws[i]] = values[i];
+      }
+      return r;
+    }
     function simulateTrialGenshin(n, p5, p4, k5, k4) {
+      const stored = nextStoredTrial(n, p5, p4);
       let c5 = 0;
       let c4 = 0;
       let first4 = 0;
@@ -1123,7 +1151,7 @@
         c5++;
         c4++;
         let star = 3;
-        const r = Math.random();
+        const r = stored ? stored[t] : Math.random();
         if (c5 >= k5) star = 5;
         else if (c4 >= k4) star = 4;
         else if (r <= p5) star = 5;
@@ -3362,15 +3390,39 @@ P(\\text{win}|\\text{switch}) &= P(\\text{初选错误}) = \\frac{2}{3}
       }
     }
 
+    // 预计算的三门问题试验 (tools/montecarlo_store.py)：是否换门、是否获胜按位打包
+    const MONTY_STORE_URL = "/static/data/montecarlo/monty.bin";
+    let montyTrial = -1;
+    if (typeof MCStore !== "undefined") MCStore.load(MONTY_STORE_URL);
+
+    // 按位读取，与 np.packbits 的 big 位序一致
+    function storedBit(bytes, i) {
+      return (bytes[i >> 3] >> (7 - (i & 7))) & 1;
+    }
+
     function runSimulation(n) {
+      const store =
+        typeof MCStore !== "undefined" ? MCStore.cached(MONTY_STORE_URL) : null;
+      if (store && montyTrial < 0) {
+        montyTrial = Math.floor(Math.random() * store.params.trials);
+      }
       for (let i = 0; i < n; i++) {
-        const doSwitch = Math.random() < 0.5;
-        const p = Math.floor(Math.random() * 3);
-        const s = Math.floor(Math.random() * 3);
-        const avail = [0, 1, 2].filter((d) => d !== p && d !== s);
-        const o = avail[Math.floor(Math.random() * avail.length)];
-        const final = doSwitch ? [0, 1, 2].find((d) => d !== s && d !== o) : s;
-        const win = final === p;
+        let doSwitch, win;
+        if (store) {
+          doSwitch = storedBit(store.arrays.switch.data, montyTrial) === 1;
+          win = storedBit(store.arrays.win.data, montyTrial) === 1;
+          montyTrial = (montyTrial + 1) % store.params.trials;
+        } else {
+          doSwitch = Math.random() < 0.5;
+          const p = Math.floor(Math.random() * 3);
+          const s = Math.floor(Math.random() * 3);
+          const avail = [0, 1, 2].filter((d) => d !== p && d !== s);
+          const o = avail[Math.floor(Math.random() * avail.length)];
+          const final = doSwitch
+            ? [0, 1, 2].find((d) => d !== s && d !== o)
+            : s;
+          win = final === p;
+        }
 
         if (doSwitch) {
           stats.switchTotal++;
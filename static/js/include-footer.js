@@ -1,5 +1,7 @@
 // 动态引入 templates/partials/footer.html 到页面中的 #site-footer 容器
 document.addEventListener("DOMContentLoaded", function () {
+  // 构建时已内联页脚 (build_site.py) 则无需再请求
+  if (document.querySelector("footer[data-prerendered]")) return;
   fetch("/templates/partials/footer.html")
     .then(function (res) {
       return res.text();
@@ -279,7 +279,22 @@
     }
   }
 
+  // 构建时已内联导航栏 (build_site.py)：无需请求 partial，只做页面级配置与事件绑定
+  function wirePrerendered(root) {
+    dlog("navbar prerendered");
+    applyActiveLink(root);
+    injectPageLinks(root);
+    injectPageSelect(root);
+    hoistDropdownToBody(root);
+    wireDropdown(root);
+  }
+
   function loadNavbar() {
+    var prerendered = document.querySelector("nav[data-prerendered]");
+    if (prerendered) {
+      wirePrerendered(prerendered);
+      return;
+    }
     var partialUrl = getPartialUrl();
     dlog("loadNavbar start partialUrl=", partialUrl);
     fetch(partialUrl, { cache: "no-cache" })
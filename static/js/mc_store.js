@@ -0,0 +1,110 @@
+// 预计算的蒙特卡洛结果 (tools/montecarlo_store.py export)：按需加载 static/data/montecarlo/ 下的二进制分块
+// MCStore.load("/static/data/montecarlo/<分块文件>") → Promise<{params, arrays} | null>，arrays[名称] = {data, shape}
+// 调用方写出分块的完整路径字面量，asset_graph.py 只把实际用到的分块视为可达
+// MCStore.cached(同一路径) 同步返回已加载的分块；取不到时页面应回退到现场模拟
+(function () {
+  var TYPES = {
+    uint8: Uint8Array,
+    uint16: Uint16Array,
+    uint32: Uint32Array,
+    int16: Int16Array,
+    int32: Int32Array,
+    float32: Float32Array,
+    float64: Float64Array,
+  };
+  var indexPromise = null;
+  var chunks = {};
+
+  function loadIndex() {
+    if (!indexPromise) {
+      indexPromise = fetch("/static/data/montecarlo/index.json")
+        .then(function (res) {
+          return res.ok ? res.json() : null;
+        })
+        .catch(function () {
+          return null;
+        });
+    }
+    return indexPromise;
+  }
+
+  // IEEE 754 半精度 → 双精度 (部分浏览器没有 Float16Array)
+  function halfToFloat(h) {
+    var exp = (h >> 10) & 0x1f;
+    var frac = h & 0x3ff;
+    var sign = h & 0x8000 ? -1 : 1;
+    if (exp === 0) return sign * frac * Math.pow(2, -24);
+    if (exp === 31) return frac ? NaN : sign * Infinity;
+    return sign * (1 + frac / 1024) * Math.pow(2, exp - 15);
+  }
+
+  function decodeArray(buffer, spec) {
+    var count = spec.shape.reduce(function (a, b) {
+      return a * b;
+    }, 1);
+    var data;
+    if (spec.dtype === "float16") {
+      var raw = new Uint16Array(buffer, spec.byte_offset, count);
+      data = new Float32Array(count);
+      for (var i = 0; i < count; i++) data[i] = halfToFloat(raw[i]);
+    } else {
+      data = new TYPES[spec.dtype](buffer, spec.byte_offset, count);
+    }
+    // 量化数组：值 = 存储值 * scale + bias
+    if (spec.scale !== undefined) {
+      var values = new Float64Array(count);
+      for (var j = 0; j < count; j++) values[j] = data[j] * spec.scale + spec.bias;
+      data = values;
+    }
+    return { data: data, shape: spec.shape };
+  }
+
+  function findChunk(index, file) {
+    if (!index) return null;
+    for (var name in index.datasets) {
+      var entry = index.datasets[name];
+      for (var key in entry.chunks) {
+        if (entry.chunks[key].file === file) return { entry: entry, chunk: entry.chunks[key] };
+      }
+    }
+    return null;
+  }
+
+  function load(url) {
+    if (!chunks[url]) {
+      var file = url.slice(url.lastIndexOf("/") + 1);
+      chunks[url] = loadIndex().then(function (index) {
+        var found = findChunk(index, file);
+        if (!found) return null;
+        return fetch(url)
+          .then(function (res) {
+            if (!res.ok) throw new Error(res.status);
+            return res.arrayBuffer();
+          })
+          .then(function (buffer) {
+            var arrays = {};
+            Object.keys(found.chunk.arrays).forEach(function (name) {
+              arrays[name] = decodeArray(buffer, found.chunk.arrays[name]);
+            });
+            var result = { params: found.entry.params, arrays: arrays };
+            chunks[url].value = result;
+            return result;
+          });
+      });
+      chunks[url].catch(function (err) {
+        console.warn("预计算结果加载失败:", url, err);
+        delete chunks[url];
+      });
+    }
+    return chunks[url].catch(function () {
+      return null;
+    });
+  }
+
+  function cached(url) {
+    var pending = chunks[url];
+    return (pending && pending.value) || null;
+  }
+
+  globalThis.MCStore = { load: load, cached: cached, index: loadIndex };
+})();
@@ -145,6 +145,9 @@ class ProbabilityToolbox {
     // 原文显示开关（false: 显示渲染版；true: 显示原文）
     this.showRaw = false;
     this.apiKey = "sk-fbc4de9c1fd949aea95d4cd1a5bf48e2";
+    // 可通过 globalThis.TB_AI_ENDPOINT 指向 ai_proxy.py 的缓存代理
+    this.apiEndpoint =
+      globalThis.TB_AI_ENDPOINT || "https://api.deepseek.com/v1/chat/completions";
     this.defaultPrompt =
       "你是一个专业的概率论与数理统计助手，擅长解答相关的数学问题，提供清晰的解释和计算步骤。请用中文回答问题。所有数学公式必须使用标准 LaTeX 定界：行内统一使用 \\(" +
       " ... \\)，陈列公式统一使用 \\[ ... \\]；严禁使用 $...$ 或 $$...$$ 作为定界，也不要使用 [ ... ] 作为公式定界。概率统计中的符号请使用规范写法（如 \\mathbb{E}, \\operatorname{Var}, \\Pr, \\chi^2, \\Lambda 等）。在使用可伸缩括号时确保 \\left 与 \\right 成对（例如 \\left( ... \\right)），不要写成 \\right\\) 之类的错误形式。必要时给出关键推导与结论。";
@@ -1417,7 +1420,7 @@ class ProbabilityToolbox {
     console.log("发送API请求:", message);
 
     const response = await fetch(
-      "https://api.deepseek.com/v1/chat/completions",
+      this.apiEndpoint,
       {
         method: "POST",
         headers: {
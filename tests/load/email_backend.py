@@ -0,0 +1,352 @@
+"""
+邮箱订阅接口的本地替身 (WSGI)，与 templates/submit_email.php 的约定一致
+
+    POST email_check=<邮箱>  → "duplicate" / "unique"
+    POST email=<邮箱>        → "订阅成功" / "该邮箱已订阅"
+响应为 text/plain；两个字段都没有时返回空响应 (与 PHP 相同)。
+
+两种实现，便于对比：
+  - pooled (默认)：SQLite 连接池 (WAL)，订阅用一条 INSERT ... ON CONFLICT DO NOTHING 完成
+    查重和写入；查重前面有内存中的布隆过滤器 (一定不存在时不查库) 和 LRU (最近查过的邮箱)
+  - legacy：照搬 PHP 的模式，每个请求新建连接、SELECT * 查重、再单独 INSERT、关闭连接；
+    --connect-delay-ms 可以模拟 MySQL 建立 TCP 连接和认证的耗时
+数据库初始化时写入 tests/sql/seed.sql 中的种子邮箱。
+
+用法:
+    python tests/load/email_backend.py --bench                     # 进程内对比两种实现的吞吐
+    python tests/load/email_backend.py --bench --threads 16 --signups 4000 --connect-delay-ms 2
+    python tests/load/static_server.py --email-backend legacy      # 由静态服务器挂载，供 locust 压测
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import parse_qs
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DB_PATH = os.path.join(ROOT, '.cache', 'email_mock.sqlite')
+SEED_PATH = os.path.join(ROOT, 'tests', 'sql', 'seed.sql')
+
+POOL_SIZE = 8
+LRU_SIZE = 10000
+BLOOM_CAPACITY = 100000
+BLOOM_ERROR_RATE = 0.01
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  email_address TEXT NOT NULL UNIQUE,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+DUPLICATE = 'duplicate'
+UNIQUE = 'unique'
+SUBSCRIBED = '订阅成功'
+ALREADY_SUBSCRIBED = '该邮箱已订阅'
+
+
+def seed_emails(path=SEED_PATH):
+    """seed.sql 中 INSERT INTO emails 的邮箱"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            sql = f.read()
+    except OSError:
+        return []
+    m = re.search(r'INSERT\s+INTO\s+emails\b[^;]*;', sql, re.I)
+    return re.findall(r"'([^']+@[^']+)'", m.group(0)) if m else []
+
+
+def init_db(path=DB_PATH, reset=True):
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if reset:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    conn.executemany('INSERT OR IGNORE INTO emails (email_address) VALUES (?)',
+                     [(email,) for email in seed_emails()])
+    conn.commit()
+    conn.close()
+
+
+class ConnectionPool:
+    """固定大小的 SQLite 连接池"""
+
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self._pool = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._pool.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class BloomFilter:
+    """只增不删的布隆过滤器：might_contain 为 False 时一定不存在"""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class LRUCache:
+    """线程安全的 LRU：邮箱 -> True (只记录已订阅的邮箱)"""
+
+    def __init__(self, maxsize=LRU_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class PooledBackend:
+    """连接池 + 单语句 upsert + 布隆过滤器 / LRU 查重"""
+    name = 'pooled'
+
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE):
+        self.pool = ConnectionPool(path, pool_size)
+        self.bloom = BloomFilter()
+        self.lru = LRUCache()
+        self.stats = {'bloom_negative': 0, 'lru_hit': 0, 'db_lookup': 0, 'db_upsert': 0}
+        with self.pool.connection() as conn:
+            for (email,) in conn.execute('SELECT email_address FROM emails'):
+                self.bloom.add(email)
+
+    def is_duplicate(self, email):
+        if not self.bloom.might_contain(email):
+            self.stats['bloom_negative'] += 1
+            return False
+        cached = self.lru.get(email)
+        if cached is not None:
+            self.stats['lru_hit'] += 1
+            return cached
+        self.stats['db_lookup'] += 1
+        with self.pool.connection() as conn:
+            exists = conn.execute('SELECT 1 FROM emails WHERE email_address = ? LIMIT 1',
+                                  (email,)).fetchone() is not None
+        # 只缓存"已订阅"：订阅不可撤销，正结果不会过期；缓存否定结果时，并发的 subscribe()
+        # 在 SELECT 与 put 之间写入的 True 会被旧的 False 覆盖
+        if exists:
+            self.lru.put(email, True)
+        return exists
+
+    def subscribe(self, email):
+        """返回 True 表示新订阅"""
+        if self.lru.get(email):
+            self.stats['lru_hit'] += 1
+            return False
+        self.stats['db_upsert'] += 1
+        with self.pool.connection() as conn:
+            cursor = conn.execute('INSERT INTO emails (email_address) VALUES (?) '
+                                  'ON CONFLICT(email_address) DO NOTHING', (email,))
+            inserted = cursor.rowcount == 1
+        self.bloom.add(email)
+        self.lru.put(email, True)
+        return inserted
+
+    def close(self):
+        self.pool.close()
+
+
+class LegacyBackend:
+    """submit_email.php 的模式：每个请求一个新连接，先 SELECT * 再 INSERT"""
+    name = 'legacy'
+
+    def __init__(self, path=DB_PATH, connect_delay_ms=0.0):
+        self.path = path
+        self.connect_delay = connect_delay_ms / 1000.0
+
+    @contextmanager
+    def _connect(self):
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def is_duplicate(self, email):
+        with self._connect() as conn:
+            return len(conn.execute('SELECT * FROM emails WHERE email_address = ?', (email,)).fetchall()) > 0
+
+    def subscribe(self, email):
+        with self._connect() as conn:
+            if conn.execute('SELECT * FROM emails WHERE email_address = ?', (email,)).fetchall():
+                return False
+            try:
+                conn.execute('INSERT INTO emails (email_address) VALUES (?)', (email,))
+                conn.commit()
+            except sqlite3.IntegrityError:
+                # PHP 版本在并发下会在这里报错；替身按已订阅处理
+                return False
+            return True
+
+    def close(self):
+        pass
+
+
+def create_backend(kind='pooled', path=DB_PATH, reset=True, connect_delay_ms=0.0, pool_size=POOL_SIZE):
+    init_db(path, reset)
+    if kind == 'legacy':
+        return LegacyBackend(path, connect_delay_ms)
+    return PooledBackend(path, pool_size)
+
+
+def make_app(backend):
+    """submit_email.php 的 WSGI 版本"""
+
+    def app(environ, start_response):
+        headers = [('Content-Type', 'text/plain; charset=utf-8')]
+        if environ.get('REQUEST_METHOD') != 'POST':
+            body = b''
+        else:
+            try:
+                length = int(environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                length = 0
+            form = parse_qs(environ['wsgi.input'].read(length).decode('utf-8', errors='replace'))
+            if 'email_check' in form:
+                text = DUPLICATE if backend.is_duplicate(form['email_check'][0]) else UNIQUE
+            elif 'email' in form:
+                text = SUBSCRIBED if backend.subscribe(form['email'][0]) else ALREADY_SUBSCRIBED
+            else:
+                text = ''
+            body = text.encode('utf-8')
+        headers.append(('Content-Length', str(len(body))))
+        start_response('200 OK', headers)
+        return [body]
+
+    return app
+
+
+def signup_emails(count, repeat_ratio=0.3, seed=0):
+    """模拟的注册邮箱序列：一部分重复提交已有邮箱"""
+    rng = random.Random(seed)
+    known = seed_emails()
+    emails = []
+    for i in range(count):
+        if known and rng.random() < repeat_ratio:
+            emails.append(rng.choice(known))
+        else:
+            email = f"user{i}_{rng.randrange(1 << 30)}@example.com"
+            emails.append(email)
+            known.append(email)
+    return emails
+
+
+def run_benchmark(backend, emails, threads):
+    """多线程执行 email_check + email 两步注册，返回 (每秒注册数, 请求延迟列表 ms)"""
+    latencies = []
+    lock = threading.Lock()
+    chunks = [emails[i::threads] for i in range(threads)]
+
+    def worker(chunk):
+        local = []
+        for email in chunk:
+            t0 = time.perf_counter()
+            duplicate = backend.is_duplicate(email)
+            t1 = time.perf_counter()
+            local.append((t1 - t0) * 1000)
+            if not duplicate:
+                backend.subscribe(email)
+                local.append((time.perf_counter() - t1) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return len(emails) / elapsed, sorted(latencies)
+
+
+def _percentile(values, q):
+    return values[max(1, math.ceil(q / 100 * len(values))) - 1] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock submit_email.php backend and benchmark")
+    parser.add_argument('--bench', action='store_true', help="进程内对比 pooled 与 legacy 的吞吐")
+    parser.add_argument('--threads', type=int, default=8, help="并发线程数")
+    parser.add_argument('--signups', type=int, default=2000, help="注册次数")
+    parser.add_argument('--repeat-ratio', type=float, default=0.3, help="重复提交已有邮箱的比例")
+    parser.add_argument('--connect-delay-ms', type=float, default=0.0, help="legacy 每次建立连接的模拟耗时")
+    parser.add_argument('--db', type=str, default=DB_PATH, help="SQLite 数据库路径")
+    args = parser.parse_args()
+
+    if not args.bench:
+        parser.print_help()
+        return
+
+    emails = signup_emails(args.signups, args.repeat_ratio)
+    print(f"{args.signups} 次注册 (重复比例 {args.repeat_ratio:.0%})，{args.threads} 个线程")
+    print(f"  {'backend':<8} {'signups/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind in ('legacy', 'pooled'):
+        backend = create_backend(kind, args.db, reset=True, connect_delay_ms=args.connect_delay_ms)
+        rate, latencies = run_benchmark(backend, emails, args.threads)
+        print(f"  {kind:<8} {rate:>10,.0f} {_percentile(latencies, 50):>8.2f} "
+              f"{_percentile(latencies, 95):>8.2f} {_percentile(latencies, 99):>8.2f}")
+        if isinstance(backend, PooledBackend):
+            print(f"           {backend.stats}")
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,136 @@
-from locust import HttpUser, task, between
+"""
+站点压测：按页面权重回放每个模板的完整请求瀑布
+
+  - 页面按 waterfall.PAGE_WEIGHTS 加权选择，瀑布由 waterfall.py 从模板解析得到
+    (HTML → <head> 阻塞资源 → 脚本 / 图片 → 字体 → 运行时 fetch 的 partial、目录.md)，
+    同一阶段内以 LOCUST_CONCURRENCY 个并发连接下载，阶段之间按浏览器顺序等待
+  - ColdCacheUser：每次访问都是空缓存的新访客，全部资源完整下载
+  - WarmCacheUser：回访用户，已缓存的静态资源不再请求，HTML 和运行时数据带 If-None-Match /
+    If-Modified-Since 再验证 (期望 304)
+  - SiteUser：首页 + 邮箱订阅提交
+  - SignupUser：按 index.html 的流程注册 (先 email_check，unique 时再提交 email)，
+    约 30% 重复提交已注册的邮箱；请求计入 api 类别，便于对比两种 submit_email 后端的吞吐
+  - 测试结束时按 (缓存类型, 资源类别) 输出 p50 / p95 / p99 响应时间，并写入 JSON
+
+环境变量:
+    LOCUST_BASE_URL       目标地址；未设置时在本机启动 static_server.py 作为离线替身
+    LOCUST_SERVER_ROOT    替身服务器的站点根目录 (默认仓库根目录，可指向 dist/ 测构建输出)
+    LOCUST_PROFILE        ramp / spike / soak：按 PROFILES 中的阶段调整用户数；不设置时用 -u / -r
+    LOCUST_CONCURRENCY    每个页面的并发连接数 (默认 6，与浏览器同域连接数上限一致)
+    LOCUST_CLASS_REPORT   分位数报告路径 (默认 .cache/load_asset_classes.json)
+    LOCUST_EMAIL_BACKEND  替身服务器的 submit_email 实现：pooled (默认) / legacy
+    LOCUST_CONNECT_DELAY_MS  legacy 每次建立数据库连接的模拟耗时
+
+用法:
+    locust -f tests/load/locustfile.py --headless -u 50 -r 5 -t 3m
+    LOCUST_PROFILE=ramp locust -f tests/load/locustfile.py --headless
+    LOCUST_EMAIL_BACKEND=legacy locust -f tests/load/locustfile.py SignupUser --headless -u 50 -r 10 -t 1m
+"""
+
+import json
+import math
 import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from gevent.pool import Pool
+from locust import HttpUser, LoadTestShape, between, events, task
+from locust.runners import WorkerRunner
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from waterfall import PHASES, ROOT, load_waterfalls  # noqa: E402
+
+LOCAL_HOST = '127.0.0.1'
+LOCAL_PORT = int(os.getenv('LOCUST_LOCAL_PORT', '8080'))
+BASE = os.getenv('LOCUST_BASE_URL') or f'http://{LOCAL_HOST}:{LOCAL_PORT}'
+START_LOCAL_SERVER = not os.getenv('LOCUST_BASE_URL')
+CONCURRENCY = int(os.getenv('LOCUST_CONCURRENCY', '6'))
+CLASS_REPORT = os.getenv('LOCUST_CLASS_REPORT', os.path.join(ROOT, '.cache', 'load_asset_classes.json'))
+EMAIL_BACKEND = os.getenv('LOCUST_EMAIL_BACKEND', 'pooled')
+CONNECT_DELAY_MS = os.getenv('LOCUST_CONNECT_DELAY_MS', '0')
+EMAIL_URL = f"{BASE}/templates/submit_email.php"
+# 重复提交已注册邮箱的比例
+REPEAT_SIGNUP_RATIO = 0.3
+
+# 浏览器缓存命中后仍会再验证的阶段 (HTML 与 fetch 的数据都是 no-cache)
+REVALIDATED_PHASES = ('html', 'runtime')
+
+# (结束时间 s, 用户数, 每秒启动数)
+PROFILES = {
+    'ramp': [(60, 10, 2), (180, 50, 5), (300, 100, 10), (480, 100, 10)],
+    'spike': [(60, 10, 2), (90, 150, 50), (210, 150, 50), (300, 10, 20)],
+    'soak': [(120, 30, 5), (1800, 30, 5)],
+}
+
+WATERFALLS = load_waterfalls()
+PAGE_URLS = list(WATERFALLS)
+PAGE_WEIGHTS = [WATERFALLS[url][0] for url in PAGE_URLS]
+
+_class_times = defaultdict(list)
+_server = None
+
+
+class PageVisitor(HttpUser):
+    abstract = True
+    host = BASE
+    # 阅读页面的时间
+    wait_time = between(3, 10)
+    warm_cache = False
+
+    def on_start(self):
+        self.cache = {}
+
+    def fetch(self, request):
+        cached = self.cache.get(request.url)
+        if cached is not None and request.phase not in REVALIDATED_PHASES:
+            return
+        headers = {'Accept-Encoding': 'br, gzip'}
+        headers.update(cached or {})
+        context = {'asset_class': request.asset_class, 'cache': 'warm' if self.warm_cache else 'cold'}
+        with self.client.get(f"{BASE}{request.url}", headers=headers, name=request.url,
+                             context=context, catch_response=True) as response:
+            if response.status_code not in (200, 304):
+                response.failure(f"HTTP {response.status_code}")
+                return
+            if self.warm_cache and response.status_code == 200:
+                validators = {}
+                if response.headers.get('ETag'):
+                    validators['If-None-Match'] = response.headers['ETag']
+                if response.headers.get('Last-Modified'):
+                    validators['If-Modified-Since'] = response.headers['Last-Modified']
+                self.cache[request.url] = validators
+
+    def visit(self, page_url):
+        """按阶段回放瀑布：阶段内并发，阶段之间顺序"""
+        _, phases = WATERFALLS[page_url]
+        pool = Pool(CONCURRENCY)
+        for phase in PHASES:
+            pool.map(self.fetch, phases[phase])
+
+    @task
+    def browse(self):
+        self.visit(random.choices(PAGE_URLS, PAGE_WEIGHTS)[0])
+
+
+class ColdCacheUser(PageVisitor):
+    """首次访问的用户：不保留缓存，每个页面都完整下载"""
+    weight = 3
+
+
+class WarmCacheUser(PageVisitor):
+    """回访用户：缓存跨页面保留"""
+    weight = 7
+    warm_cache = True
 
-BASE = os.getenv('LOCUST_BASE_URL', 'http://localhost:8080')
 
 class SiteUser(HttpUser):
+    host = BASE
+    weight = 1
     wait_time = between(1, 3)
 
     @task
@@ -12,6 +139,112 @@ class SiteUser(HttpUser):
 
     @task
     def submit_email_flow(self):
-        # 仅作为示例，实际需要后端可路由到 PHP
-        self.client.post(f"{BASE}/templates/submit_email.php", data={"email_check": "load_user@example.com"})
-        self.client.post(f"{BASE}/templates/submit_email.php", data={"email": "load_user@example.com"})
+        # 替身服务器上由 static_server.py 应答，真实环境需要后端可路由到 PHP
+        self.client.post(EMAIL_URL, data={"email_check": "load_user@example.com"})
+        self.client.post(EMAIL_URL, data={"email": "load_user@example.com"})
+
+
+class SignupUser(HttpUser):
+    """按 index.html 的订阅流程注册：先查重，unique 时再提交"""
+    host = BASE
+    weight = 1
+    wait_time = between(1, 3)
+    registered = ['existing_user@example.com', 'user2@example.com']
+
+    def post(self, field, email):
+        context = {'asset_class': 'api', 'cache': EMAIL_BACKEND}
+        with self.client.post(EMAIL_URL, data={field: email}, name=f"submit_email.php [{field}]",
+                              context=context, catch_response=True) as response:
+            if response.status_code != 200:
+                response.failure(f"HTTP {response.status_code}")
+                return None
+            return response.text
+
+    @task
+    def signup(self):
+        if random.random() < REPEAT_SIGNUP_RATIO:
+            email = random.choice(self.registered)
+        else:
+            email = f"load_{random.getrandbits(48):012x}@example.com"
+        if self.post('email_check', email) == 'unique' and self.post('email', email) == '订阅成功':
+            self.registered.append(email)
+
+
+if os.getenv('LOCUST_PROFILE'):
+    class StagesShape(LoadTestShape):
+        """按 PROFILES 中的阶段调整用户数"""
+        stages = PROFILES[os.getenv('LOCUST_PROFILE')]
+
+        def tick(self):
+            run_time = self.get_run_time()
+            for end, users, spawn_rate in self.stages:
+                if run_time < end:
+                    return users, spawn_rate
+            return None
+
+
+def percentile(sorted_values, q):
+    """最近秩法分位数"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@events.request.add_listener
+def _record_asset_class(request_type, name, response_time, response_length, exception, context=None, **kwargs):
+    if exception is None and context and 'asset_class' in context:
+        _class_times[(context['cache'], context['asset_class'])].append(response_time)
+
+
+def _wait_for_port(host, port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+@events.init.add_listener
+def _start_local_server(environment, **kwargs):
+    global _server
+    if not START_LOCAL_SERVER or isinstance(environment.runner, WorkerRunner):
+        return
+    server_root = os.getenv('LOCUST_SERVER_ROOT', ROOT)
+    _server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), 'static_server.py'),
+                                '--host', LOCAL_HOST, '--port', str(LOCAL_PORT), '--root', server_root,
+                                '--email-backend', EMAIL_BACKEND, '--connect-delay-ms', CONNECT_DELAY_MS],
+                               stdout=subprocess.DEVNULL)
+    if not _wait_for_port(LOCAL_HOST, LOCAL_PORT):
+        raise RuntimeError(f"本地静态服务器未能在 {LOCAL_HOST}:{LOCAL_PORT} 启动")
+
+
+@events.quitting.add_listener
+def _stop_local_server(environment, **kwargs):
+    if _server is not None:
+        _server.terminate()
+        _server.wait(timeout=5)
+
+
+@events.test_stop.add_listener
+def _report_asset_classes(environment, **kwargs):
+    if not _class_times:
+        return
+    rows = []
+    for (cache, asset_class), times in sorted(_class_times.items()):
+        times.sort()
+        rows.append({'cache': cache, 'asset_class': asset_class, 'requests': len(times),
+                     'p50_ms': percentile(times, 50), 'p95_ms': percentile(times, 95),
+                     'p99_ms': percentile(times, 99)})
+
+    print(f"\n{'cache':<7} {'class':<10} {'requests':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for row in rows:
+        print(f"{row['cache']:<7} {row['asset_class']:<10} {row['requests']:>9} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(CLASS_REPORT)), exist_ok=True)
+    with open(CLASS_REPORT, 'w', encoding='utf-8') as f:
+        json.dump({'base_url': BASE, 'email_backend': EMAIL_BACKEND, 'asset_classes': rows}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,148 @@
+"""
+压测用的本地静态服务器 (离线替身，与 tests/e2e/server.js 的路由一致)
+
+  - 以仓库根目录 (或 --root 指定的构建输出，如 dist/) 为站点根目录
+  - 支持 ETag / Last-Modified 条件请求 (304)，模拟浏览器缓存的再验证
+  - 请求带 Accept-Encoding 且存在 .br / .gz 预压缩副本时直接发送副本
+  - POST submit_email.php 由 email_backend.py 应答 (SQLite 替身，--email-backend 选择实现)
+
+用法:
+    python tests/load/static_server.py --port 8080
+    python tests/load/static_server.py --root dist --port 8080
+    python tests/load/static_server.py --email-backend legacy --connect-delay-ms 2
+"""
+
+import argparse
+import hashlib
+import mimetypes
+import os
+import sys
+from email.utils import formatdate, parsedate_to_datetime
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import email_backend  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+EMAIL_ROUTE = '/templates/submit_email.php'
+
+MIME_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.json': 'application/json',
+    '.md': 'text/markdown; charset=utf-8',
+    '.svg': 'image/svg+xml',
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.ttf': 'font/ttf',
+}
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def file_etag(st):
+    return '"%s"' % hashlib.sha1(f"{st.st_size}-{st.st_mtime_ns}".encode()).hexdigest()[:16]
+
+
+def not_modified(environ, etag, mtime):
+    if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')]
+    if_modified_since = environ.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def make_app(root=ROOT, routes=None):
+    """
+    静态文件 WSGI 应用；routes 为 {路径: WSGI 应用}，优先于静态文件匹配
+    """
+    root = os.path.abspath(root)
+    routes = dict(routes or {})
+    if EMAIL_ROUTE not in routes:
+        routes[EMAIL_ROUTE] = email_backend.make_app(email_backend.create_backend('pooled'))
+
+    def app(environ, start_response):
+        # PEP 3333：PATH_INFO 是已解码、按 latin-1 表示的字节，中文文件名需要还原为 UTF-8
+        path = environ.get('PATH_INFO', '/').encode('latin-1').decode('utf-8', errors='replace')
+        if path in routes:
+            return routes[path](environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+            return [b'']
+
+        file_path = os.path.normpath(os.path.join(root, path.lstrip('/')))
+        if file_path != root and not file_path.startswith(root + os.sep):
+            start_response('403 Forbidden', [('Content-Type', 'text/plain')])
+            return [b'Forbidden']
+        if os.path.isdir(file_path):
+            file_path = os.path.join(file_path, 'index.html')
+        if not os.path.isfile(file_path):
+            start_response('404 Not Found', [('Content-Type', 'text/plain')])
+            return [b'Not Found']
+
+        st = os.stat(file_path)
+        etag = file_etag(st)
+        ext = os.path.splitext(file_path)[1].lower()
+        headers = [('Content-Type', MIME_TYPES.get(ext) or mimetypes.guess_type(file_path)[0]
+                    or 'application/octet-stream'),
+                   ('ETag', etag), ('Last-Modified', formatdate(st.st_mtime, usegmt=True)),
+                   ('Cache-Control', 'no-cache' if ext in ('.html', '.md', '.json') else 'public, max-age=3600'),
+                   ('Vary', 'Accept-Encoding')]
+        if not_modified(environ, etag, st.st_mtime):
+            start_response('304 Not Modified', headers)
+            return [b'']
+
+        accepted = environ.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(file_path + suffix):
+                file_path += suffix
+                headers.append(('Content-Encoding', encoding))
+                break
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        headers.append(('Content-Length', str(len(body))))
+        start_response('200 OK', headers)
+        return [b''] if environ['REQUEST_METHOD'] == 'HEAD' else [body]
+
+    return app
+
+
+def serve(host='127.0.0.1', port=8080, root=ROOT, routes=None):
+    httpd = make_server(host, port, make_app(root, routes),
+                        server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    print(f"Static server on http://{host}:{port} (root: {root})")
+    httpd.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local static server for load tests")
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--root', type=str, default=ROOT, help="站点根目录，默认仓库根目录")
+    parser.add_argument('--email-backend', choices=['pooled', 'legacy'], default='pooled',
+                        help="submit_email.php 的实现：连接池 + upsert，或每请求新建连接 (PHP 模式)")
+    parser.add_argument('--connect-delay-ms', type=float, default=0.0, help="legacy 每次建立连接的模拟耗时")
+    args = parser.parse_args()
+    backend = email_backend.create_backend(args.email_backend, connect_delay_ms=args.connect_delay_ms)
+    print(f"submit_email.php: {args.email_backend} backend ({email_backend.DB_PATH})")
+    serve(args.host, args.port, args.root, routes={EMAIL_ROUTE: email_backend.make_app(backend)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+从模板解析每个页面的请求瀑布，供 locustfile.py 回放
+
+依赖闭包来自 page_budget.scan_page (与预算检查同一套解析)，按浏览器的加载顺序分为几个阶段：
+  1. html          页面本身
+  2. blocking      <head> 中的同步脚本和样式表 (及其 @import)
+  3. deferred      <body> 中的同步脚本、defer / async / module 脚本、非懒加载图片
+  4. on-demand     字体和 CSS 中的图片 (按需，仅冷缓存用户请求)
+  5. runtime       脚本 fetch 的 partial、目录.md、JSON 数据
+CDN 资源不在本地替身服务器上，不回放；<video> 不回放。
+
+用法:
+    python tests/load/waterfall.py                  # 打印每个页面的瀑布
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from asset_graph import DEPLOY_DIRS, scan_deploy_files  # noqa: E402
+from page_budget import scan_page  # noqa: E402
+
+SERVED_DIRS = DEPLOY_DIRS
+
+# 页面访问权重 (大致按真实流量)；未列出的测试页、历史页面不参与
+PAGE_WEIGHTS = {
+    'index.html': 30,
+    'probability_distributions.html': 10,
+    'random_variables.html': 8,
+    'expectation_variance.html': 8,
+    'law_of_large_numbers.html': 8,
+    'interval_estimation.html': 7,
+    'hypothesis_testing.html': 7,
+    'chapter1.html': 6,
+    'chapter3.html': 6,
+    'chapter5.html': 3,
+    'chapter8.html': 3,
+    'video-courses.html': 3,
+    'appendix.html': 1,
+}
+
+PHASES = ('html', 'blocking', 'deferred', 'on-demand', 'runtime')
+
+Request = namedtuple('Request', ['url', 'asset_class', 'phase', 'bytes'])
+
+_PHASE_BY_LOADING = {
+    'blocking': 'blocking',
+    'parser-blocking': 'deferred',
+    'defer': 'deferred',
+    'async': 'deferred',
+    'eager': 'deferred',
+    'preload': 'blocking',
+    'on-demand': 'on-demand',
+    'runtime': 'runtime',
+}
+
+
+def asset_class(path, kind):
+    """统计用的资源类别"""
+    if kind == 'data':
+        if '/partials/' in path:
+            return 'partial'
+        return 'markdown' if path.endswith('.md') else 'data'
+    if kind == 'script':
+        return 'vendor-js' if path.startswith('static/libs/') else 'site-js'
+    if kind == 'style':
+        return 'css'
+    return kind
+
+
+def page_waterfall(page, files):
+    """返回 {阶段: [Request]}"""
+    result = scan_page(page, files)
+    phases = {phase: [] for phase in PHASES}
+    phases['html'].append(Request('/' + page, 'html', 'html', result['totals']['html_bytes']))
+    for resource in result['resources']:
+        phase = _PHASE_BY_LOADING.get(resource['loading'])
+        # 提交邮箱的 POST 由 locustfile 中的 SiteUser 单独模拟
+        if resource['path'] is None or phase is None or resource['path'].endswith('.php'):
+            continue
+        phases[phase].append(Request('/' + resource['path'], asset_class(resource['path'], resource['kind']),
+                                     phase, resource['bytes']))
+    return phases
+
+
+def load_waterfalls(weights=PAGE_WEIGHTS):
+    """返回 {页面 URL: (权重, {阶段: [Request]})}"""
+    files = scan_deploy_files(ROOT, SERVED_DIRS)
+    waterfalls = {}
+    for name, weight in weights.items():
+        page = f'templates/{name}'
+        if page in files and weight > 0:
+            waterfalls['/' + page] = (weight, page_waterfall(page, files))
+    return waterfalls
+
+
+def main():
+    for url, (weight, phases) in load_waterfalls().items():
+        count = sum(len(requests) for requests in phases.values())
+        size = sum(r.bytes or 0 for requests in phases.values() for r in requests)
+        print(f"{url}  (权重 {weight}，{count} 个请求，{size:,} 字节)")
+        for phase in PHASES:
+            for r in phases[phase]:
+                print(f"    {phase:<10} {r.asset_class:<10} {r.bytes or 0:>10,}  {r.url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,87 +5,155 @@ import os
 import subprocess
 import json
 import tempfile
+import hashlib
+import threading
+import time
+import csv
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from video_probe_cache import ProbeCache, DEFAULT_CACHE_PATH
+
+VIDEO_EXTENSIONS = ('.mov', '.mp4', '.m4v', '.webm', '.mkv', '.avi')
+
+# 本次运行内的ffprobe结果缓存: 绝对路径 -> 解析后的JSON
+_probe_cache = {}
+_probe_lock = threading.Lock()
+
+# 跨运行的持久化缓存 (video_probe_cache.ProbeCache)，None 表示不启用
+_persistent_cache = None
+
+def set_probe_cache(cache):
+    """启用/关闭持久化探测缓存"""
+    global _persistent_cache
+    _persistent_cache = cache
+
+def probe_video(video_path):
+    """
+    运行一次FFprobe (streams + format)，结果按路径缓存，供各检测函数共用
+    返回 (data, error)，失败时 data 为 None
+    """
+    key = os.path.abspath(video_path)
+    with _probe_lock:
+        if key in _probe_cache:
+            return _probe_cache[key], None
+    
+    if _persistent_cache is not None:
+        data = _persistent_cache.get(video_path, 'probe')
+        if data is not None:
+            with _probe_lock:
+                _probe_cache[key] = data
+            return data, None
+    
+    cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', video_path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore')
+    except OSError as e:
+        return None, f"无法运行FFprobe: {e}"
+    
+    if result.returncode != 0:
+        return None, f"FFprobe分析失败: {result.stderr}"
+    
+    try:
+        data = json.loads(result.stdout)
+    except json.JSONDecodeError as e:
+        return None, f"JSON解析失败: {e}"
+    
+    with _probe_lock:
+        _probe_cache[key] = data
+    if _persistent_cache is not None:
+        _persistent_cache.put(video_path, data, 'probe')
+    return data, None
+
+def parse_ffprobe_alpha(data):
+    """
+    从FFprobe结果判断是否包含alpha通道 (支持HEVC Alpha)
+    返回 (has_alpha, stream_info)
+    """
+    for stream in data.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            codec_name = stream.get('codec_name', '')
+            pix_fmt = stream.get('pix_fmt', '')
+            
+            # 检查HEVC Alpha支持的像素格式
+            hevc_alpha_formats = ['yuva420p', 'yuva422p', 'yuva444p', 'yuva420p10le', 'yuva422p10le', 'yuva444p10le']
+            # 其他alpha格式
+            other_alpha_formats = ['rgba', 'argb', 'bgra', 'abgr', 'ya', 'gbra']
+            
+            all_alpha_formats = hevc_alpha_formats + other_alpha_formats
+            has_alpha = any(alpha_fmt in pix_fmt.lower() for alpha_fmt in all_alpha_formats)
+            
+            stream_info = {
+                'codec': codec_name,
+                'pixel_format': pix_fmt,
+                'has_alpha': has_alpha,
+                'is_hevc': codec_name.lower() in ['hevc', 'h265'],
+                'width': stream.get('width'),
+                'height': stream.get('height'),
+                'nb_frames': stream.get('nb_frames', 'N/A')
+            }
+            return has_alpha, stream_info
+    
+    return False, {}
 
 def check_video_alpha_with_ffprobe(video_path):
     """
     使用FFprobe检查视频是否包含alpha通道 (支持HEVC Alpha)
     """
     try:
-        cmd = [
-            'ffprobe', 
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_streams',
-            video_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore')
-        
-        if result.returncode != 0:
-            print(f"FFprobe分析失败: {result.stderr}")
+        data, error = probe_video(video_path)
+        if error:
+            print(error)
             return False, {}
         
-        try:
-            data = json.loads(result.stdout)
-        except json.JSONDecodeError as e:
-            print(f"JSON解析失败: {e}")
+        has_alpha, stream_info = parse_ffprobe_alpha(data)
+        if not stream_info:
             return False, {}
         
-        for stream in data.get('streams', []):
-            if stream.get('codec_type') == 'video':
-                codec_name = stream.get('codec_name', '')
-                pix_fmt = stream.get('pix_fmt', '')
-                
-                print(f"视频编解码器: {codec_name}")
-                print(f"像素格式: {pix_fmt}")
-                
-                # 检查HEVC Alpha支持的像素格式
-                hevc_alpha_formats = ['yuva420p', 'yuva422p', 'yuva444p', 'yuva420p10le', 'yuva422p10le', 'yuva444p10le']
-                # 其他alpha格式
-                other_alpha_formats = ['rgba', 'argb', 'bgra', 'abgr', 'ya', 'gbra']
-                
-                all_alpha_formats = hevc_alpha_formats + other_alpha_formats
-                has_alpha = any(alpha_fmt in pix_fmt.lower() for alpha_fmt in all_alpha_formats)
-                
-                stream_info = {
-                    'codec': codec_name,
-                    'pixel_format': pix_fmt,
-                    'has_alpha': has_alpha,
-                    'is_hevc': codec_name.lower() in ['hevc', 'h265'],
-                    'width': stream.get('width'),
-                    'height': stream.get('height'),
-                    'nb_frames': stream.get('nb_frames', 'N/A')
-                }
-                
-                if has_alpha:
-                    if codec_name.lower() in ['hevc', 'h265']:
-                        print("✅ 检测到HEVC Alpha视频")
-                    else:
-                        print(f"✅ 检测到Alpha通道 ({codec_name})")
-                else:
-                    print("❌ 未检测到Alpha通道")
-                
-                return has_alpha, stream_info
+        print(f"视频编解码器: {stream_info['codec']}")
+        print(f"像素格式: {stream_info['pixel_format']}")
         
-        return False, {}
+        if has_alpha:
+            if stream_info['is_hevc']:
+                print("✅ 检测到HEVC Alpha视频")
+            else:
+                print(f"✅ 检测到Alpha通道 ({stream_info['codec']})")
+        else:
+            print("❌ 未检测到Alpha通道")
+        
+        return has_alpha, stream_info
         
     except Exception as e:
         print(f"FFprobe检查过程中出现错误: {e}")
         return False, {}
 
-def extract_alpha_frame_ffmpeg(video_path, output_path=None, frame_number=1):
+def extract_alpha_frame_ffmpeg(video_path, output_path=None, frame_number=1, verbose=True, seek=False):
     """
     使用FFmpeg提取带alpha通道的帧
+    seek=True 时按ffprobe帧率换算时间，用输入端 -ss 从关键帧开始解码，不必从头解码到目标帧
     """
     try:
         if output_path is None:
             with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
                 output_path = temp_file.name
         
+        if seek:
+            video, error = _video_stream(video_path)
+            fps = frame_rate(video) if video else None
+            if not fps:
+                if verbose:
+                    print(f"无法确定帧率: {error or '未知'}")
+                return False, None, None
+            input_args = ['-ss', f'{frame_seek_time(fps, frame_number):.6f}', '-i', video_path]
+            select_args = []
+        else:
+            input_args = ['-i', video_path]
+            select_args = ['-vf', f'select=eq(n\\,{frame_number-1})']
+        
         cmd = [
             'ffmpeg',
-            '-i', video_path,
-            '-vf', f'select=eq(n\\,{frame_number-1})',
+            *input_args,
+            *select_args,
             '-vframes', '1',
             '-pix_fmt', 'rgba',  # 强制输出为RGBA格式
             '-y',
@@ -95,7 +163,8 @@ def extract_alpha_frame_ffmpeg(video_path, output_path=None, frame_number=1):
         result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore')
         
         if result.returncode != 0:
-            print(f"FFmpeg帧提取失败: {result.stderr}")
+            if verbose:
+                print(f"FFmpeg帧提取失败: {result.stderr}")
             return False, None, None
         
         # 分析提取的帧
@@ -120,19 +189,22 @@ def extract_alpha_frame_ffmpeg(video_path, output_path=None, frame_number=1):
                         'has_transparency': transparency_ratio > 0
                     }
                     
-                    print(f"提取帧模式: {img.mode}")
-                    print(f"Alpha值范围: [{min_alpha}, {max_alpha}]")
-                    print(f"透明像素比例: {transparency_ratio:.2%}")
+                    if verbose:
+                        print(f"提取帧模式: {img.mode}")
+                        print(f"Alpha值范围: [{min_alpha}, {max_alpha}]")
+                        print(f"透明像素比例: {transparency_ratio:.2%}")
                     
                     return True, alpha_info, output_path
                 else:
-                    print(f"提取帧模式: {img.mode} (无alpha通道)")
+                    if verbose:
+                        print(f"提取帧模式: {img.mode} (无alpha通道)")
                     return False, None, output_path
         
         return False, None, None
         
     except Exception as e:
-        print(f"帧提取过程中出现错误: {e}")
+        if verbose:
+            print(f"帧提取过程中出现错误: {e}")
         return False, None, None
 
 def check_mov_alpha_channel_opencv(video_path):
@@ -193,47 +265,272 @@ def check_mov_alpha_channel_opencv(video_path):
         print(f"检查过程中出现错误: {e}")
         return False
 
-def detailed_alpha_analysis(video_path, sample_frames=5):
+def _read_exact(stream, view):
+    """把管道数据读满 view，返回实际读到的字节数 (流结束时小于 len(view))"""
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+def _video_stream(video_path):
+    """返回 (首个视频流的ffprobe信息, error)"""
+    data, error = probe_video(video_path)
+    if error:
+        return None, error
+    video = next((st for st in data.get('streams', []) if st.get('codec_type') == 'video'), None)
+    if not video or not video.get('width') or not video.get('height'):
+        return None, "未找到视频流"
+    return video, None
+
+def _run_alpha_pipe(cmd, frame_bytes, on_frame):
     """
-    对视频进行详细的透明通道分析
+    运行输出rawvideo alpha平面的FFmpeg命令，每读满一帧调用 on_frame(alpha)
+    alpha 是映射在同一块复用缓冲区上的一维uint8数组，回调返回后即被覆盖
+    返回 (帧数, error)
     """
-    cap = cv2.VideoCapture(video_path)
+    buffer = bytearray(frame_bytes)
+    view = memoryview(buffer)
+    alpha = np.frombuffer(buffer, dtype=np.uint8)
+    count = 0
     
-    if not cap.isOpened():
-        return
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        return 0, f"无法运行FFmpeg: {e}"
+    try:
+        while _read_exact(proc.stdout, view) == frame_bytes:
+            on_frame(alpha)
+            count += 1
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read().decode('utf-8', errors='ignore')
+        proc.stderr.close()
+        proc.wait()
     
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    fps = cap.get(cv2.CAP_PROP_FPS)
+    if proc.returncode != 0 and count == 0:
+        return 0, f"FFmpeg解码失败: {stderr}"
+    return count, None
+
+def _frame_alpha_info(frame_hist, frame_bytes):
+    nonzero = np.flatnonzero(frame_hist)
+    transparency_ratio = float(1 - frame_hist[255] / frame_bytes)
+    return {
+        'unique_values': int(nonzero.size),
+        'alpha_range': [int(nonzero[0]), int(nonzero[-1])],
+        'transparency_ratio': transparency_ratio,
+        'has_transparency': transparency_ratio > 0
+    }
+
+def stream_alpha_statistics(video_path, stride=1, max_frames=None, per_frame=True):
+    """
+    单个FFmpeg进程把解码后的alpha平面以rawvideo写到stdout，逐帧用np.frombuffer
+    直接映射到复用的缓冲区上统计，不落盘、不随视频长度增长内存
     
-    print(f"\n=== 视频详细信息 ===")
-    print(f"总帧数: {total_frames}")
-    print(f"帧率: {fps}")
-    print(f"采样分析 {min(sample_frames, total_frames)} 帧")
+    stride > 1 时每隔 stride 帧取一帧 (由FFmpeg的select滤镜跳过，长4K素材可快速完成)
+    返回 (stats, error)，stats 包含整段直方图、透明像素比例以及逐帧统计
+    """
+    video, error = _video_stream(video_path)
+    if error:
+        return None, error
+    width, height = int(video['width']), int(video['height'])
     
-    transparency_found = False
+    # 先统一转换为rgba (无alpha的素材得到全不透明)，再只取alpha平面，管道流量为rgba的1/4
+    filters = []
+    if stride > 1:
+        filters.append(f'select=not(mod(n\\,{stride}))')
+    filters += ['format=rgba', 'alphaextract']
+    cmd = ['ffmpeg', '-v', 'error', '-i', video_path, '-vf', ','.join(filters), '-vsync', '0']
+    if max_frames:
+        cmd += ['-frames:v', str(max_frames)]
+    cmd += ['-f', 'rawvideo', '-pix_fmt', 'gray', '-']
     
-    for i in range(min(sample_frames, total_frames)):
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        if len(frame.shape) == 3 and frame.shape[2] == 4:
-            alpha = frame[:, :, 3]
-            
-            # 统计透明像素
-            transparent_pixels = np.sum(alpha < 255)
-            total_pixels = alpha.shape[0] * alpha.shape[1]
-            transparency_ratio = transparent_pixels / total_pixels
-            
-            print(f"帧 {i+1}: 透明像素 {transparent_pixels}/{total_pixels} ({transparency_ratio:.2%})")
-            
-            if transparent_pixels > 0:
-                transparency_found = True
-                # 显示透明度的统计信息
-                print(f"  Alpha值范围: [{np.min(alpha)}, {np.max(alpha)}]")
+    frame_bytes = width * height
+    histogram = np.zeros(256, dtype=np.int64)
+    frames = []
     
-    cap.release()
-    return transparency_found
+    def on_frame(alpha):
+        frame_hist = np.bincount(alpha, minlength=256)
+        histogram[:] += frame_hist
+        if per_frame:
+            info = _frame_alpha_info(frame_hist, frame_bytes)
+            frames.append({'index': len(frames) * stride, 'transparency_ratio': info['transparency_ratio'],
+                           'alpha_range': info['alpha_range']})
+    
+    count, error = _run_alpha_pipe(cmd, frame_bytes, on_frame)
+    if error:
+        return None, error
+    
+    total = histogram.sum()
+    nonzero = np.flatnonzero(histogram)
+    stats = {
+        'width': width,
+        'height': height,
+        'frames_analyzed': count,
+        'stride': stride,
+        'histogram': histogram.tolist(),
+        'alpha_range': [int(nonzero[0]), int(nonzero[-1])] if total else [255, 255],
+        'transparency_ratio': float(1 - histogram[255] / total) if total else 0.0,
+        'fully_transparent_ratio': float(histogram[0] / total) if total else 0.0,
+        'has_transparency': bool(total and histogram[255] < total),
+        'frames': frames
+    }
+    return stats, None
+
+# 管道输出的平面: alpha 用于透明度统计，luma 用于基准测试中校验帧是否取对
+_PLANE_FILTERS = {'alpha': 'format=rgba,alphaextract', 'luma': 'format=gray'}
+
+def frame_rate(stream):
+    """解析ffprobe的帧率字符串 (如 30000/1001)，优先使用 avg_frame_rate"""
+    for key in ('avg_frame_rate', 'r_frame_rate'):
+        num, _, den = str(stream.get(key, '0/1')).partition('/')
+        try:
+            fps = float(num) / float(den or 1)
+        except (ValueError, ZeroDivisionError):
+            continue
+        if fps > 0:
+            return fps
+    return None
+
+def frame_seek_time(fps, frame_number):
+    """
+    第 frame_number 帧 (从1开始) 的输入端 -ss 时间
+    取前半帧的位置：-ss 丢弃时间戳小于该值的帧，留出半帧余量避免浮点误差取到相邻帧
+    """
+    return max(0.0, (frame_number - 1.5) / fps)
+
+def extract_alpha_frames(video_path, frame_numbers, seek=True, batch_size=32, plane='alpha'):
+    """
+    一次FFmpeg调用提取多个帧 (帧号从1开始) 并统计alpha，返回 ({帧号: alpha_info}, error)
+    
+    seek=True: 每个帧号作为一路 -ss 输入，FFmpeg从其前一个关键帧解码到目标帧，
+               各路 trim 出一帧后 concat 成一条rawvideo流，耗时与帧在视频中的位置无关
+    seek=False: 单路输入用 select 滤镜挑帧，需要从头解码到最后一个目标帧
+    """
+    video, error = _video_stream(video_path)
+    if error:
+        return None, error
+    width, height = int(video['width']), int(video['height'])
+    fps = frame_rate(video)
+    if seek and not fps:
+        return None, "无法确定帧率，不能按时间定位"
+    
+    wanted = sorted({int(n) for n in frame_numbers if int(n) >= 1})
+    frame_bytes = width * height
+    plane_filter = _PLANE_FILTERS[plane]
+    results = {}
+    
+    if seek:
+        batches = [wanted[i:i + batch_size] for i in range(0, len(wanted), batch_size)]
+    else:
+        batches = [wanted]
+    
+    for batch in batches:
+        if not batch:
+            continue
+        if seek:
+            cmd = ['ffmpeg', '-v', 'error']
+            for n in batch:
+                cmd += ['-ss', f'{frame_seek_time(fps, n):.6f}', '-i', video_path]
+            chains = [f'[{i}:v]trim=end_frame=1,setpts=PTS-STARTPTS,{plane_filter}[v{i}]' for i in range(len(batch))]
+            labels = ''.join(f'[v{i}]' for i in range(len(batch)))
+            graph = ';'.join(chains) + f';{labels}concat=n={len(batch)}:v=1:a=0[out]'
+            cmd += ['-filter_complex', graph, '-map', '[out]']
+        else:
+            expr = '+'.join(f'eq(n\\,{n - 1})' for n in batch)
+            cmd = ['ffmpeg', '-v', 'error', '-i', video_path, '-vf', f'select={expr},{plane_filter}']
+            cmd += ['-frames:v', str(len(batch))]
+        cmd += ['-vsync', '0', '-f', 'rawvideo', '-pix_fmt', 'gray', '-']
+        
+        order = iter(batch)
+        
+        def on_frame(alpha):
+            frame_number = next(order, None)
+            if frame_number is None:
+                return
+            info = _frame_alpha_info(np.bincount(alpha, minlength=256), frame_bytes)
+            if plane == 'luma':
+                info['digest'] = hashlib.sha1(alpha).hexdigest()
+            results[frame_number] = info
+        
+        _, error = _run_alpha_pipe(cmd, frame_bytes, on_frame)
+        if error:
+            return results, error
+    
+    return results, None
+
+def benchmark_frame_seek(clip_path=None, duration=120, fps=30, size='1280x720', samples=8):
+    """
+    比较 select 逐帧解码与 -ss 定位两种提帧方式
+    不给出 clip_path 时用 testsrc2 生成测试片段 (mpeg4, 每2秒一个关键帧)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if clip_path is None:
+            clip_path = os.path.join(tmp, 'seek_bench.mp4')
+            cmd = ['ffmpeg', '-v', 'error', '-f', 'lavfi',
+                   '-i', f'testsrc2=size={size}:rate={fps}:duration={duration}',
+                   '-c:v', 'mpeg4', '-q:v', '5', '-g', str(2 * fps), '-y', clip_path]
+            print(f"生成测试片段: {size} {fps}fps {duration}s")
+            subprocess.run(cmd, check=True)
+        
+        video, error = _video_stream(clip_path)
+        if error:
+            print(error)
+            return None
+        total = int(video.get('nb_frames') or duration * fps)
+        # 偏向视频后半段取样，正是select方式最慢的情形
+        frames = sorted({int(total * (0.5 + 0.5 * i / samples)) for i in range(samples)})
+        late = frames[-1]
+        
+        timings = {}
+        start = time.perf_counter()
+        extract_alpha_frame_ffmpeg(clip_path, os.path.join(tmp, 'a.png'), late, verbose=False)
+        timings['single select'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        extract_alpha_frame_ffmpeg(clip_path, os.path.join(tmp, 'b.png'), late, verbose=False, seek=True)
+        timings['single seek'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        by_select, _ = extract_alpha_frames(clip_path, frames, seek=False, plane='luma')
+        timings[f'batch select x{len(frames)}'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        by_seek, _ = extract_alpha_frames(clip_path, frames, seek=True, plane='luma')
+        timings[f'batch seek x{len(frames)}'] = time.perf_counter() - start
+    
+    print(f"\n帧号: {frames}")
+    for name, seconds in timings.items():
+        print(f"  {name:<20} {seconds:8.3f}s")
+    mismatched = [n for n in frames if (by_select or {}).get(n, {}).get('digest') != (by_seek or {}).get(n, {}).get('digest')]
+    print("✅ 两种方式取到的帧完全一致" if not mismatched else f"❌ 帧内容不一致: {mismatched}")
+    return timings
+
+def detailed_alpha_analysis(video_path, sample_frames=5, stride=1):
+    """
+    对视频进行详细的透明通道分析 (FFmpeg流式解码，保留各编码的alpha通道)
+    sample_frames 为 None 时分析整段视频
+    """
+    stats, error = stream_alpha_statistics(video_path, stride=stride, max_frames=sample_frames)
+    if error:
+        print(error)
+        return False
+    
+    print(f"\n=== 视频详细信息 ===")
+    print(f"分辨率: {stats['width']}x{stats['height']}")
+    print(f"采样分析 {stats['frames_analyzed']} 帧 (间隔 {stride})")
+    
+    for frame in stats['frames']:
+        transparency_ratio = frame['transparency_ratio']
+        print(f"帧 {frame['index']+1}: 透明像素比例 {transparency_ratio:.2%}")
+        if transparency_ratio > 0:
+            print(f"  Alpha值范围: {frame['alpha_range']}")
+    
+    print(f"整体透明像素比例: {stats['transparency_ratio']:.2%}  "
+          f"完全透明: {stats['fully_transparent_ratio']:.2%}")
+    return stats['has_transparency']
 
 def comprehensive_alpha_detection(video_path):
     """
@@ -298,76 +595,78 @@ def comprehensive_alpha_detection(video_path):
     
     return final_has_alpha
 
+def classify_hevc_alpha(data):
+    """
+    根据FFprobe结果判断HEVC/Alpha类型，返回 (has_alpha, alpha_type, details)
+    """
+    # 扩展的HEVC编解码器识别
+    hevc_codecs = ['hevc', 'h265', 'hvc1', 'hev1']
+    
+    # 扩展的Alpha像素格式支持
+    alpha_formats = [
+        'yuva420p', 'yuva422p', 'yuva444p',
+        'yuva420p10le', 'yuva422p10le', 'yuva444p10le',
+        'yuva420p12le', 'yuva422p12le', 'yuva444p12le',
+        'yuva420p16le', 'yuva422p16le', 'yuva444p16le'
+    ]
+    
+    for stream in data.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            codec = stream.get('codec_name', '').lower()
+            codec_tag = stream.get('codec_tag_string', '').lower()
+            pix_fmt = stream.get('pix_fmt', '').lower()
+            
+            # 更准确的HEVC检测
+            is_hevc = (codec in hevc_codecs or 
+                      codec_tag in hevc_codecs or
+                      'hevc' in codec or 'h265' in codec)
+            
+            # 更准确的Alpha检测
+            has_alpha = any(fmt in pix_fmt for fmt in alpha_formats)
+            
+            # 提取位深度信息
+            bit_depth = 8
+            if '10le' in pix_fmt or '10be' in pix_fmt:
+                bit_depth = 10
+            elif '12le' in pix_fmt or '12be' in pix_fmt:
+                bit_depth = 12
+            elif '16le' in pix_fmt or '16be' in pix_fmt:
+                bit_depth = 16
+            
+            # 详细信息
+            details = {
+                'codec': codec,
+                'codec_tag': codec_tag,
+                'pixel_format': pix_fmt,
+                'width': stream.get('width', 0),
+                'height': stream.get('height', 0),
+                'bit_depth': bit_depth,
+                'fps': stream.get('r_frame_rate', '0/1'),
+                'container': data.get('format', {}).get('format_name', 'unknown')
+            }
+            
+            if is_hevc and has_alpha:
+                return True, f"HEVC Alpha ({bit_depth}bit)", details
+            elif has_alpha:
+                return True, f"{codec.upper()} Alpha ({bit_depth}bit)", details
+            elif is_hevc:
+                return False, f"HEVC ({bit_depth}bit, 无Alpha)", details
+            else:
+                return False, f"{codec.upper()} ({bit_depth}bit, 无Alpha)", details
+    
+    return False, "未找到视频流", {}
+
 # 使用方法
 def detect_hevc_alpha_advanced(video_path):
     """
     高级HEVC Alpha检测函数 - 支持更多格式和详细分析
     """
     try:
-        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', video_path]
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='ignore')
-        
-        if result.returncode != 0:
+        data, error = probe_video(video_path)
+        if error:
             return False, "FFprobe分析失败", {}
         
-        data = json.loads(result.stdout)
-        
-        # 扩展的HEVC编解码器识别
-        hevc_codecs = ['hevc', 'h265', 'hvc1', 'hev1']
-        
-        # 扩展的Alpha像素格式支持
-        alpha_formats = [
-            'yuva420p', 'yuva422p', 'yuva444p',
-            'yuva420p10le', 'yuva422p10le', 'yuva444p10le',
-            'yuva420p12le', 'yuva422p12le', 'yuva444p12le',
-            'yuva420p16le', 'yuva422p16le', 'yuva444p16le'
-        ]
-        
-        for stream in data.get('streams', []):
-            if stream.get('codec_type') == 'video':
-                codec = stream.get('codec_name', '').lower()
-                codec_tag = stream.get('codec_tag_string', '').lower()
-                pix_fmt = stream.get('pix_fmt', '').lower()
-                
-                # 更准确的HEVC检测
-                is_hevc = (codec in hevc_codecs or 
-                          codec_tag in hevc_codecs or
-                          'hevc' in codec or 'h265' in codec)
-                
-                # 更准确的Alpha检测
-                has_alpha = any(fmt in pix_fmt for fmt in alpha_formats)
-                
-                # 提取位深度信息
-                bit_depth = 8
-                if '10le' in pix_fmt or '10be' in pix_fmt:
-                    bit_depth = 10
-                elif '12le' in pix_fmt or '12be' in pix_fmt:
-                    bit_depth = 12
-                elif '16le' in pix_fmt or '16be' in pix_fmt:
-                    bit_depth = 16
-                
-                # 详细信息
-                details = {
-                    'codec': codec,
-                    'codec_tag': codec_tag,
-                    'pixel_format': pix_fmt,
-                    'width': stream.get('width', 0),
-                    'height': stream.get('height', 0),
-                    'bit_depth': bit_depth,
-                    'fps': stream.get('r_frame_rate', '0/1'),
-                    'container': data.get('format', {}).get('format_name', 'unknown')
-                }
-                
-                if is_hevc and has_alpha:
-                    return True, f"HEVC Alpha ({bit_depth}bit)", details
-                elif has_alpha:
-                    return True, f"{codec.upper()} Alpha ({bit_depth}bit)", details
-                elif is_hevc:
-                    return False, f"HEVC ({bit_depth}bit, 无Alpha)", details
-                else:
-                    return False, f"{codec.upper()} ({bit_depth}bit, 无Alpha)", details
-        
-        return False, "未找到视频流", {}
+        return classify_hevc_alpha(data)
         
     except Exception as e:
         return False, f"检测错误: {e}", {}
@@ -397,7 +696,104 @@ def get_conversion_suggestions(video_details, has_alpha, alpha_type):
     
     return suggestions
 
-if __name__ == "__main__":
+def scan_video(video_path, frame_check=False, frame_stride=1):
+    """
+    批量模式下单个视频的分析：只运行一次FFprobe，两种判定共用同一份结果
+    返回可直接写入报告的扁平字典
+    """
+    start = time.perf_counter()
+    record = {
+        'path': video_path,
+        'name': os.path.basename(video_path),
+        'size_bytes': os.path.getsize(video_path),
+        'codec': '', 'pixel_format': '', 'width': '', 'height': '',
+        'bit_depth': '', 'fps': '', 'container': '',
+        'has_alpha': False, 'is_hevc': False, 'alpha_type': '',
+        'frame_transparency_ratio': '', 'frames_analyzed': '', 'error': '', 'seconds': 0.0
+    }
+    
+    data, error = probe_video(video_path)
+    if error:
+        record['error'] = error.strip()
+    else:
+        has_alpha, stream_info = parse_ffprobe_alpha(data)
+        is_alpha, alpha_type, details = classify_hevc_alpha(data)
+        record.update({k: details.get(k, '') for k in ('codec', 'pixel_format', 'width', 'height',
+                                                       'bit_depth', 'fps', 'container')})
+        record['has_alpha'] = has_alpha or is_alpha
+        record['is_hevc'] = stream_info.get('is_hevc', False) or 'HEVC' in alpha_type
+        record['alpha_type'] = alpha_type
+        
+        if _persistent_cache is not None:
+            _persistent_cache.put(video_path, {k: record[k] for k in ('has_alpha', 'is_hevc', 'alpha_type')},
+                                  'verdict')
+        
+        if frame_check:
+            kind = f'frame:{frame_stride}'
+            frame_stats = _persistent_cache.get(video_path, kind) if _persistent_cache is not None else None
+            if frame_stats is None:
+                stats, _ = stream_alpha_statistics(video_path, stride=frame_stride, per_frame=False)
+                if stats:
+                    frame_stats = {k: stats[k] for k in ('transparency_ratio', 'has_transparency',
+                                                         'frames_analyzed', 'alpha_range')}
+                    if _persistent_cache is not None:
+                        _persistent_cache.put(video_path, frame_stats, kind)
+            if frame_stats:
+                record['frame_transparency_ratio'] = round(frame_stats['transparency_ratio'], 6)
+                record['frames_analyzed'] = frame_stats['frames_analyzed']
+                record['has_alpha'] = record['has_alpha'] or frame_stats['has_transparency']
+    
+    record['seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+def find_videos(root_dir, extensions=VIDEO_EXTENSIONS):
+    """递归查找目录下的视频文件"""
+    videos = []
+    for dirpath, _, filenames in os.walk(root_dir):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(extensions):
+                videos.append(os.path.join(dirpath, filename))
+    return sorted(videos)
+
+def scan_video_directory(root_dir, workers=4, frame_check=False, frame_stride=1):
+    """
+    遍历目录并用有界线程池并行分析 (工作主要在ffprobe/ffmpeg子进程中)
+    """
+    videos = find_videos(root_dir)
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(scan_video, path, frame_check, frame_stride): path for path in videos}
+        for i, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {'path': path, 'name': os.path.basename(path), 'error': f"检测错误: {e}"}
+            marker = "✅" if record.get('has_alpha') else ("⚠️" if record.get('error') else "  ")
+            print(f"[{i}/{len(videos)}] {marker} {record['name']} {record.get('alpha_type', '')}")
+            results.append(record)
+    results.sort(key=lambda r: r['path'])
+    return results
+
+def write_scan_report(results, report_path):
+    """按扩展名写出JSON或CSV报告"""
+    if report_path.lower().endswith('.csv'):
+        fieldnames = list(results[0].keys()) if results else ['path']
+        with open(report_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        summary = {
+            'total': len(results),
+            'alpha': sum(1 for r in results if r.get('has_alpha')),
+            'hevc_alpha': sum(1 for r in results if 'HEVC Alpha' in r.get('alpha_type', '')),
+            'errors': sum(1 for r in results if r.get('error')),
+        }
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'videos': results}, f, ensure_ascii=False, indent=2)
+
+def run_test_videos(test_videos):
     print("🎬 改进的HEVC Alpha检测器")
     print("=" * 60)
     print("✨ 新增功能:")
@@ -406,18 +802,6 @@ if __name__ == "__main__":
     print("   • 改进的编码处理")
     print("   • 详细的兼容性分析")
     
-    # 测试多个视频文件
-    test_videos = [
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\alpha_test_transparent.mov",
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\alpha_test_mov_prores4444.mov",
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\hevc_alpha_test.mp4",
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\均匀分布.mov",
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\卡方分布.mp4",
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\泊松分布.mp4",
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\正态分布.mp4",
-        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\指数分布.mp4"
-        r"D:\project\数字人任务\课程介绍视频\16.mov"
-    ]
     
     alpha_videos = []
     hevc_alpha_videos = []
@@ -516,3 +900,62 @@ if __name__ == "__main__":
     print("   • 详细的视频流分析")
     print("💡 现在可以准确检测和分析各种HEVC Alpha视频格式!")
 
+
+def main():
+    parser = argparse.ArgumentParser(description="HEVC Alpha检测器")
+    parser.add_argument('--scan', type=str, default=None, help="批量扫描的视频目录 (如 static/videos)")
+    parser.add_argument('--workers', type=int, default=4, help="并行分析的最大线程数")
+    parser.add_argument('--report', type=str, default='alpha_report.json', help="报告文件 (.json 或 .csv)")
+    parser.add_argument('--frame-check', action='store_true', help="额外用FFmpeg流式统计整段视频的透明像素")
+    parser.add_argument('--stride', type=int, default=1, help="--frame-check 时每隔多少帧取一帧")
+    parser.add_argument('--bench-seek', nargs='?', const='', default=None, metavar='CLIP',
+                        help="比较select与-ss提帧速度 (不指定CLIP时生成testsrc2测试片段)")
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE_PATH, help="持久化探测缓存 (SQLite)")
+    parser.add_argument('--no-cache', action='store_true', help="不使用持久化缓存")
+    parser.add_argument('--cache-hash', action='store_true', help="文件身份额外校验头尾哈希")
+    parser.add_argument('--cache-max-age', type=float, default=None, help="缓存条目最长保留天数")
+    parser.add_argument('--cache-max-entries', type=int, default=None, help="缓存最多保留的文件数")
+    args = parser.parse_args()
+    
+    if args.bench_seek is not None:
+        benchmark_frame_seek(args.bench_seek or None)
+        return
+    
+    cache = None
+    if not args.no_cache:
+        cache = ProbeCache(args.cache, max_age_days=args.cache_max_age,
+                           max_entries=args.cache_max_entries, use_hash=args.cache_hash)
+        set_probe_cache(cache)
+    
+    if args.scan:
+        start = time.perf_counter()
+        results = scan_video_directory(args.scan, workers=args.workers, frame_check=args.frame_check,
+                                       frame_stride=max(1, args.stride))
+        write_scan_report(results, args.report)
+        alpha_count = sum(1 for r in results if r.get('has_alpha'))
+        print(f"\n共 {len(results)} 个视频，{alpha_count} 个包含Alpha，用时 {time.perf_counter() - start:.1f}s")
+        print(f"报告已写入: {args.report}")
+        if cache is not None:
+            cache.evict()
+            stats = cache.stats()
+            print(f"探测缓存: 命中 {stats['hits']} / 未命中 {stats['misses']}，共 {stats['files']} 个文件")
+            cache.close()
+        return
+    
+    # 测试多个视频文件
+    test_videos = [
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\alpha_test_transparent.mov",
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\alpha_test_mov_prores4444.mov",
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\hevc_alpha_test.mp4",
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\均匀分布.mov",
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\卡方分布.mp4",
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\泊松分布.mp4",
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\正态分布.mp4",
+        # r"C:\Users\12919\Desktop\可视化教学案例\static\videos\指数分布.mp4"
+        r"D:\project\数字人任务\课程介绍视频\16.mov"
+    ]
+    run_test_videos(test_videos)
+
+
+if __name__ == "__main__":
+    main()
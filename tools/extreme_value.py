@@ -0,0 +1,288 @@
+"""
+极值分布向量化计算引擎 (Gumbel / GEV)
+
+所有函数都按 NumPy 广播规则计算，参数 (mu, sigma, xi) 可以是标量或数组，
+例如 mu[:, None] 与 x[None, :] 组合即可一次得到整张参数网格上的曲线。
+out= 传入预分配的缓冲区以避免重复分配，dtype=np.float32 可用于大批量计算。
+
+用法:
+    python tools/extreme_value.py bench --points 10000000 --dtype float32
+    python tools/extreme_value.py export --out static/data/flood_curves.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+# |xi| 小于该阈值时按 Gumbel 极限处理
+XI_EPS = 1e-12
+
+# 与 probability_distributions.html 中 updateFloodReturnChart 一致的重现期
+RETURN_PERIODS = [2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+
+def _prepare(arrays, out, dtype):
+    """统一 dtype 并确定广播后的输出形状，必要时分配 out"""
+    if out is not None:
+        dtype = out.dtype
+    arrays = [np.asarray(a, dtype=dtype) for a in arrays]
+    shape = np.broadcast_shapes(*(a.shape for a in arrays))
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f"out 形状 {out.shape} 与广播形状 {shape} 不一致")
+    return arrays, out
+
+
+def _standardize(x, mu, scale, out):
+    """out = (x - mu) / scale"""
+    np.subtract(x, mu, out=out)
+    np.divide(out, scale, out=out)
+    return out
+
+
+def _gev_reduced(z, xi, out):
+    """GEV 约化变量 y = (1 + xi*z)^(-1/xi)，xi→0 时为 exp(-z)
+
+    支撑集之外：xi>0 (低于下界) 取 +inf 使 F=0；xi<0 (高于上界) 取 0 使 F=1。
+    z 与 out 可以是同一个数组。
+    """
+    if xi.ndim == 0:
+        xi_val = float(xi)
+        if abs(xi_val) < XI_EPS:
+            np.negative(z, out=out)
+            return np.exp(out, out=out)
+        t = np.multiply(z, xi, out=out)
+        t += 1
+        outside = t <= 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.power(t, -1.0 / xi, out=out)
+        out[outside] = np.inf if xi_val > 0 else 0.0
+        return out
+
+    xi = np.broadcast_to(xi, out.shape)
+    small = np.abs(xi) < XI_EPS
+    gumbel = np.exp(-z)
+    t = np.multiply(z, xi, out=out)
+    t += 1
+    outside = t <= 0
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        np.power(t, -1.0 / np.where(small, 1, xi), out=out)
+    np.copyto(out, np.where(xi > 0, np.inf, 0.0).astype(out.dtype), where=outside)
+    np.copyto(out, gumbel, where=small)
+    return out
+
+
+# ---- Gumbel ----
+def gumbel_pdf(x, mu=0.0, beta=1.0, out=None, dtype=np.float64):
+    (x, mu, beta), out = _prepare((x, mu, beta), out, dtype)
+    z = _standardize(x, mu, beta, out)
+    e = np.exp(-z)
+    z += e
+    np.negative(z, out=out)
+    np.exp(out, out=out)
+    np.divide(out, beta, out=out)
+    return out
+
+
+def gumbel_cdf(x, mu=0.0, beta=1.0, out=None, dtype=np.float64):
+    (x, mu, beta), out = _prepare((x, mu, beta), out, dtype)
+    _standardize(x, mu, beta, out)
+    np.negative(out, out=out)
+    np.exp(out, out=out)
+    np.negative(out, out=out)
+    return np.exp(out, out=out)
+
+
+def gumbel_ppf(p, mu=0.0, beta=1.0, out=None, dtype=np.float64):
+    """分位数 x_p = mu - beta * ln(-ln p)"""
+    (p, mu, beta), out = _prepare((p, mu, beta), out, dtype)
+    np.log(p, out=out)
+    np.negative(out, out=out)
+    np.log(out, out=out)
+    np.multiply(out, beta, out=out)
+    return np.subtract(mu, out, out=out)
+
+
+def gumbel_return_level(T, mu=0.0, beta=1.0, out=None, dtype=np.float64):
+    """T 年一遇设计值 x_T = mu - beta * ln(-ln(1 - 1/T))"""
+    (T, mu, beta), out = _prepare((T, mu, beta), out, dtype)
+    np.reciprocal(T, out=out)
+    np.negative(out, out=out)
+    np.log1p(out, out=out)
+    np.negative(out, out=out)
+    np.log(out, out=out)
+    np.multiply(out, beta, out=out)
+    return np.subtract(mu, out, out=out)
+
+
+# ---- GEV ----
+def gev_pdf(x, mu=0.0, sigma=1.0, xi=0.0, out=None, dtype=np.float64):
+    """f(x) = y^(1+xi) * exp(-y) / sigma，y 为约化变量"""
+    (x, mu, sigma, xi), out = _prepare((x, mu, sigma, xi), out, dtype)
+    z = _standardize(x, mu, sigma, out)
+    y = _gev_reduced(z, xi, out)
+    below = np.isposinf(y)
+    e = np.exp(-y)
+    with np.errstate(invalid="ignore", over="ignore"):
+        np.power(y, 1 + xi, out=out)
+        out *= e
+    np.divide(out, sigma, out=out)
+    out[below] = 0.0
+    return out
+
+
+def gev_cdf(x, mu=0.0, sigma=1.0, xi=0.0, out=None, dtype=np.float64):
+    """F(x) = exp(-(1 + xi*(x-mu)/sigma)^(-1/xi))"""
+    (x, mu, sigma, xi), out = _prepare((x, mu, sigma, xi), out, dtype)
+    z = _standardize(x, mu, sigma, out)
+    y = _gev_reduced(z, xi, out)
+    np.negative(y, out=out)
+    return np.exp(out, out=out)
+
+
+def _gev_from_reduced(y, mu, sigma, xi, out):
+    """由 y = -ln p 计算分位数：mu + sigma/xi * (y^(-xi) - 1)，xi→0 时为 mu - sigma*ln y"""
+    if xi.ndim == 0 and abs(float(xi)) < XI_EPS:
+        np.log(y, out=out)
+        np.multiply(out, sigma, out=out)
+        return np.subtract(mu, out, out=out)
+    small = np.abs(xi) < XI_EPS
+    safe_xi = np.where(small, 1, xi) if xi.ndim else xi
+    gumbel = np.log(y) if small.any() else None
+    np.power(y, -safe_xi, out=out)
+    out -= 1
+    np.divide(out, safe_xi, out=out)
+    if gumbel is not None:
+        np.negative(gumbel, out=gumbel)
+        np.copyto(out, np.broadcast_to(gumbel, out.shape), where=np.broadcast_to(small, out.shape))
+    np.multiply(out, sigma, out=out)
+    return np.add(out, mu, out=out)
+
+
+def gev_ppf(p, mu=0.0, sigma=1.0, xi=0.0, out=None, dtype=np.float64):
+    (p, mu, sigma, xi), out = _prepare((p, mu, sigma, xi), out, dtype)
+    y = np.log(p, out=out)
+    np.negative(y, out=y)
+    return _gev_from_reduced(y, mu, sigma, xi, out)
+
+
+def gev_return_level(T, mu=0.0, sigma=1.0, xi=0.0, out=None, dtype=np.float64):
+    """T 年一遇设计值 x_T = mu + sigma/xi * ((-ln(1 - 1/T))^(-xi) - 1)"""
+    (T, mu, sigma, xi), out = _prepare((T, mu, sigma, xi), out, dtype)
+    np.reciprocal(T, out=out)
+    np.negative(out, out=out)
+    np.log1p(out, out=out)
+    np.negative(out, out=out)
+    return _gev_from_reduced(out, mu, sigma, xi, out)
+
+
+def gev_return_period(x, mu=0.0, sigma=1.0, xi=0.0, out=None, dtype=np.float64):
+    """重现期 T = 1 / (1 - F(x))，用 expm1 保持高分位处的精度"""
+    (x, mu, sigma, xi), out = _prepare((x, mu, sigma, xi), out, dtype)
+    z = _standardize(x, mu, sigma, out)
+    y = _gev_reduced(z, xi, out)
+    np.negative(y, out=out)
+    np.expm1(out, out=out)
+    np.negative(out, out=out)
+    with np.errstate(divide="ignore"):
+        return np.reciprocal(out, out=out)
+
+
+def gumbel_return_period(x, mu=0.0, beta=1.0, out=None, dtype=np.float64):
+    return gev_return_period(x, mu, beta, 0.0, out=out, dtype=dtype)
+
+
+# ---- 基准测试与曲线预计算 ----
+def benchmark(points=10_000_000, dtype=np.float64, repeat=3):
+    """对 10^7 量级的点评估各函数，返回 {函数名: 最佳耗时(秒)}"""
+    rng = np.random.default_rng(0)
+    n_params = 100
+    mu = rng.uniform(10, 20, n_params).astype(dtype)[:, None]
+    sigma = rng.uniform(1, 4, n_params).astype(dtype)[:, None]
+    xi = rng.uniform(-0.3, 0.3, n_params).astype(dtype)[:, None]
+    x = np.linspace(0, 40, points // n_params, dtype=dtype)[None, :]
+    p = np.linspace(0.001, 0.999, points // n_params, dtype=dtype)[None, :]
+    out = np.empty((n_params, x.shape[1]), dtype=dtype)
+
+    cases = {
+        "gumbel_pdf": lambda: gumbel_pdf(x, mu, sigma, out=out),
+        "gumbel_cdf": lambda: gumbel_cdf(x, mu, sigma, out=out),
+        "gumbel_ppf": lambda: gumbel_ppf(p, mu, sigma, out=out),
+        "gev_pdf": lambda: gev_pdf(x, mu, sigma, xi, out=out),
+        "gev_cdf": lambda: gev_cdf(x, mu, sigma, xi, out=out),
+        "gev_ppf": lambda: gev_ppf(p, mu, sigma, xi, out=out),
+    }
+    timings = {}
+    for name, fn in cases.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings, out.size
+
+
+def precompute_flood_curves(param_sets, n_points=201):
+    """为洪水频率分析页面预计算 PDF 与重现期曲线
+
+    x 范围与 updateFloodPdfChart 保持一致：[max(0, mu-4s), mu+6s]。
+    """
+    curves = {}
+    for dist, mu, scale, xi in param_sets:
+        x = np.linspace(max(0.0, mu - 4 * scale), mu + 6 * scale, n_points)
+        pdf = gev_pdf(x, mu, scale, xi)
+        levels = gev_return_level(np.array(RETURN_PERIODS, dtype=float), mu, scale, xi)
+        key = f"{dist}|{mu:.2f}|{scale:.2f}|{xi:.2f}"
+        curves[key] = {
+            "x": [round(float(v), 1) for v in x],
+            "pdf": [round(float(v), 6) for v in pdf],
+            "return_levels": [round(float(v), 4) for v in levels],
+        }
+    return {"return_periods": RETURN_PERIODS, "curves": curves}
+
+
+# 页面默认值与案例预设 (probability_distributions.html)
+FLOOD_PAGE_PARAMS = [
+    ("gumbel", 15.5, 2.8, 0.0),
+    ("gumbel", 16.8, 2.1, 0.0),
+    ("gumbel", 18.5, 3.2, 0.0),
+    ("gev", 15.2, 2.5, -0.1),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized Gumbel/GEV engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bench = sub.add_parser("bench", help="评估 10^7 点的吞吐量")
+    bench.add_argument("--points", type=int, default=10_000_000)
+    bench.add_argument("--dtype", choices=["float32", "float64"], default="float64")
+    bench.add_argument("--repeat", type=int, default=3)
+
+    export = sub.add_parser("export", help="导出页面使用的预计算曲线 (JSON)")
+    export.add_argument("--out", type=str, default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        timings, size = benchmark(args.points, np.dtype(args.dtype), args.repeat)
+        print(f"点数: {size:,} ({args.dtype})")
+        for name, seconds in timings.items():
+            print(f"  {name:<12} {seconds * 1000:8.1f} ms  {size / seconds / 1e6:8.1f} M点/秒")
+    else:
+        root = Path(__file__).resolve().parent.parent
+        out_path = Path(args.out) if args.out else root / "static" / "data" / "flood_curves.json"
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        data = precompute_flood_curves(FLOOD_PAGE_PARAMS)
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        print(f"已导出 {len(data['curves'])} 组曲线: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,74 @@
 import os
 from pathlib import Path
 import argparse
+import hashlib
+import inspect
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import matplotlib
+
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+import matplotlib.text
+from matplotlib.mathtext import MathTextParser
+from matplotlib.textpath import TextToPath
+
+import bootstrap_return_levels
+import extreme_value
+import fit_extreme_value
+import optimize_svgs
+
+
+MANIFEST_NAME = "flood_slides_manifest.json"
+
+STYLE = {
+    "figure.figsize": (16, 9),
+    "figure.dpi": 120,
+    "savefig.dpi": 120,
+    "font.size": 18,
+    "font.family": "sans-serif",
+    "font.sans-serif": ["Microsoft YaHei", "SimHei", "DejaVu Sans"],
+    "mathtext.fontset": "cm",
+    "axes.facecolor": "#0b1221",
+    "figure.facecolor": "#0b1221",
+    "text.color": "#e5e7eb",
+    "axes.labelcolor": "#e5e7eb",
+    "xtick.color": "#9ca3af",
+    "ytick.color": "#9ca3af",
+    "axes.edgecolor": "#374151",
+    "grid.color": "#374151",
+    "svg.fonttype": "path",
+    "svg.hashsalt": "flood-slides",
+}
 
 
 def setup_style():
-    matplotlib.rcParams.update({
-        "figure.figsize": (16, 9),
-        "figure.dpi": 120,
-        "savefig.dpi": 120,
-        "font.size": 18,
-        "font.family": "sans-serif",
-        "font.sans-serif": ["Microsoft YaHei", "SimHei", "DejaVu Sans"],
-        "mathtext.fontset": "cm",
-        "axes.facecolor": "#0b1221",
-        "figure.facecolor": "#0b1221",
-        "text.color": "#e5e7eb",
-        "axes.labelcolor": "#e5e7eb",
-        "xtick.color": "#9ca3af",
-        "ytick.color": "#9ca3af",
-        "axes.edgecolor": "#374151",
-        "grid.color": "#374151",
-    })
+    matplotlib.rcParams.update(STYLE)
+
+
+def enable_mathtext_cache():
+    """让所有渲染器共用一个 TextToPath (及其 mathtext 解析器)
+
+    matplotlib 每创建一个渲染器就新建一个 MathTextParser，而解析结果的 lru_cache
+    以解析器实例为键，所以同一公式在每张图 (bbox_inches="tight" 时甚至每次绘制)
+    都要重新排版。共用解析器后，同一进程内每个公式只排版一次。
+    """
+    shared = TextToPath()
+    matplotlib.text.TextToPath = lambda: shared
+
+
+def mathtext_cache_info():
+    return MathTextParser._parse_cached.cache_info()
+
+
+def setup_renderer(rc_overrides=None):
+    """进程内的渲染准备 (主进程与进程池子进程都会调用)：样式、命令行覆盖的 rcParams、mathtext 缓存"""
+    setup_style()
+    if rc_overrides:
+        matplotlib.rcParams.update(rc_overrides)
+    enable_mathtext_cache()
 
 
 def make_canvas():
@@ -32,36 +77,201 @@ def make_canvas():
     return fig, ax
 
 
+def styled_axes(fig, spec, title=None):
+    """按深色主题创建绘图坐标轴：背景、网格、坐标轴线与刻度颜色"""
+    ax = fig.add_subplot(spec)
+    ax.set_facecolor("#0b1221")
+    ax.grid(True, alpha=0.25)
+    ax.spines["bottom"].set_color("#374151")
+    ax.spines["left"].set_color("#374151")
+    ax.tick_params(colors="#9ca3af")
+    if title:
+        ax.set_title(title, color="#a5b4fc")
+    return ax
+
+
+def styled_legend(ax):
+    ax.legend(facecolor="#111827", edgecolor="#374151", labelcolor="#e5e7eb")
+
+
+def make_plot_slide(titles):
+    """上半部分为标题区、下半部分为一个或两个图表的幻灯片模板
+
+    返回 (fig, ax_title, [绘图坐标轴...])，绘图坐标轴数量与 titles 相同。
+    """
+    fig = plt.figure(figsize=(16, 9), facecolor="#0b1221")
+    gs = fig.add_gridspec(2, 2)
+    ax_title = fig.add_subplot(gs[0, :])
+    ax_title.set_axis_off()
+    if len(titles) == 1:
+        axes = [styled_axes(fig, gs[1, :], titles[0])]
+    else:
+        axes = [styled_axes(fig, gs[1, i], title) for i, title in enumerate(titles)]
+    return fig, ax_title, axes
+
+
 def save_svg(fig, out_path):
     out_path.parent.mkdir(parents=True, exist_ok=True)
     fig.savefig(out_path, format="svg", bbox_inches="tight")
     plt.close(fig)
 
 
+# ---- Slide registry ----
+# 名称 -> {"func", "filename", "params"}，按注册顺序渲染
+SLIDES = {}
+
+
+def register_slide(filename, **params):
+    """注册幻灯片：函数接收 params 并返回 Figure，由渲染器负责保存"""
+    def decorator(func):
+        SLIDES[func.__name__] = {"func": func, "filename": filename, "params": params}
+        return func
+    return decorator
+
+
+# 幻灯片函数共用的绘图辅助函数在本模块里，计算与后处理在以下模块里，任何一处改动都要重新生成
+CODE_MODULES = (bootstrap_return_levels, extreme_value, fit_extreme_value, optimize_svgs)
+_code_digest = None
+
+
+def code_digest():
+    """本模块与 CODE_MODULES 源码的摘要"""
+    global _code_digest
+    if _code_digest is None:
+        h = hashlib.sha256()
+        for path in [__file__] + [module.__file__ for module in CODE_MODULES]:
+            h.update(Path(path).name.encode("utf-8"))
+            h.update(Path(path).read_bytes())
+        _code_digest = h.hexdigest()
+    return _code_digest
+
+
+def slide_hash(name, postprocess=None, rc_overrides=None):
+    """幻灯片内容哈希：函数源码 + 共用代码摘要 + 参数 + 样式 rcParams (含命令行覆盖) + 后处理选项"""
+    slide = SLIDES[name]
+    rc_overrides = rc_overrides or {}
+    key = {
+        "source": inspect.getsource(slide["func"]),
+        "code": code_digest(),
+        "params": slide["params"],
+        "rcParams": {k: rc_overrides.get(k, STYLE[k]) for k in STYLE},
+        "rc_overrides": rc_overrides,
+        "matplotlib": matplotlib.__version__,
+        "postprocess": postprocess,
+    }
+    blob = json.dumps(key, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load_manifest(out_dir):
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def render_slide(name, out_dir, params=None, postprocess=None):
+    """渲染单张幻灯片，返回各阶段耗时（秒）：build 为构建图形，save 为排版与写出 SVG
+
+    postprocess 为 optimize_svgs.optimize_file 的参数，给出时结果中附带 size 统计。
+    """
+    slide = SLIDES[name]
+    params = slide["params"] if params is None else params
+    out_path = Path(out_dir) / slide["filename"]
+    start = time.perf_counter()
+    fig = slide["func"](**params)
+    built = time.perf_counter()
+    save_svg(fig, out_path)
+    done = time.perf_counter()
+    timing = {"build": built - start, "save": done - built, "total": done - start, "pid": os.getpid()}
+    if postprocess is not None:
+        timing["size"] = optimize_svgs.optimize_file(out_path, **postprocess)
+        timing["total"] = time.perf_counter() - start
+    return timing
+
+
+def _render_worker(name, out_dir, params, postprocess):
+    # 子进程入口：参数由主进程传入以保留覆盖值
+    return name, render_slide(name, out_dir, params, postprocess)
+
+
+def print_timing_report(rendered, skipped):
+    """按耗时降序打印每张幻灯片的构建/保存时间"""
+    print(f"  {'slide':<20} {'build':>8} {'save':>8} {'total':>8}  pid")
+    for name, t in sorted(rendered.items(), key=lambda item: -item[1]["total"]):
+        print(f"  {SLIDES[name]['filename']:<20} {t['build']:8.2f} {t['save']:8.2f} {t['total']:8.2f}  {t['pid']}")
+    for name in skipped:
+        print(f"  {SLIDES[name]['filename']:<20} {'-':>8} {'-':>8} {'-':>8}  (unchanged)")
+    total = sum(t["total"] for t in rendered.values())
+    print(f"  {'sum':<20} {sum(t['build'] for t in rendered.values()):8.2f} "
+          f"{sum(t['save'] for t in rendered.values()):8.2f} {total:8.2f}")
+
+
+def render_all(out_dir, jobs=1, force=False, postprocess=None, rc_overrides=None):
+    """渲染所有已注册的幻灯片，跳过哈希未变化的输出
+
+    rc_overrides 为命令行覆盖的 rcParams (如 svg.fonttype)，子进程在 setup_style() 之后应用。
+    返回 (已渲染 {名称: 耗时字典}, 已跳过 [名称])
+    """
+    manifest = load_manifest(out_dir)
+    hashes = {name: slide_hash(name, postprocess, rc_overrides) for name in SLIDES}
+
+    pending, skipped = [], []
+    for name, slide in SLIDES.items():
+        entry = manifest.get(slide["filename"], {})
+        up_to_date = entry.get("hash") == hashes[name] and (out_dir / slide["filename"]).exists()
+        if up_to_date and not force:
+            skipped.append(name)
+        else:
+            pending.append(name)
+
+    rendered = {}
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending)), initializer=setup_renderer,
+                                 initargs=(rc_overrides,)) as pool:
+            futures = [pool.submit(_render_worker, name, str(out_dir), SLIDES[name]["params"], postprocess) for name in pending]
+            for future in as_completed(futures):
+                name, timing = future.result()
+                rendered[name] = timing
+    else:
+        for name in pending:
+            rendered[name] = render_slide(name, out_dir, postprocess=postprocess)
+
+    for name in rendered:
+        slide = SLIDES[name]
+        manifest[slide["filename"]] = {"slide": name, "hash": hashes[name]}
+    if rendered:
+        save_manifest(out_dir, manifest)
+
+    return rendered, skipped
+
+
 # ---- Distributions & formulas ----
+# 计算委托给 extreme_value 向量化引擎，这里保留幻灯片使用的默认参数
 def gumbel_pdf(x, mu=15.0, beta=3.0):
-    z = (x - mu) / beta
-    return (1.0 / beta) * np.exp(-(z + np.exp(-z)))
+    return extreme_value.gumbel_pdf(x, mu, beta)
 
 
 def gumbel_cdf(x, mu=15.0, beta=3.0):
-    z = (x - mu) / beta
-    return np.exp(-np.exp(-z))
+    return extreme_value.gumbel_cdf(x, mu, beta)
 
 
 def gev_cdf(x, mu=15.0, sigma=3.0, xi=0.0):
-    t = 1.0 + xi * (x - mu) / sigma
-    valid = t > 0
-    F = np.zeros_like(x)
-    if abs(xi) < 1e-12:  # Gumbel limit
-        F = np.exp(-np.exp(-(x - mu) / sigma))
-    else:
-        F[valid] = np.exp(-(t[valid]) ** (-1.0 / xi))
-        F[~valid] = np.nan
-    return F
+    return extreme_value.gev_cdf(x, mu, sigma, xi)
 
 
-def slide_1_title(out_dir):
+@register_slide("flood_slide_1.svg")
+def slide_1_title():
     fig, ax = make_canvas()
     ax.text(0.5, 0.75, "实践应用", ha="center", va="center", fontsize=56, color="#00f3ff")
     ax.text(0.5, 0.60, "洪水频率分析与极值分布", ha="center", va="center", fontsize=46, weight="bold")
@@ -85,17 +295,13 @@ def slide_1_title(out_dir):
         color="#93c5fd",
     )
 
-    save_svg(fig, out_dir / "flood_slide_1.svg")
+    return fig
 
 
-def slide_2_gumbel_pdf_cdf(out_dir):
-    fig = plt.figure(figsize=(16, 9), facecolor="#0b1221")
-    gs = fig.add_gridspec(2, 2)
-    ax_title = fig.add_subplot(gs[0, :])
-    ax_pdf = fig.add_subplot(gs[1, 0])
-    ax_cdf = fig.add_subplot(gs[1, 1])
+@register_slide("flood_slide_2.svg", mu=15.0, beta=3.0)
+def slide_2_gumbel_pdf_cdf(mu=15.0, beta=3.0):
+    fig, ax_title, (ax_pdf, ax_cdf) = make_plot_slide(["概率密度函数", "累积分布函数"])
 
-    ax_title.set_axis_off()
     ax_title.text(0.5, 0.6, "Gumbel 分布：PDF 与 CDF", ha="center", va="center", fontsize=40, color="#00f3ff")
     ax_title.text(
         0.5,
@@ -107,29 +313,21 @@ def slide_2_gumbel_pdf_cdf(out_dir):
         color="#93c5fd",
     )
 
-    x = np.linspace(5, 30, 500)
-    pdf = gumbel_pdf(x)
-    cdf = gumbel_cdf(x)
-
-    for ax in (ax_pdf, ax_cdf):
-        ax.set_facecolor("#0b1221")
-        ax.grid(True, alpha=0.25)
-        ax.spines["bottom"].set_color("#374151")
-        ax.spines["left"].set_color("#374151")
-        ax.tick_params(colors="#9ca3af")
+    x = np.linspace(mu - 10 / 3 * beta, mu + 5 * beta, 500)
+    pdf = gumbel_pdf(x, mu, beta)
+    cdf = gumbel_cdf(x, mu, beta)
 
     ax_pdf.plot(x, pdf, color="#22d3ee", lw=3, label="PDF")
-    ax_pdf.set_title("概率密度函数", color="#a5b4fc")
-    ax_pdf.legend(facecolor="#111827", edgecolor="#374151", labelcolor="#e5e7eb")
+    styled_legend(ax_pdf)
 
     ax_cdf.plot(x, cdf, color="#a78bfa", lw=3, label="CDF")
-    ax_cdf.set_title("累积分布函数", color="#a5b4fc")
-    ax_cdf.legend(facecolor="#111827", edgecolor="#374151", labelcolor="#e5e7eb")
+    styled_legend(ax_cdf)
 
-    save_svg(fig, out_dir / "flood_slide_2.svg")
+    return fig
 
 
-def slide_3_return_period(out_dir):
+@register_slide("flood_slide_3.svg")
+def slide_3_return_period():
     fig, ax = make_canvas()
     ax.text(0.5, 0.80, "重现期与洪水位", ha="center", va="center", fontsize=42, color="#00f3ff")
     ax.text(
@@ -159,16 +357,13 @@ def slide_3_return_period(out_dir):
         fontsize=22,
         color="#d1d5db",
     )
-    save_svg(fig, out_dir / "flood_slide_3.svg")
+    return fig
 
 
-def slide_4_gev(out_dir):
-    fig = plt.figure(figsize=(16, 9), facecolor="#0b1221")
-    gs = fig.add_gridspec(2, 2)
-    ax_title = fig.add_subplot(gs[0, :])
-    ax_plot = fig.add_subplot(gs[1, :])
+@register_slide("flood_slide_4.svg", mu=15.0, sigma=3.0, xi=None)
+def slide_4_gev(mu=15.0, sigma=3.0, xi=None):
+    fig, ax_title, (ax_plot,) = make_plot_slide(["不同形状参数的CDF对比"])
 
-    ax_title.set_axis_off()
     ax_title.text(0.5, 0.65, "广义极值分布（GEV）", ha="center", va="center", fontsize=40, color="#00f3ff")
     ax_title.text(
         0.5,
@@ -180,27 +375,24 @@ def slide_4_gev(out_dir):
         color="#93c5fd",
     )
 
-    x = np.linspace(5, 30, 600)
+    x = np.linspace(mu - 10 / 3 * sigma, mu + 5 * sigma, 600)
     curves = [
-        (gev_cdf(x, xi=-0.2), "\u03BE=-0.2 (Weibull型)", "#22d3ee"),
-        (gumbel_cdf(x), "\u03BE=0 (Gumbel)", "#a78bfa"),
-        (gev_cdf(x, xi=0.2), "\u03BE=0.2 (Fréchet型)", "#84cc16"),
+        (gev_cdf(x, mu, sigma, xi=-0.2), "\u03BE=-0.2 (Weibull型)", "#22d3ee"),
+        (gumbel_cdf(x, mu, sigma), "\u03BE=0 (Gumbel)", "#a78bfa"),
+        (gev_cdf(x, mu, sigma, xi=0.2), "\u03BE=0.2 (Fréchet型)", "#84cc16"),
     ]
-    ax_plot.set_facecolor("#0b1221")
-    ax_plot.grid(True, alpha=0.25)
-    ax_plot.spines["bottom"].set_color("#374151")
-    ax_plot.spines["left"].set_color("#374151")
-    ax_plot.tick_params(colors="#9ca3af")
+    if xi is not None:
+        curves.append((gev_cdf(x, mu, sigma, xi), f"\u03BE={xi:.2f} (拟合)", "#f59e0b"))
 
     for y, label, color in curves:
         ax_plot.plot(x, y, lw=3, color=color, label=label)
 
-    ax_plot.set_title("不同形状参数的CDF对比", color="#a5b4fc")
-    ax_plot.legend(facecolor="#111827", edgecolor="#374151", labelcolor="#e5e7eb")
-    save_svg(fig, out_dir / "flood_slide_4.svg")
+    styled_legend(ax_plot)
+    return fig
 
 
-def slide_5_quantiles(out_dir):
+@register_slide("flood_slide_5.svg")
+def slide_5_quantiles():
     fig, ax = make_canvas()
     ax.text(0.5, 0.82, "设计洪水位（分位数）", ha="center", va="center", fontsize=40, color="#00f3ff")
     ax.text(
@@ -230,10 +422,11 @@ def slide_5_quantiles(out_dir):
         fontsize=22,
         color="#d1d5db",
     )
-    save_svg(fig, out_dir / "flood_slide_5.svg")
+    return fig
 
 
-def slide_6_case(out_dir):
+@register_slide("flood_slide_6.svg")
+def slide_6_case():
     fig, ax = make_canvas()
     ax.text(0.5, 0.82, "江西典型工程案例（示意）", ha="center", va="center", fontsize=40, color="#00f3ff")
     bullets = [
@@ -255,11 +448,69 @@ def slide_6_case(out_dir):
         fontsize=24,
         color="#93c5fd",
     )
-    save_svg(fig, out_dir / "flood_slide_6.svg")
+    return fig
+
+
+@register_slide("flood_slide_7.svg", mu=15.0, sigma=3.0, xi=0.0, sample=None, n_years=50, B=2000, seed=0)
+def slide_7_return_level_bands(mu=15.0, sigma=3.0, xi=0.0, sample=None, n_years=50, B=2000, seed=0):
+    fig, ax_title, (ax_cdf, ax_band) = make_plot_slide(["累积分布函数", "重现期设计值"])
+
+    ax_title.text(0.5, 0.65, "设计洪水位的不确定性（Bootstrap）", ha="center", va="center", fontsize=40, color="#00f3ff")
+    ax_title.text(
+        0.5,
+        0.30,
+        r"$x_T=\mu+\frac{\sigma}{\xi}(( -\ln(1-1/T) )^{-\xi}-1),\;\; 90\%\ \text{置信带}$",
+        ha="center",
+        va="center",
+        fontsize=24,
+        color="#93c5fd",
+    )
+
+    # 未提供观测样本时，按给定参数生成固定种子的示意样本
+    if sample is None:
+        rng = np.random.default_rng(seed)
+        sample = extreme_value.gev_ppf(rng.random(n_years), mu, sigma, xi)
+    periods = np.geomspace(2, 200, 40)
+    band = bootstrap_return_levels.bootstrap_station(sample, periods, B=B, kind="parametric", seed=seed)
+
+    x = np.linspace(mu - 10 / 3 * sigma, mu + 5 * sigma, 600)
+    ax_cdf.plot(x, gev_cdf(x, mu, sigma, xi), color="#a78bfa", lw=3, label="GEV CDF")
+    styled_legend(ax_cdf)
+
+    ax_band.fill_between(periods, band["lower"], band["upper"], color="#22d3ee", alpha=0.25, label="90% 置信带")
+    ax_band.plot(periods, band["estimate"], color="#22d3ee", lw=3, label="x_T 点估计")
+    ax_band.set_xscale("log")
+    styled_legend(ax_band)
+    return fig
+
+
+def apply_fitted_params(path, station=None, method="lmom"):
+    """用站点拟合结果覆盖 Gumbel/GEV 幻灯片的参数 (参数变化会使清单哈希失效)"""
+    gumbel = fit_extreme_value.fit_file(path, "gumbel", method, station)
+    gev = fit_extreme_value.fit_file(path, "gev", method, station)
+    SLIDES["slide_2_gumbel_pdf_cdf"]["params"] = {
+        "mu": round(gumbel["mu"], 4),
+        "beta": round(gumbel["sigma"], 4),
+    }
+    SLIDES["slide_4_gev"]["params"] = {
+        "mu": round(gev["mu"], 4),
+        "sigma": round(gev["sigma"], 4),
+        "xi": round(gev["xi"], 4),
+    }
+    ids, data = fit_extreme_value.load_maxima(path)
+    row = data[ids.index(station) if station is not None else 0]
+    SLIDES["slide_7_return_level_bands"]["params"].update(
+        mu=round(gev["mu"], 4),
+        sigma=round(gev["sigma"], 4),
+        xi=round(gev["xi"], 4),
+        sample=[float(v) for v in row[~np.isnan(row)]],
+    )
+    print(f"拟合参数 ({method}): Gumbel μ={gumbel['mu']:.3f} β={gumbel['sigma']:.3f}; "
+          f"GEV μ={gev['mu']:.3f} σ={gev['sigma']:.3f} ξ={gev['xi']:.3f}")
 
 
 def main():
-    setup_style()
+    setup_renderer()
     parser = argparse.ArgumentParser(description="Generate flood analysis SVG slides")
     parser.add_argument(
         "--out",
@@ -267,19 +518,73 @@ def main():
         default=None,
         help="输出目录 (e.g., C:\\Users\\...\\static\\img)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="并行渲染进程数 (默认 1，即串行)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="忽略清单哈希，强制重新渲染全部幻灯片",
+    )
+    parser.add_argument(
+        "--fit",
+        type=str,
+        default=None,
+        help="年最大值数据 (CSV/NPY)，用拟合参数替代默认的 mu=15, beta=3",
+    )
+    parser.add_argument("--station", type=str, default=None, help="拟合使用的站点编号 (默认第一个)")
+    parser.add_argument("--fit-method", choices=["lmom", "mle"], default="lmom", help="拟合方法")
+    parser.add_argument("--optimize", action="store_true", help="渲染后优化 SVG (坐标取整、去掉 metadata)")
+    parser.add_argument("--precision", type=int, default=2, help="--optimize 时坐标保留的小数位数")
+    parser.add_argument(
+        "--svg-text",
+        choices=["path", "none"],
+        default="path",
+        help="文字输出方式：path 为字形路径，none 为 <text> 元素 (依赖浏览器字体，体积更小)",
+    )
+    parser.add_argument("--compress", type=str, default="", help="预压缩副本格式，如 gzip,br")
+    parser.add_argument("--budget", type=int, default=None, help="单个 SVG 的字节上限，超出时返回非零退出码")
     args = parser.parse_args()
 
+    rc_overrides = {"svg.fonttype": args.svg_text}
+    matplotlib.rcParams.update(rc_overrides)
+    postprocess = None
+    if args.optimize or args.compress:
+        postprocess = {
+            "precision": args.precision if args.optimize else 6,
+            "compress": optimize_svgs.parse_compress(args.compress),
+        }
+
     root = Path(__file__).resolve().parent.parent
     out_dir = Path(args.out) if args.out else (root / "static" / "img")
 
-    slide_1_title(out_dir)
-    slide_2_gumbel_pdf_cdf(out_dir)
-    slide_3_return_period(out_dir)
-    slide_4_gev(out_dir)
-    slide_5_quantiles(out_dir)
-    slide_6_case(out_dir)
-
-    print("SVG slides generated in:", out_dir)
+    if args.fit:
+        apply_fitted_params(args.fit, station=args.station, method=args.fit_method)
+
+    rendered, skipped = render_all(out_dir, jobs=max(1, args.jobs), force=args.force, postprocess=postprocess,
+                                   rc_overrides=rc_overrides)
+
+    print_timing_report(rendered, skipped)
+    if args.jobs <= 1 and rendered:
+        info = mathtext_cache_info()
+        print(f"  mathtext layout cache: {info.hits} hits, {info.misses} misses")
+    print(f"SVG slides generated in: {out_dir} ({len(rendered)} rendered, {len(skipped)} skipped)")
+
+    sizes = {}
+    for name, slide in SLIDES.items():
+        if "size" in rendered.get(name, {}):
+            sizes[slide["filename"]] = rendered[name]["size"]
+        elif (out_dir / slide["filename"]).exists():
+            size = (out_dir / slide["filename"]).stat().st_size
+            sizes[slide["filename"]] = {"before": size, "after": size}
+    if postprocess is not None or args.budget is not None:
+        over = optimize_svgs.print_size_report(sizes, args.budget)
+        if over:
+            print(f"❌ {len(over)} 个 SVG 超出体积预算 ({args.budget} 字节)")
+            raise SystemExit(1)
 
 
 if __name__ == "__main__":
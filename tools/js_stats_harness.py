@@ -0,0 +1,431 @@
+"""
+页面内统计函数 (JS) 的精度与吞吐量评测
+
+按名称从模板内联脚本中取出函数 (js_functions.JSIndex)，连同它调用到的同页函数一起包进
+每个页面自己的作用域，在 Node 里对大网格逐点求值，再与 tools/stats_kernels.py 的向量化
+参考内核比较：最大误差、超出容差的点数比例、每次调用的耗时 (JS) 与 NumPy 的吞吐量。
+
+评测对象 (页面 → 函数):
+  interval_estimation.html        gamma / logGamma / incompleteBeta (betaContinuedFraction) /
+                                  normalInverse / tDistributionCDF / PDF / Inverse
+  probability_distributions.html  gamma / logGamma / erf / binomialCoeff / chiSquarePDF /
+                                  betaPDF / betaCDF / tPDF / tCDF / gammaPDF / gammaCDF /
+                                  fPDF / fCDF，以及 generateChiSquareData / generatePoissonData
+                                  中内联的卡方 CDF、泊松 pmf 表达式
+  random_variables.html           erf / normalCDF / binomialProbability
+
+判定:
+  inaccurate  最大误差超过容差 (cdf / ppf 按绝对误差，pdf 按 |误差| / max(|真值|, 1)，
+              gamma 按相对误差)
+  slow        每次调用超过 --budget-us 微秒 (默认 2 µs：拖动滑块时一帧重算 ~500 个点，
+              统计函数占用不超过 1 ms)
+  error       Node 中抛出异常或返回非有限值而真值有限
+对判定不通过、且页面参数来自滑块 (网格有限) 的函数，--write-tables 用参考内核在页面实际
+用到的网格上生成查找表；超过 --max-table-values 个值的表不生成，报告中提示应改写 JS 实现。
+
+输出:
+  .cache/js_stats_report.json        每个函数的误差、最差点、耗时与判定
+  static/data/stats/<用例>.json       查找表 {page, function, axes: {名称: [取值...]}, values}
+  static/data/stats/index.json        查找表索引
+
+用法:
+    python tools/js_stats_harness.py                        # 默认每个函数 200000 点
+    python tools/js_stats_harness.py --points 1000000 --only pd.tCDF,ie.tDistributionInverse
+    python tools/js_stats_harness.py --write-tables
+"""
+
+import argparse
+import json
+import math
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+import stats_kernels as sk
+from montecarlo_store import slider_grid
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from js_functions import JSIndex  # noqa: E402
+
+TEMPLATE_DIR = ROOT / "templates"
+REPORT_PATH = ROOT / ".cache" / "js_stats_report.json"
+TABLE_DIR = ROOT / "static" / "data" / "stats"
+
+IE = "interval_estimation.html"
+PD = "probability_distributions.html"
+RV = "random_variables.html"
+
+# name: 报告中的名称；js: 在页面作用域中求值的表达式 (函数名或箭头函数)；
+# args(rng, n): 按 JS 参数顺序的输入数组；reference(*args): 参考值；
+# scale: abs / mixed / rel；table(pages): (axes, values) 或 None
+Case = namedtuple("Case", ["name", "page", "js", "args", "reference", "scale", "tol", "table"])
+
+_IDENT_RE = re.compile(r"[A-Za-z_$][\w$]*")
+_IDENT_CALL_RE = re.compile(r"([A-Za-z_$][\w$]*)\s*\(")
+
+
+def _uniform(lo, hi):
+    return lambda rng, n: rng.uniform(lo, hi, n)
+
+
+def _integers(lo, hi):
+    return lambda rng, n: rng.integers(lo, hi + 1, n).astype(np.float64)
+
+
+def _columns(*makers):
+    return lambda rng, n: [make(rng, n) for make in makers]
+
+
+def _axis_grid(start, stop, step):
+    """页面 for (let i = start; i <= stop; i += step) 循环对应的网格 (按步长小数位取整)"""
+    decimals = max(0, -int(math.floor(math.log10(step))))
+    return np.round(start + step * np.arange(int(round((stop - start) / step)) + 1), decimals)
+
+
+def _confidence_levels(source):
+    """置信水平下拉框的选项 (0.90 / 0.95 / 0.99)"""
+    return sorted({float(v) for v in re.findall(r'<option value="(0\.\d+)"', source)})
+
+
+def _table_t_critical(pages):
+    """置信区间用到的 t 临界值：df = 1 .. 最大样本量 - 1，p = 1 - alpha / 2"""
+    source = pages[IE]
+    sizes = [int(v) for v in re.findall(r'<option value="(\d+)"', source)]
+    df = np.arange(1, max(sizes))
+    levels = np.array(_confidence_levels(source))
+    values = sk.t_ppf(1 - (1 - levels[None, :]) / 2, df[:, None].astype(np.float64))
+    return {"df": df, "confidence": levels}, values
+
+
+def _table_pd(fn, sliders, x_axis):
+    """probability_distributions.html 的图表：滑块网格 × 横轴网格"""
+    def build(pages):
+        grids = [slider_grid(PD, input_id, pages[PD]).astype(np.float64) for _, input_id in sliders]
+        x = _axis_grid(*x_axis)
+        mesh = np.meshgrid(*grids, x, indexing="ij")
+        axes = {name: grid for (name, _), grid in zip(sliders, grids)}
+        axes["x"] = x
+        return axes, fn(*mesh)
+    return build
+
+
+def _table_poisson(pages):
+    lam = slider_grid(PD, "poisson-lambda", pages[PD]).astype(np.float64)
+    k = np.arange(31, dtype=np.float64)  # generatePoissonData: maxK = min(30, ...)
+    return {"lambda": lam, "k": k}, sk.poisson_pmf(k[None, :], lam[:, None])
+
+
+def _exp_gammaln(z):
+    return np.exp(sk.gammaln(z))
+
+
+# gamma 的 Math.pow(t, z + 0.5) 在 z ≈ 143 上溢，页面参数 (自由度的一半等) 远小于此
+GAMMA_ARGS = _columns(_uniform(0.05, 140))
+
+CASES = [
+    # ---- interval_estimation.html ----
+    Case("ie.gamma", IE, "gamma", GAMMA_ARGS, _exp_gammaln, "rel", 1e-10, None),
+    Case("ie.logGamma", IE, "logGamma", GAMMA_ARGS, sk.gammaln, "mixed", 1e-10, None),
+    Case("ie.incompleteBeta", IE, "incompleteBeta",
+         _columns(_uniform(0, 1), _uniform(0.5, 60), _uniform(0.5, 60)),
+         lambda x, a, b: sk.betainc(a, b, x), "abs", 1e-6, None),
+    Case("ie.normalInverse", IE, "normalInverse", _columns(_uniform(1e-6, 1 - 1e-6)),
+         sk.norm_ppf, "mixed", 1e-6, None),
+    Case("ie.tDistributionCDF", IE, "tDistributionCDF", _columns(_uniform(-8, 8), _integers(1, 99)),
+         sk.t_cdf, "abs", 1e-6, None),
+    Case("ie.tDistributionPDF", IE, "tDistributionPDF", _columns(_uniform(-8, 8), _integers(1, 99)),
+         sk.t_pdf, "mixed", 1e-6, None),
+    Case("ie.tDistributionInverse", IE, "tDistributionInverse",
+         _columns(_uniform(0.5, 0.9995), _integers(1, 99)),
+         sk.t_ppf, "mixed", 1e-6, _table_t_critical),
+    # ---- probability_distributions.html ----
+    Case("pd.gamma", PD, "gamma", GAMMA_ARGS, _exp_gammaln, "rel", 1e-10, None),
+    Case("pd.logGamma", PD, "logGamma", GAMMA_ARGS, sk.gammaln, "mixed", 1e-10, None),
+    Case("pd.erf", PD, "erf", _columns(_uniform(-6, 6)), sk.erf, "abs", 1e-6, None),
+    Case("pd.binomialCoeff", PD, "binomialCoeff", _columns(_integers(0, 50), _integers(0, 50)),
+         lambda n, k: np.where(k > n, 0.0, np.exp(sk.gammaln(n + 1) - sk.gammaln(k + 1) - sk.gammaln(n - k + 1))),
+         "rel", 1e-10, None),
+    Case("pd.poissonPMF", PD, "(k, lambda) => (Math.pow(lambda, k) * Math.exp(-lambda)) / factorial(k)",
+         _columns(_integers(0, 30), _uniform(0.5, 10)), sk.poisson_pmf, "abs", 1e-6, _table_poisson),
+    Case("pd.chiSquarePDF", PD, "chiSquarePDF", _columns(_uniform(0.1, 20), _integers(1, 10)),
+         sk.chi2_pdf, "mixed", 1e-6, None),
+    Case("pd.chiSquareCDF", PD, "(x, k) => Math.min(1, Math.max(0, incompleteGamma(k / 2, x / 2) / gamma(k / 2)))",
+         _columns(_uniform(0.1, 20), _integers(1, 10)), sk.chi2_cdf, "abs", 1e-6,
+         _table_pd(lambda k, x: sk.chi2_cdf(x, k), [("k", "chisquare-k")], (0.1, 19.9, 0.2))),
+    Case("pd.betaPDF", PD, "betaPDF", _columns(_uniform(0.01, 0.99), _uniform(0.5, 5), _uniform(0.5, 5)),
+         sk.beta_pdf, "mixed", 1e-6, None),
+    Case("pd.betaCDF", PD, "betaCDF", _columns(_uniform(0.01, 0.99), _uniform(0.5, 5), _uniform(0.5, 5)),
+         sk.beta_cdf, "abs", 1e-6,
+         _table_pd(lambda a, b, x: sk.beta_cdf(x, a, b), [("alpha", "beta-alpha"), ("beta", "beta-beta")],
+                   (0.01, 0.99, 0.01))),
+    Case("pd.tPDF", PD, "tPDF", _columns(_uniform(-5, 5), _integers(1, 30)), sk.t_pdf, "mixed", 1e-6, None),
+    Case("pd.tCDF", PD, "tCDF", _columns(_uniform(-5, 5), _integers(1, 30)), sk.t_cdf, "abs", 1e-6,
+         _table_pd(lambda df, x: sk.t_cdf(x, df), [("df", "t-df")], (-5, 5, 0.1))),
+    Case("pd.gammaPDF", PD, "gammaPDF", _columns(_uniform(0.1, 20), _uniform(0.5, 5), _uniform(0.1, 3)),
+         sk.gamma_pdf, "mixed", 1e-6, None),
+    Case("pd.gammaCDF", PD, "gammaCDF", _columns(_uniform(0.1, 20), _uniform(0.5, 5), _uniform(0.1, 3)),
+         sk.gamma_cdf, "abs", 1e-6,
+         _table_pd(lambda a, b, x: sk.gamma_cdf(x, a, b), [("alpha", "gamma-alpha"), ("beta", "gamma-beta")],
+                   (0.1, 19.9, 0.2))),
+    Case("pd.fPDF", PD, "fPDF", _columns(_uniform(0.1, 10), _integers(1, 20), _integers(1, 30)),
+         sk.f_pdf, "mixed", 1e-6, None),
+    Case("pd.fCDF", PD, "fCDF", _columns(_uniform(0.1, 10), _integers(1, 20), _integers(1, 30)),
+         sk.f_cdf, "abs", 1e-6,
+         _table_pd(lambda d1, d2, x: sk.f_cdf(x, d1, d2), [("df1", "f-df1"), ("df2", "f-df2")], (0.1, 10, 0.1))),
+    # ---- random_variables.html ----
+    Case("rv.erf", RV, "erf", _columns(_uniform(-6, 6)), sk.erf, "abs", 1e-6, None),
+    Case("rv.normalCDF", RV, "normalCDF", _columns(_uniform(-8, 8)), sk.norm_cdf, "abs", 1e-6, None),
+    Case("rv.binomialProbability", RV, "binomialProbability",
+         _columns(_integers(1, 200), _integers(0, 200), _uniform(0.01, 0.99)),
+         lambda n, k, p: sk.binom_pmf(k, n, p), "abs", 1e-6, None),
+]
+
+
+def collect_sources(index, expression):
+    """表达式用到的页面函数 (递归包含被调用的同页函数)，按源码顺序返回它们的源码"""
+    needed, pending = {}, [(expression, _IDENT_RE)]
+    while pending:
+        code, pattern = pending.pop()
+        for name in pattern.findall(code):
+            if name in needed or name not in index.functions:
+                continue
+            fn = index.locate(name)
+            needed[name] = fn
+            pending.append((index.text[fn.start:fn.end], _IDENT_CALL_RE))
+    return [index.text[fn.start:fn.end] for fn in sorted(needed.values(), key=lambda f: f.start)]
+
+
+def build_driver(cases, pages):
+    """Node 驱动脚本：每个页面一个独立作用域，每个用例一个按参数个数展开的求值循环"""
+    scopes = []
+    for page in sorted({case.page for case in cases}):
+        index = JSIndex(pages[page])
+        page_cases = [case for case in cases if case.page == page]
+        sources = []
+        for case in page_cases:
+            for src in collect_sources(index, case.js):
+                if src not in sources:
+                    sources.append(src)
+        exports = ",\n".join(f"    {json.dumps(case.name)}: {case.js}" for case in page_cases)
+        scopes.append(f"  {json.dumps(page)}: (function () {{\n{chr(10).join(sources)}\n"
+                      f"  return {{\n{exports}\n  }};\n  }})()")
+
+    loops = []
+    for arity in sorted({len(case.args(np.random.default_rng(0), 1)) for case in cases}):
+        call = ", ".join(f"a[{j}][i]" for j in range(arity))
+        loops.append(f"""  {arity}: function (fn, a, out, n) {{
+    let errors = 0;
+    for (let i = 0; i < n; i++) {{
+      try {{
+        out[i] = fn({call});
+      }} catch (e) {{
+        out[i] = NaN;
+        errors++;
+      }}
+    }}
+    return errors;
+  }}""")
+
+    return f"""// 由 tools/js_stats_harness.py 生成
+const fs = require("fs");
+const scopes = {{
+{",".join(scopes)}
+}};
+const loops = {{
+{",".join(loops)}
+}};
+const manifest = JSON.parse(fs.readFileSync(process.argv[2], "utf8"));
+const results = {{}};
+for (const c of manifest.cases) {{
+  const raw = fs.readFileSync(c.input);
+  const flat = new Float64Array(raw.buffer.slice(raw.byteOffset, raw.byteOffset + raw.length));
+  const args = [];
+  for (let j = 0; j < c.arity; j++) args.push(flat.subarray(j * c.n, (j + 1) * c.n));
+  const fn = scopes[c.page][c.name];
+  const loop = loops[c.arity];
+  const out = new Float64Array(c.n);
+  const errors = loop(fn, args, out, c.n);  // 首轮同时完成 JIT 预热
+  let best = Infinity, spent = 0, runs = 0;
+  while (runs === 0 || (spent < manifest.min_seconds && runs < 50)) {{
+    const start = process.hrtime.bigint();
+    loop(fn, args, out, c.n);
+    const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+    best = Math.min(best, seconds);
+    spent += seconds;
+    runs++;
+  }}
+  fs.writeFileSync(c.output, Buffer.from(out.buffer));
+  results[c.name] = {{ seconds: best, runs: runs, errors: errors }};
+}}
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def run_node(cases, inputs, pages, min_seconds=0.2):
+    """在 Node 中求值，返回 ({名称: 输出数组}, {名称: 计时})"""
+    node = shutil.which("node")
+    if node is None:
+        raise RuntimeError("找不到 node，无法评测页面中的 JS 函数")
+    with tempfile.TemporaryDirectory(prefix="js_stats_") as tmp:
+        tmp = Path(tmp)
+        manifest = {"min_seconds": min_seconds, "cases": []}
+        for i, case in enumerate(cases):
+            columns = inputs[case.name]
+            np.concatenate(columns).astype("<f8").tofile(tmp / f"{i}.in")
+            manifest["cases"].append({"name": case.name, "page": case.page, "arity": len(columns),
+                                      "n": int(columns[0].size),
+                                      "input": str(tmp / f"{i}.in"), "output": str(tmp / f"{i}.out")})
+        (tmp / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        (tmp / "driver.js").write_text(build_driver(cases, pages), encoding="utf-8")
+        proc = subprocess.run([node, str(tmp / "driver.js"), str(tmp / "manifest.json")],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Node 执行失败:\n{proc.stderr.strip()}")
+        timings = json.loads(proc.stdout)
+        outputs = {case.name: np.fromfile(tmp / f"{i}.out", dtype="<f8") for i, case in enumerate(cases)}
+    return outputs, timings
+
+
+def compare(case, args, got, want):
+    """误差统计：最大误差、超出容差的比例、最差点的参数"""
+    with np.errstate(invalid="ignore", over="ignore"):
+        diff = np.abs(got - want)
+        if case.scale == "rel":
+            err = diff / np.maximum(np.abs(want), 1e-300)
+        elif case.scale == "mixed":
+            err = diff / np.maximum(np.abs(want), 1.0)
+        else:
+            err = diff
+    same = (got == want) | (np.isnan(got) & np.isnan(want))
+    err = np.where(same, 0.0, np.where(np.isfinite(err), err, np.inf))
+    worst = int(np.argmax(err))
+    return {
+        "max_error": float(err[worst]),
+        "p99_error": float(np.quantile(err, 0.99, method="higher")),
+        "bad_fraction": float(np.mean(err > case.tol)),
+        "nonfinite": int(np.sum(~np.isfinite(got) & np.isfinite(want))),
+        "worst": {"args": [float(a[worst]) for a in args], "js": float(got[worst]), "reference": float(want[worst])},
+    }
+
+
+def evaluate(cases, points, seed=0, budget_us=2.0):
+    pages = {page: (TEMPLATE_DIR / page).read_text(encoding="utf-8") for page in {case.page for case in cases}}
+    rng = np.random.default_rng(seed)
+    inputs = {case.name: [np.asarray(col, dtype=np.float64) for col in case.args(rng, points)] for case in cases}
+    outputs, timings = run_node(cases, inputs, pages)
+
+    results = []
+    for case in cases:
+        args = inputs[case.name]
+        start = time.perf_counter()
+        with np.errstate(all="ignore"):
+            want = np.asarray(case.reference(*args), dtype=np.float64)
+        numpy_seconds = time.perf_counter() - start
+        stats = compare(case, args, outputs[case.name], want)
+        js_ns = timings[case.name]["seconds"] / points * 1e9
+        verdict = []
+        if timings[case.name]["errors"] or stats["nonfinite"]:
+            verdict.append("error")
+        if stats["max_error"] > case.tol:
+            verdict.append("inaccurate")
+        if js_ns > budget_us * 1000:
+            verdict.append("slow")
+        results.append({
+            "name": case.name, "page": case.page, "js": case.js, "points": points,
+            "scale": case.scale, "tol": case.tol, **stats,
+            "js_exceptions": timings[case.name]["errors"],
+            "js_ns_per_eval": js_ns, "numpy_ns_per_eval": numpy_seconds / points * 1e9,
+            "verdict": verdict or ["ok"],
+        })
+    return results, pages
+
+
+def write_tables(cases, results, pages, out_dir=TABLE_DIR, max_values=50_000):
+    """为判定不通过的函数生成查找表，返回 {名称: 文件名或跳过原因}"""
+    by_name = {case.name: case for case in cases}
+    out_dir = Path(out_dir)
+    index_path = out_dir / "index.json"
+    index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {"tables": {}}
+    written = {}
+    for result in results:
+        case = by_name[result["name"]]
+        if result["verdict"] == ["ok"] or case.table is None:
+            continue
+        axes, values = case.table(pages)
+        if values.size > max_values:
+            written[case.name] = f"跳过：{values.size:,} 个值超过上限，应改写 JS 实现"
+            continue
+        payload = {
+            "page": case.page,
+            "function": case.js,
+            "axes": {name: [float(v) for v in grid] for name, grid in axes.items()},
+            "values": np.round(values, 10).tolist(),
+        }
+        name = case.name + ".json"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / name).write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        index["tables"][case.name] = {"file": name, "page": case.page, "shape": list(values.shape),
+                                      "verdict": result["verdict"]}
+        written[case.name] = name
+    if out_dir.exists():
+        index_path.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    return written
+
+
+def print_report(results):
+    print(f"{'函数':<26} {'最大误差':>10} {'P99':>10} {'超差比例':>8} {'JS ns/次':>9} {'NumPy ns/点':>11}  判定")
+    for r in results:
+        mark = "✅" if r["verdict"] == ["ok"] else "⚠️"
+        print(f"{r['name']:<26} {r['max_error']:>10.2e} {r['p99_error']:>10.2e} {r['bad_fraction']:>8.1%} "
+              f"{r['js_ns_per_eval']:>9.1f} {r['numpy_ns_per_eval']:>11.1f}  {mark} {','.join(r['verdict'])}")
+    for r in results:
+        if r["verdict"] != ["ok"]:
+            w = r["worst"]
+            args = ", ".join(f"{a:.6g}" for a in w["args"])
+            print(f"  {r['name']}({args}) = {w['js']:.10g}，参考值 {w['reference']:.10g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate in-page JS statistics functions against NumPy reference kernels")
+    parser.add_argument("--points", type=int, default=200_000, help="每个函数的求值点数")
+    parser.add_argument("--only", type=str, default=None, help="逗号分隔的用例名称 (如 pd.tCDF)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-us", type=float, default=2.0, help="每次调用的耗时上限 (微秒)")
+    parser.add_argument("--report", type=str, default=str(REPORT_PATH), help="JSON 报告路径")
+    parser.add_argument("--write-tables", action="store_true", help="为不达标的函数生成查找表")
+    parser.add_argument("--tables-out", type=str, default=str(TABLE_DIR))
+    parser.add_argument("--max-table-values", type=int, default=50_000, help="单个查找表的值个数上限")
+    args = parser.parse_args()
+
+    cases = CASES
+    if args.only:
+        names = set(args.only.split(","))
+        unknown = names - {case.name for case in CASES}
+        if unknown:
+            parser.error(f"未知用例: {', '.join(sorted(unknown))}")
+        cases = [case for case in CASES if case.name in names]
+
+    results, pages = evaluate(cases, args.points, args.seed, args.budget_us)
+    print_report(results)
+
+    report = Path(args.report)
+    report.parent.mkdir(parents=True, exist_ok=True)
+    report.write_text(json.dumps({"points": args.points, "budget_us": args.budget_us, "results": results},
+                                 ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n📄 报告已写入 {report}")
+
+    if args.write_tables:
+        for name, outcome in write_tables(cases, results, pages, args.tables_out, args.max_table_values).items():
+            print(f"  📦 {name}: {outcome}")
+
+
+if __name__ == "__main__":
+    main()
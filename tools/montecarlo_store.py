@@ -0,0 +1,418 @@
+"""
+章节蒙特卡洛模拟的预计算结果库 (向量化 NumPy)
+
+页面在浏览器里用 Math.random 现场模拟，低端设备上会卡住标签页。这里按页面滑块的参数网格
+(min / max / step 直接从模板读取) 批量预计算，输出紧凑的二进制分块 + JSON 索引，
+页面通过 static/js/mc_store.js 按需加载对应分块，取不到时仍回退到现场模拟。
+分块是生成物，不提交到仓库：build_site.py 构建时只把 WIRED 中已接入页面的数据集导出到输出目录，
+其余数据集用 export 在本地生成，供接入页面时调试。
+
+数据集 (页面 → 函数):
+  ev_standard / ev_binomial / ev_poisson   expectation_variance.html  runMonteCarloSimulation
+  pi / option / queue                      random_variables.html      startPiSimulation / simulateOption /
+                                                                      startQueueSimulation
+  galton                                   index.html                 simulateBinomialCounts
+  gacha / monty                            chapter1.js                simulateTrialGenshin / runSimulation
+
+同一数据集内各参数共用一组随机数 (common random numbers)，拖动滑块时结果连续变化；
+参数网格过大的模拟 (期权 5 个滑块、抽卡 5 个滑块) 只存与参数无关的随机量，由页面代入参数换算。
+
+输出格式 (小端序):
+  index.json            {datasets: {名称: {source, params, chunks: {键: {file, bytes, arrays}}}}}
+  <数据集>[-<键>].bin    各数组首尾相接，按 8 字节对齐；arrays 给出 dtype、shape、byte_offset，
+                         量化数组另有 scale / bias (值 = 存储值 * scale + bias)
+
+用法:
+    python tools/montecarlo_store.py export                      # 写入 static/data/montecarlo/
+    python tools/montecarlo_store.py export --only galton,pi
+    python tools/montecarlo_store.py bench                       # 各数据集的生成耗时与体积
+"""
+
+import argparse
+import json
+import re
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+TEMPLATE_DIR = ROOT / "templates"
+DEFAULT_OUT = ROOT / "static" / "data" / "montecarlo"
+INDEX_NAME = "index.json"
+
+SEED = 20251017
+ALIGN = 8
+
+# 已接入 MCStore 的数据集 (页面中写有分块路径字面量)，build_site.py 构建时导出。
+# 高尔顿板现场模拟只需 rows × balls 次 Math.random，而单次预计算结果会让每次点击
+# 画出同一个直方图，因此不接入；期望方差页与期权定价仍现场模拟
+WIRED = ("pi", "queue", "gacha", "monty")
+
+# 不由滑块决定的样本量
+GACHA_SESSIONS = 4000
+MONTY_TRIALS = 100000
+OPTION_DISPLAY_PATHS = 20  # 与 simulateOption 中显示的路径数一致
+OPTION_STEPS = 100
+QUEUE_BUCKET = 1.0  # 队列指标的采样间隔 (时间单位)
+
+
+def slider_grid(page, input_id, source=None):
+    """读取模板中 <input type="range"> 的 min / max / step，返回网格 (按 step 的小数位取整)"""
+    if source is None:
+        source = (TEMPLATE_DIR / page).read_text(encoding="utf-8")
+    m = re.search(r'<input\b[^>]*\bid="%s"[^>]*>' % re.escape(input_id), source, re.S)
+    if m is None:
+        raise KeyError(f"{page} 中没有滑块 #{input_id}")
+    attrs = dict(re.findall(r'([\w-]+)="([^"]*)"', m.group(0)))
+    lo, hi = float(attrs["min"]), float(attrs["max"])
+    step = float(attrs.get("step") or 1)
+    decimals = len(attrs["step"].split(".")[1]) if "." in attrs.get("step", "") else 0
+    grid = np.round(lo + step * np.arange(int(round((hi - lo) / step)) + 1), decimals)
+    return grid.astype(int) if decimals == 0 else grid
+
+
+def _rng(name):
+    return np.random.default_rng([SEED, zlib.crc32(name.encode())])
+
+
+def _param_list(grid):
+    return [v.item() for v in grid]
+
+
+def build_ev_standard(pages):
+    """正态 / 均匀 / 指数：只存标准化样本，页面换算 mu + sigma*z、a + (b-a)*u、e / lambda"""
+    n = int(slider_grid("expectation_variance.html", "sample-size", pages["expectation_variance.html"])[-1])
+    rng = _rng("ev_standard")
+    u = rng.integers(0, 65536, n, dtype=np.uint16)
+    return {
+        "source": "expectation_variance.html runMonteCarloSimulation",
+        "params": {"samples": n},
+        "chunks": {"all": {
+            "normal": (rng.standard_normal(n).astype(np.float16), {}),
+            "uniform": (u, {"scale": 1 / 65536, "bias": 0.5 / 65536}),
+            "exponential": (rng.standard_exponential(n).astype(np.float16), {}),
+        }},
+    }
+
+
+def build_ev_binomial(pages):
+    """二项分布：每个 n 一个分块，形状 (p, 样本)；与 binomialRandom 相同的逐次 U < p 计数"""
+    page = pages["expectation_variance.html"]
+    size = int(slider_grid("expectation_variance.html", "sample-size", page)[-1])
+    ns = slider_grid("expectation_variance.html", "binomial-n", page)
+    ps = slider_grid("expectation_variance.html", "binomial-p", page)
+    u = _rng("ev_binomial").random((size, int(ns[-1])))
+    # counts[p, s, k] = 前 k+1 次试验中成功的次数，一次得到所有 n
+    counts = np.cumsum(u[None, :, :] < ps[:, None, None], axis=2, dtype=np.uint8)
+    return {
+        "source": "expectation_variance.html runMonteCarloSimulation",
+        "params": {"n": _param_list(ns), "p": _param_list(ps), "samples": size},
+        "chunks": {f"n{n}": {"samples": (counts[:, :, n - 1], {})} for n in ns},
+    }
+
+
+def build_ev_poisson(pages):
+    """泊松分布：逆变换抽样，形状 (lambda, 样本)"""
+    page = pages["expectation_variance.html"]
+    size = int(slider_grid("expectation_variance.html", "sample-size", page)[-1])
+    lams = slider_grid("expectation_variance.html", "poisson-lambda", page)
+    k_max = int(lams[-1] + 12 * np.sqrt(lams[-1])) + 1
+    k = np.arange(k_max + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, k_max + 1)))])
+    pmf = np.exp(k[None, :] * np.log(lams[:, None]) - lams[:, None] - log_fact[None, :])
+    cdf = np.cumsum(pmf, axis=1)
+    u = _rng("ev_poisson").random(size)
+    # X = #{k : F(k) <= U}
+    samples = (cdf[:, None, :] <= u[None, :, None]).sum(axis=2)
+    return {
+        "source": "expectation_variance.html runMonteCarloSimulation",
+        "params": {"lambda": _param_list(lams), "samples": size},
+        "chunks": {"all": {"samples": (samples.astype(np.uint8), {})}},
+    }
+
+
+def build_pi(pages):
+    """投点估计 pi：坐标量化为 uint16，另存每 100 点的估计值"""
+    n = int(slider_grid("random_variables.html", "pi-points", pages["random_variables.html"])[-1])
+    q = _rng("pi").integers(0, 65536, (n, 2), dtype=np.uint16)
+    scale, bias = 2 / 65535, -1.0
+    xy = q * scale + bias
+    inside = (xy ** 2).sum(axis=1) <= 1
+    checkpoints = np.arange(100, n + 1, 100)
+    estimate = 4 * np.cumsum(inside)[checkpoints - 1] / checkpoints
+    return {
+        "source": "random_variables.html startPiSimulation",
+        "params": {"points": n, "checkpoint_every": 100},
+        "chunks": {"all": {
+            "points": (q, {"scale": scale, "bias": bias}),
+            "estimate": (estimate.astype(np.float32), {}),
+        }},
+    }
+
+
+def build_option(pages):
+    """期权定价：参数网格过大，只存标准正态量
+
+    终值 S_T = S0 * exp((r - sigma^2/2) T + sigma sqrt(T) z)；
+    显示路径的第 j 步增量为 sqrt(dt) * path_z[i, j]。
+    """
+    n = int(slider_grid("random_variables.html", "option-paths", pages["random_variables.html"])[-1])
+    rng = _rng("option")
+    return {
+        "source": "random_variables.html simulateOption",
+        "params": {"paths": n, "display_paths": OPTION_DISPLAY_PATHS, "steps": OPTION_STEPS},
+        "chunks": {"all": {
+            "z": (rng.standard_normal(n).astype(np.float16), {}),
+            "path_z": (rng.standard_normal((OPTION_DISPLAY_PATHS, OPTION_STEPS)).astype(np.float16), {}),
+        }},
+    }
+
+
+def _mm1_paths(lams, mus, horizon, rng):
+    """所有 (lambda, mu) 组合的 M/M/1 到达、开始服务、离开时刻与服务时长，形状 (L, M, N)"""
+    n = int(lams[-1] * horizon * 1.25) + 50
+    e_arrival = rng.standard_exponential(n)
+    e_service = rng.standard_exponential(n)
+    arrival = np.cumsum(e_arrival[None, :] / lams[:, None], axis=1)
+    if (arrival[:, -1] <= horizon).any():
+        raise RuntimeError("到达序列没有覆盖整个模拟时长，增大顾客数")
+    service = e_service[None, None, :] / mus[None, :, None]
+    start = np.empty((len(lams), len(mus), n))
+    depart = np.empty_like(start)
+    prev = np.zeros((len(lams), len(mus)))
+    # 先到先服务：开始时刻 = max(到达, 上一位离开)，只在顾客维度上循环
+    for i in range(n):
+        np.maximum(arrival[:, i, None], prev, out=start[:, :, i])
+        np.add(start[:, :, i], service[:, :, i], out=depart[:, :, i])
+        prev = depart[:, :, i]
+    return np.broadcast_to(arrival[:, None, :], start.shape), start, depart, np.broadcast_to(service, start.shape)
+
+
+def build_queue(pages):
+    """M/M/1 排队：每个到达率一个分块，形状 (服务率, 时间点)；mu <= lambda 的格子无效 (页面拒绝)
+
+    指标与 startQueueSimulation 一致：排队人数 (不含服务中)、服务台忙闲、累计到达人数、
+    平均等待 = 已开始服务者的等待总和 / 已到达人数、利用率 = 已开始服务的服务时长总和 / t * 100。
+    """
+    page = pages["random_variables.html"]
+    lams = slider_grid("random_variables.html", "queue-arrival-rate", page)
+    mus = slider_grid("random_variables.html", "queue-service-rate", page)
+    horizon = float(slider_grid("random_variables.html", "queue-max-time", page)[-1])
+    times = np.arange(0, horizon + QUEUE_BUCKET / 2, QUEUE_BUCKET)
+    arrival, start, depart, service = _mm1_paths(lams, mus, horizon, _rng("queue"))
+
+    def count_until(events):
+        # 每行事件时刻单调不减：#{events <= t}
+        return np.stack([np.searchsorted(row, times, side="right") for row in events])
+
+    chunks = {}
+    for li, lam in enumerate(lams):
+        arrived = count_until(arrival[li])
+        started = count_until(start[li])
+        departed = count_until(depart[li])
+        wait_sum = np.concatenate([np.zeros((len(mus), 1)),
+                                   np.cumsum(start[li] - arrival[li], axis=1)], axis=1)
+        service_sum = np.concatenate([np.zeros((len(mus), 1)), np.cumsum(service[li], axis=1)], axis=1)
+        rows = np.arange(len(mus))[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_wait = np.where(arrived > 0, wait_sum[rows, started] / arrived, 0)
+            utilization = np.where(times > 0, service_sum[rows, started] / times * 100, 0)
+        valid = (mus > lam)[:, None]
+        chunks[f"lambda{lam:.1f}"] = {
+            "queue_length": (np.where(valid, arrived - started, 0).astype(np.uint16), {}),
+            "busy": (np.where(valid, started - departed, 0).astype(np.uint8), {}),
+            "arrived": (np.where(valid, arrived, 0).astype(np.uint16), {}),
+            "avg_wait": (np.where(valid, avg_wait, 0).astype(np.float16), {}),
+            "utilization": (np.where(valid, utilization, 0).astype(np.float16), {}),
+        }
+    return {
+        "source": "random_variables.html startQueueSimulation",
+        "params": {"lambda": _param_list(lams), "mu": _param_list(mus),
+                   "times": _param_list(np.round(times, 6)), "valid": "mu > lambda"},
+        "chunks": chunks,
+    }
+
+
+def build_galton(pages):
+    """高尔顿板：形状 (行数, 小球数, 桶)；同一批小球的前 rows 次左右选择"""
+    page = pages["index.html"]
+    rows = slider_grid("index.html", "galton-rows", page)
+    balls = slider_grid("index.html", "galton-balls", page)
+    rights = np.cumsum(_rng("galton").random((int(balls[-1]), int(rows[-1]))) < 0.5, axis=1)
+    bins = int(rows[-1]) + 1
+    counts = np.zeros((len(rows), len(balls), bins), dtype=np.uint16)
+    for ri, r in enumerate(rows):
+        onehot = np.zeros((int(balls[-1]), bins), dtype=np.uint16)
+        onehot[np.arange(int(balls[-1])), rights[:, r - 1]] = 1
+        counts[ri] = np.cumsum(onehot, axis=0)[balls - 1]
+    return {
+        "source": "index.html simulateBinomialCounts",
+        "params": {"rows": _param_list(rows), "balls": _param_list(balls)},
+        "chunks": {"all": {"counts": (counts, {})}},
+    }
+
+
+def build_gacha(pages):
+    """抽卡：每次试验只存不超过 p5、p4 滑块上限之和的随机数 (抽数, 值)，稀疏存储
+
+    页面按 simulateTrialGenshin 的规则逐抽回放，未列出的抽数视为随机数大于上限 (非保底时为三星)；
+    保底 k4 会压过随机的五星，所以不能只存首次命中时刻。
+    """
+    page = pages["chapter1.html"]
+    draws = int(max(slider_grid("chapter1.html", "gacha-n", page)[-1],
+                    slider_grid("chapter1.html", "gacha-pity5", page)[-1]))
+    cap = float(slider_grid("chapter1.html", "gacha-p5", page)[-1]
+                + slider_grid("chapter1.html", "gacha-p4", page)[-1]) / 100
+    u = _rng("gacha").random((GACHA_SESSIONS, draws))
+    session, draw = np.nonzero(u <= cap)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(session, minlength=GACHA_SESSIONS))])
+    # 向上取整，保证 值 <= p 时原随机数也 <= p
+    values = np.ceil(u[session, draw] / cap * 65535).astype(np.uint16)
+    return {
+        "source": "chapter1.js simulateTrialGenshin",
+        "params": {"sessions": GACHA_SESSIONS, "draws": draws, "cap": cap},
+        "chunks": {"all": {
+            "offsets": (offsets.astype(np.uint32), {}),
+            "draw": ((draw + 1).astype(np.uint8), {}),
+            "value": (values, {"scale": cap / 65535, "bias": 0.0}),
+        }},
+    }
+
+
+def build_monty(pages):
+    """三门问题：每次试验是否换门、是否获胜，按位打包"""
+    rng = _rng("monty")
+    switch = rng.random(MONTY_TRIALS) < 0.5
+    prize = rng.integers(0, 3, MONTY_TRIALS)
+    pick = rng.integers(0, 3, MONTY_TRIALS)
+    # 主持人总会打开一扇羊门：换门获胜当且仅当初选错误
+    win = np.where(switch, pick != prize, pick == prize)
+    return {
+        "source": "chapter1.js runSimulation",
+        "params": {"trials": MONTY_TRIALS, "bit_order": "big"},
+        "chunks": {"all": {
+            "switch": (np.packbits(switch), {}),
+            "win": (np.packbits(win), {}),
+        }},
+    }
+
+
+DATASETS = {
+    "ev_standard": build_ev_standard,
+    "ev_binomial": build_ev_binomial,
+    "ev_poisson": build_ev_poisson,
+    "pi": build_pi,
+    "option": build_option,
+    "queue": build_queue,
+    "galton": build_galton,
+    "gacha": build_gacha,
+    "monty": build_monty,
+}
+
+PAGES = ("expectation_variance.html", "random_variables.html", "index.html", "chapter1.html")
+
+
+def load_pages():
+    return {page: (TEMPLATE_DIR / page).read_text(encoding="utf-8") for page in PAGES}
+
+
+def encode_chunk(arrays):
+    """{名称: (数组, 量化参数)} -> (字节, arrays 索引)"""
+    parts, specs, offset = [], {}, 0
+    for name, (array, attrs) in arrays.items():
+        array = np.ascontiguousarray(array)
+        array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+        pad = -offset % ALIGN
+        parts.append(b"\0" * pad)
+        offset += pad
+        specs[name] = {"dtype": array.dtype.name, "shape": list(array.shape), "byte_offset": offset, **attrs}
+        data = array.tobytes()
+        parts.append(data)
+        offset += len(data)
+    return b"".join(parts), specs
+
+
+def _write_if_changed(path, data):
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def export_store(out_dir=DEFAULT_OUT, only=None):
+    """生成数据集并写入 out_dir，返回 {数据集: (字节数, 分块数, 写入的文件数, 耗时)}"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index_path = out_dir / INDEX_NAME
+    index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+    index = {"version": 1, "seed": SEED, "datasets": index.get("datasets", {})}
+    pages = load_pages()
+
+    summary = {}
+    for name, builder in DATASETS.items():
+        if only and name not in only:
+            continue
+        start = time.perf_counter()
+        dataset = builder(pages)
+        entry = {"source": dataset["source"], "params": dataset["params"], "chunks": {}}
+        total = written = 0
+        for key, arrays in dataset["chunks"].items():
+            data, specs = encode_chunk(arrays)
+            filename = f"{name}.bin" if key == "all" else f"{name}-{key}.bin"
+            written += _write_if_changed(out_dir / filename, data)
+            entry["chunks"][key] = {"file": filename, "bytes": len(data), "arrays": specs}
+            total += len(data)
+        index["datasets"][name] = entry
+        summary[name] = (total, len(entry["chunks"]), written, time.perf_counter() - start)
+
+    _write_if_changed(index_path, json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    return summary
+
+
+def print_summary(summary):
+    print(f"  {'数据集':<12} {'分块':>5} {'字节':>12} {'写入':>5} {'耗时':>9}")
+    for name, (total, chunks, written, seconds) in summary.items():
+        print(f"  {name:<12} {chunks:>5} {total:>12,} {written:>5} {seconds * 1000:>7.0f}ms")
+    print(f"  {'合计':<12} {sum(s[1] for s in summary.values()):>5} "
+          f"{sum(s[0] for s in summary.values()):>12,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed Monte Carlo store for chapter simulations")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="生成并写入二进制分块与 index.json")
+    export.add_argument("--out", type=str, default=None)
+    export.add_argument("--only", type=str, default=None, help="逗号分隔的数据集名称")
+
+    bench = sub.add_parser("bench", help="只生成不写入，输出各数据集的耗时与体积")
+    bench.add_argument("--only", type=str, default=None, help="逗号分隔的数据集名称")
+
+    args = parser.parse_args()
+    only = set(args.only.split(",")) if args.only else None
+    unknown = (only or set()) - set(DATASETS)
+    if unknown:
+        parser.error(f"未知数据集: {', '.join(sorted(unknown))}")
+
+    if args.command == "export":
+        out_dir = Path(args.out) if args.out else DEFAULT_OUT
+        summary = export_store(out_dir, only)
+        print_summary(summary)
+        print(f"已导出 {len(summary)} 个数据集: {out_dir}")
+    else:
+        pages = load_pages()
+        summary = {}
+        for name, builder in DATASETS.items():
+            if only and name not in only:
+                continue
+            start = time.perf_counter()
+            dataset = builder(pages)
+            sizes = [len(encode_chunk(arrays)[0]) for arrays in dataset["chunks"].values()]
+            summary[name] = (sum(sizes), len(sizes), 0, time.perf_counter() - start)
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+matplotlib SVG 输出后处理与体积预算
+
+  - 坐标精度：d/points/x/y 等几何属性及 translate() 中的小数按 --precision 位取整，
+    路径数据去掉多余空白
+  - 去掉 <metadata> (含生成时间)，使输出可复现
+  - 可选生成 .gz / .br 预压缩副本 (brotli 需要安装 brotli 包)
+  - 打印每个文件处理前后的大小，超出 --budget 字节时返回非零退出码
+
+用法:
+    python tools/optimize_svgs.py static/img/flood_slide_*.svg --precision 2 --compress gzip,br --budget 60000
+"""
+
+import argparse
+import gzip
+import re
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+GEOMETRY_ATTRS = ("d", "points", "transform", "x", "y", "x1", "y1", "x2", "y2",
+                  "width", "height", "cx", "cy", "r", "rx", "ry", "viewBox")
+
+_ATTR_RE = re.compile(r'(\s(?:%s)=")([^"]*)(")' % "|".join(GEOMETRY_ATTRS))
+_NUMBER_RE = re.compile(r"-?\d+\.\d+(?:[eE][-+]?\d+)?")
+_METADATA_RE = re.compile(r"\s*<metadata>.*?</metadata>", re.DOTALL)
+
+
+def _format_number(value, precision):
+    text = f"{float(value):.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def round_coordinates(svg, precision=2):
+    """几何属性中的小数取整，并压缩路径数据中的空白"""
+    def fix_number(match):
+        return _format_number(match.group(0), precision)
+
+    def fix_translate(match):
+        return match.group(1) + _NUMBER_RE.sub(fix_number, match.group(2)) + ")"
+
+    def fix_attr(match):
+        name = match.group(1).strip()[:-2]
+        if name == "transform":
+            # scale()/matrix() 的系数需要保留精度 (字形缩放为 0.015625)，只处理平移
+            value = re.sub(r"(translate\()([^)]*)\)", fix_translate, match.group(2))
+            return match.group(1) + value + match.group(3)
+        value = _NUMBER_RE.sub(fix_number, match.group(2))
+        if name == "d":
+            value = re.sub(r"\s+", " ", value).strip()
+            value = re.sub(r" ?([MLHVCSQTAZmlhvcsqtaz]) ?", r"\1", value)
+        return match.group(1) + value + match.group(3)
+
+    return _ATTR_RE.sub(fix_attr, svg)
+
+
+def strip_metadata(svg):
+    return _METADATA_RE.sub("", svg, count=1)
+
+
+def optimize_svg(svg, precision=2):
+    svg = strip_metadata(svg)
+    svg = round_coordinates(svg, precision)
+    return svg
+
+
+def write_precompressed(path, formats=("gzip",)):
+    """写出 .gz / .br 预压缩副本，返回 {格式: 字节数}"""
+    path = Path(path)
+    data = path.read_bytes()
+    sizes = {}
+    if "gzip" in formats:
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        path.with_name(path.name + ".gz").write_bytes(packed)
+        sizes["gzip"] = len(packed)
+    if "br" in formats and brotli is not None:
+        packed = brotli.compress(data, quality=11)
+        path.with_name(path.name + ".br").write_bytes(packed)
+        sizes["br"] = len(packed)
+    return sizes
+
+
+def optimize_file(path, precision=2, compress=()):
+    """原地优化单个 SVG，返回 {"before", "after", 压缩格式...} 字节数"""
+    path = Path(path)
+    raw = path.read_text(encoding="utf-8")
+    optimized = optimize_svg(raw, precision)
+    if optimized != raw:
+        path.write_text(optimized, encoding="utf-8")
+    stats = {"before": len(raw.encode("utf-8")), "after": len(optimized.encode("utf-8"))}
+    if compress:
+        stats.update(write_precompressed(path, compress))
+    return stats
+
+
+def print_size_report(results, budget=None):
+    """打印大小报告，返回超出预算的文件列表"""
+    over = []
+    print(f"  {'file':<28} {'before':>9} {'after':>9} {'saved':>7} {'gzip':>8} {'br':>8}")
+    for name, stats in results.items():
+        saved = 1 - stats["after"] / stats["before"] if stats["before"] else 0.0
+        flag = ""
+        if budget is not None and stats["after"] > budget:
+            over.append(name)
+            flag = f"  ❌ 超出预算 {budget}"
+        print(f"  {name:<28} {stats['before']:>9,} {stats['after']:>9,} {saved:>6.1%} "
+              f"{stats.get('gzip', '-'):>8} {stats.get('br', '-'):>8}{flag}")
+    return over
+
+
+def parse_compress(value):
+    formats = tuple(v.strip() for v in value.split(",") if v.strip()) if value else ()
+    if "br" in formats and brotli is None:
+        print("⚠️  未安装 brotli，跳过 .br 输出")
+    return formats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize matplotlib SVG output")
+    parser.add_argument("files", nargs="+", help="SVG 文件")
+    parser.add_argument("--precision", type=int, default=2, help="坐标保留的小数位数")
+    parser.add_argument("--compress", type=str, default="", help="预压缩格式，如 gzip,br")
+    parser.add_argument("--budget", type=int, default=None, help="单个文件的字节上限")
+    args = parser.parse_args()
+
+    results = {}
+    for file in args.files:
+        results[Path(file).name] = optimize_file(file, args.precision, parse_compress(args.compress))
+    over = print_size_report(results, args.budget)
+    if over:
+        print(f"❌ {len(over)} 个文件超出体积预算")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,538 @@
+"""
+统计分布参考内核 (向量化 NumPy，不依赖 SciPy)
+
+正态、t、卡方、F、贝塔、伽马、二项、泊松分布的 pdf / cdf / ppf，参数按 NumPy 广播规则
+可以是标量或数组。作为页面内 JS 特殊函数 (gamma、incompleteBeta、normalInverse 等) 的精度基准，
+见 tools/js_stats_harness.py。
+
+底层只有三个特殊函数，其余都由它们组合得到：
+  gammaln      Lanczos 近似 (g = 607/128，15 项)，相对误差约 1e-15
+  gammainc     正则化不完全伽马函数 P(a, x) / Q(a, x)：x < a+1 用级数，否则用 Lentz 连分数
+  betainc      正则化不完全贝塔函数 I_x(a, b)：Lentz 连分数，按 x 与 (a+1)/(a+b+2) 的关系取对称形式
+ppf 由 gammaincinv / betaincinv (有界 Newton + 二分) 得到；正态分位数用 Acklam 初值加一步 Halley 修正。
+
+用法:
+    python tools/stats_kernels.py check          # 与标准库 / 闭式解对比，验证内核自身精度
+    python tools/stats_kernels.py bench --points 1000000
+"""
+
+import argparse
+import math
+import statistics
+import time
+
+import numpy as np
+
+EPS = 1e-15
+FPMIN = 1e-300
+MAX_ITER = 1000
+
+_LANCZOS_G = 607 / 128
+_LANCZOS = np.array([
+    57.1562356658629235, -59.5979603554754912, 14.1360979747417471, -0.491913816097620199,
+    0.339946499848118887e-4, 0.465236289270485756e-4, -0.983744753048795646e-4,
+    0.158088703224912494e-3, -0.210264441724104883e-3, 0.217439618115212643e-3,
+    -0.164318106536763890e-3, 0.844182239838527433e-4, -0.261908384015814087e-4,
+    0.368991826595316234e-5,
+])
+
+# Acklam 正态分位数有理逼近 (与 interval_estimation.html normalInverse 相同的系数)
+_ACKLAM_A = (-3.969683028665376e1, 2.209460984245205e2, -2.759285104469687e2,
+             1.383577518672690e2, -3.066479806614716e1, 2.506628277459239)
+_ACKLAM_B = (-5.447609879822406e1, 1.615858368580409e2, -1.556989798598866e2,
+             6.680131188771972e1, -1.328068155288572e1)
+_ACKLAM_C = (-7.784894002430293e-3, -3.223964580411365e-1, -2.400758277161838,
+             -2.549732539343734, 4.374664141464968, 2.938163982698783)
+_ACKLAM_D = (7.784695709041462e-3, 3.224671290700398e-1, 2.445134137142996, 3.754408661907416)
+
+
+def _arrays(*args):
+    return np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in args))
+
+
+def _polyval(coefs, x):
+    out = np.zeros_like(x)
+    for c in coefs:
+        out = out * x + c
+    return out
+
+
+# ---- 特殊函数 ----
+def gammaln(x):
+    """ln Γ(x)，x > 0"""
+    x = np.asarray(x, dtype=np.float64)
+    y = x.copy()
+    ser = np.full_like(x, 0.999999999999997092)
+    for c in _LANCZOS:
+        y = y + 1
+        ser += c / y
+    tmp = x + _LANCZOS_G + 0.5
+    return (x + 0.5) * np.log(tmp) - tmp + np.log(2.5066282746310005 * ser / x)
+
+
+def _gamma_series(a, x):
+    """P(a, x) 的级数部分 (未乘前因子)"""
+    ap = a.copy()
+    term = 1 / a
+    total = term.copy()
+    active = np.ones(a.shape, dtype=bool)
+    for _ in range(MAX_ITER):
+        ap = ap + 1
+        term = np.where(active, term * x / ap, 0)
+        total += term
+        active &= np.abs(term) >= np.abs(total) * EPS
+        if not active.any():
+            break
+    return total
+
+
+def _gamma_cf(a, x):
+    """Q(a, x) 的连分数部分 (未乘前因子)"""
+    b = x + 1 - a
+    c = np.full_like(x, 1 / FPMIN)
+    d = 1 / b
+    h = d.copy()
+    active = np.ones(a.shape, dtype=bool)
+    for i in range(1, MAX_ITER):
+        an = -i * (i - a)
+        b = b + 2
+        d = an * d + b
+        d = np.where(np.abs(d) < FPMIN, FPMIN, d)
+        c = b + an / c
+        c = np.where(np.abs(c) < FPMIN, FPMIN, c)
+        d = 1 / d
+        delta = np.where(active, d * c, 1)
+        h *= delta
+        active &= np.abs(delta - 1) >= EPS
+        if not active.any():
+            break
+    return h
+
+
+def gammainc(a, x, upper=False):
+    """正则化不完全伽马函数 P(a, x)；upper=True 时返回 Q(a, x) = 1 - P(a, x)"""
+    a, x = _arrays(a, x)
+    out = np.zeros(a.shape)
+    pos = x > 0
+    series = pos & (x < a + 1)
+    cf = pos & ~series
+    with np.errstate(divide="ignore", invalid="ignore", under="ignore"):
+        if series.any():
+            aa, xx = a[series], x[series]
+            lower = np.exp(aa * np.log(xx) - xx - gammaln(aa)) * _gamma_series(aa, xx)
+            out[series] = 1 - lower if upper else lower
+        if cf.any():
+            aa, xx = a[cf], x[cf]
+            q = np.exp(aa * np.log(xx) - xx - gammaln(aa)) * _gamma_cf(aa, xx)
+            out[cf] = q if upper else 1 - q
+    if upper:
+        out[~pos] = 1
+    out[np.isinf(x) & (x > 0)] = 0 if upper else 1
+    return out
+
+
+def _beta_cf(a, b, x):
+    qab, qap, qam = a + b, a + 1, a - 1
+    c = np.ones_like(x)
+    d = 1 - qab * x / qap
+    d = 1 / np.where(np.abs(d) < FPMIN, FPMIN, d)
+    h = d.copy()
+    active = np.ones(x.shape, dtype=bool)
+    for m in range(1, MAX_ITER):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1 + aa * d
+            d = 1 / np.where(np.abs(d) < FPMIN, FPMIN, d)
+            c = 1 + aa / c
+            c = np.where(np.abs(c) < FPMIN, FPMIN, c)
+            delta = np.where(active, d * c, 1)
+            h *= delta
+        active &= np.abs(delta - 1) >= EPS
+        if not active.any():
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """正则化不完全贝塔函数 I_x(a, b)"""
+    a, b, x = _arrays(a, b, x)
+    out = np.where(x >= 1, 1.0, 0.0)
+    inner = (x > 0) & (x < 1)
+    if inner.any():
+        aa, bb, xx = a[inner], b[inner], x[inner]
+        front = np.exp(gammaln(aa + bb) - gammaln(aa) - gammaln(bb) + aa * np.log(xx) + bb * np.log1p(-xx))
+        direct = xx < (aa + 1) / (aa + bb + 2)
+        res = np.empty_like(xx)
+        if direct.any():
+            res[direct] = front[direct] * _beta_cf(aa[direct], bb[direct], xx[direct]) / aa[direct]
+        flip = ~direct
+        if flip.any():
+            res[flip] = 1 - front[flip] * _beta_cf(bb[flip], aa[flip], 1 - xx[flip]) / bb[flip]
+        out[inner] = res
+    return out
+
+
+def erf(x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.sign(x) * gammainc(0.5, x * x)
+
+
+def erfc(x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.where(x >= 0, gammainc(0.5, x * x, upper=True), 1 + gammainc(0.5, x * x))
+
+
+def _invert(cdf, pdf, p, lo, hi, x0, iterations=200):
+    """在 [lo, hi] 上求 cdf(x) = p：Newton 步越界或不收敛时改用二分 (hi 可以为 inf，此时倍增)"""
+    x = x0.copy()
+    lo, hi = lo.copy(), hi.copy()
+    active = np.ones(x.shape, dtype=bool)
+    for _ in range(iterations):
+        idx = np.nonzero(active)[0]
+        if idx.size == 0:
+            break
+        xi = x[idx]
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            f = cdf(xi, idx) - p[idx]
+            below = f < 0
+            lo[idx] = np.where(below, xi, lo[idx])
+            hi[idx] = np.where(below, hi[idx], xi)
+            step = f / pdf(xi, idx)
+            newton = xi - step
+        bisect = np.where(np.isinf(hi[idx]), 2 * xi + 1, 0.5 * (lo[idx] + hi[idx]))
+        ok = np.isfinite(newton) & (newton > lo[idx]) & (newton < hi[idx])
+        new = np.where(f == 0, xi, np.where(ok, newton, bisect))
+        x[idx] = new
+        done = (np.abs(new - xi) <= 1e-14 * np.maximum(np.abs(new), FPMIN)) | (f == 0)
+        done |= np.isfinite(hi[idx]) & ((hi[idx] - lo[idx]) <= 4e-16 * np.maximum(np.abs(hi[idx]), FPMIN))
+        active[idx[done]] = False
+    return x
+
+
+def gammaincinv(a, p):
+    """P(a, x) = p 的解 x"""
+    a, p = _arrays(a, p)
+    shape = a.shape
+    a, p = a.ravel(), p.ravel()
+    # Wilson-Hilferty 初值
+    z = norm_ppf(p)
+    x0 = a * (1 - 1 / (9 * a) + z / (3 * np.sqrt(a))) ** 3
+    x0 = np.where((x0 > 0) & np.isfinite(x0), x0, np.maximum(a, 1e-3))
+    log_norm = gammaln(a)
+    x = _invert(lambda x, i: gammainc(a[i], x),
+                lambda x, i: np.exp((a[i] - 1) * np.log(x) - x - log_norm[i]),
+                p, np.zeros_like(p), np.full_like(p, np.inf), x0)
+    x = np.where(p <= 0, 0.0, np.where(p >= 1, np.inf, x))
+    return x.reshape(shape)
+
+
+def betaincinv(a, b, p):
+    """I_x(a, b) = p 的解 x"""
+    a, b, p = _arrays(a, b, p)
+    shape = a.shape
+    a, b, p = a.ravel(), b.ravel(), p.ravel()
+    log_norm = gammaln(a) + gammaln(b) - gammaln(a + b)
+    x0 = np.clip(a / (a + b), 1e-6, 1 - 1e-6)
+    x = _invert(lambda x, i: betainc(a[i], b[i], x),
+                lambda x, i: np.exp((a[i] - 1) * np.log(x) + (b[i] - 1) * np.log1p(-x) - log_norm[i]),
+                p, np.zeros_like(p), np.ones_like(p), x0)
+    x = np.where(p <= 0, 0.0, np.where(p >= 1, 1.0, x))
+    return x.reshape(shape)
+
+
+# ---- 正态 ----
+def norm_pdf(x, mu=0.0, sigma=1.0):
+    x, mu, sigma = _arrays(x, mu, sigma)
+    z = (x - mu) / sigma
+    return np.exp(-0.5 * z * z) / (sigma * math.sqrt(2 * math.pi))
+
+
+def norm_cdf(x, mu=0.0, sigma=1.0):
+    x, mu, sigma = _arrays(x, mu, sigma)
+    return 0.5 * erfc(-(x - mu) / (sigma * math.sqrt(2)))
+
+
+def norm_ppf(p, mu=0.0, sigma=1.0):
+    """Acklam 有理逼近 + 一步 Halley 修正"""
+    p, mu, sigma = _arrays(p, mu, sigma)
+    q = np.minimum(p, 1 - p)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.sqrt(-2 * np.log(q))
+        tail = _polyval(_ACKLAM_C, t) / (_polyval(_ACKLAM_D, t) * t + 1)
+        r = (p - 0.5) ** 2
+        central = (p - 0.5) * _polyval(_ACKLAM_A, r) / (_polyval(_ACKLAM_B, r) * r + 1)
+        x = np.where(q < 0.02425, np.where(p < 0.5, tail, -tail), central)
+        e = 0.5 * erfc(-x / math.sqrt(2)) - p
+        u = e * math.sqrt(2 * math.pi) * np.exp(x * x / 2)
+        refined = x - u / (1 + x * u / 2)
+    x = np.where(np.isfinite(refined), refined, x)
+    x = np.where(p <= 0, -np.inf, np.where(p >= 1, np.inf, x))
+    return mu + sigma * x
+
+
+# ---- t ----
+def t_pdf(x, df):
+    x, df = _arrays(x, df)
+    log_c = gammaln((df + 1) / 2) - gammaln(df / 2) - 0.5 * np.log(df * math.pi)
+    return np.exp(log_c - (df + 1) / 2 * np.log1p(x * x / df))
+
+
+def t_cdf(x, df):
+    x, df = _arrays(x, df)
+    tail = 0.5 * betainc(df / 2, 0.5, df / (df + x * x))
+    return np.where(x > 0, 1 - tail, tail)
+
+
+def t_ppf(p, df):
+    """cdf = I_y(df/2, 1/2) / 2 (y = df / (df + t^2))，对较小的尾部概率求解再按对称性取号"""
+    p, df = _arrays(p, df)
+    q = np.minimum(p, 1 - p)
+    # p 接近 0.5 时 y → 1，改解 1 - y = I^{-1}_{1-2q}(1/2, df/2) 以免相减丢失精度
+    near = q > 0.25
+    t = np.empty(q.shape)
+    with np.errstate(divide="ignore"):
+        y = betaincinv(df[~near] / 2, 0.5, 2 * q[~near])
+        t[~near] = np.sqrt(df[~near] * (1 - y) / y)
+        w = betaincinv(0.5, df[near] / 2, 1 - 2 * q[near])
+        t[near] = np.sqrt(df[near] * w / (1 - w))
+    return np.where(p < 0.5, -t, t)
+
+
+# ---- 卡方 ----
+def chi2_pdf(x, k):
+    return gamma_pdf(x, np.asarray(k, dtype=np.float64) / 2, 0.5)
+
+
+def chi2_cdf(x, k):
+    return gamma_cdf(x, np.asarray(k, dtype=np.float64) / 2, 0.5)
+
+
+def chi2_ppf(p, k):
+    return gamma_ppf(p, np.asarray(k, dtype=np.float64) / 2, 0.5)
+
+
+# ---- F ----
+def f_pdf(x, d1, d2):
+    x, d1, d2 = _arrays(x, d1, d2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pdf = (0.5 * d1 * np.log(d1 / d2) + (0.5 * d1 - 1) * np.log(x)
+                   - 0.5 * (d1 + d2) * np.log1p(d1 * x / d2)
+                   - (gammaln(d1 / 2) + gammaln(d2 / 2) - gammaln((d1 + d2) / 2)))
+        return np.where(x > 0, np.exp(log_pdf), 0.0)
+
+
+def f_cdf(x, d1, d2):
+    x, d1, d2 = _arrays(x, d1, d2)
+    xc = np.maximum(x, 0)
+    return betainc(d1 / 2, d2 / 2, d1 * xc / (d1 * xc + d2))
+
+
+def f_ppf(p, d1, d2):
+    p, d1, d2 = _arrays(p, d1, d2)
+    y = betaincinv(d1 / 2, d2 / 2, p)
+    with np.errstate(divide="ignore"):
+        return d2 * y / (d1 * (1 - y))
+
+
+# ---- 贝塔 ----
+def beta_pdf(x, a, b):
+    x, a, b = _arrays(x, a, b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pdf = (a - 1) * np.log(x) + (b - 1) * np.log1p(-x) - (gammaln(a) + gammaln(b) - gammaln(a + b))
+        return np.where((x > 0) & (x < 1), np.exp(log_pdf), 0.0)
+
+
+def beta_cdf(x, a, b):
+    return betainc(a, b, x)
+
+
+def beta_ppf(p, a, b):
+    return betaincinv(a, b, p)
+
+
+# ---- 伽马 (形状 alpha，速率 beta，与 probability_distributions.html 一致) ----
+def gamma_pdf(x, alpha, beta=1.0):
+    x, alpha, beta = _arrays(x, alpha, beta)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pdf = alpha * np.log(beta) + (alpha - 1) * np.log(x) - beta * x - gammaln(alpha)
+        return np.where(x > 0, np.exp(log_pdf), 0.0)
+
+
+def gamma_cdf(x, alpha, beta=1.0):
+    x, alpha, beta = _arrays(x, alpha, beta)
+    return gammainc(alpha, beta * x)
+
+
+def gamma_ppf(p, alpha, beta=1.0):
+    p, alpha, beta = _arrays(p, alpha, beta)
+    return gammaincinv(alpha, p) / beta
+
+
+# ---- 二项 ----
+def binom_pmf(k, n, p):
+    k, n, p = _arrays(k, n, p)
+    valid = (k >= 0) & (k <= n) & (k == np.floor(k))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_c = gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1)
+        # 0 * log(0) 按 0 处理，p = 0 或 1 时也成立
+        log_pk = np.where(k > 0, k * np.log(p), 0.0) + np.where(n - k > 0, (n - k) * np.log1p(-p), 0.0)
+        return np.where(valid, np.exp(log_c + log_pk), 0.0)
+
+
+def binom_cdf(k, n, p):
+    k, n, p = _arrays(k, n, p)
+    k = np.floor(k)
+    inner = (k >= 0) & (k < n)
+    out = np.where(k >= n, 1.0, 0.0)
+    if inner.any():
+        out[inner] = betainc(n[inner] - k[inner], k[inner] + 1, 1 - p[inner])
+    return out
+
+
+def binom_ppf(q, n, p):
+    """最小的 k 使 cdf(k) >= q (整数二分)"""
+    q, n, p = _arrays(q, n, p)
+    lo = np.full(q.shape, -1.0)
+    hi = n.copy()
+    while (hi - lo > 1).any():
+        mid = np.floor((lo + hi) / 2)
+        ok = binom_cdf(mid, n, p) >= q
+        hi = np.where(ok & (hi - lo > 1), mid, hi)
+        lo = np.where(~ok & (hi - lo > 1), mid, lo)
+    return hi
+
+
+# ---- 泊松 ----
+def poisson_pmf(k, lam):
+    k, lam = _arrays(k, lam)
+    valid = (k >= 0) & (k == np.floor(k))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pmf = np.where(k > 0, k * np.log(lam), 0.0) - lam - gammaln(k + 1)
+        return np.where(valid, np.exp(log_pmf), 0.0)
+
+
+def poisson_cdf(k, lam):
+    k, lam = _arrays(k, lam)
+    k = np.floor(k)
+    out = np.zeros(k.shape)
+    valid = k >= 0
+    if valid.any():
+        out[valid] = gammainc(k[valid] + 1, lam[valid], upper=True)
+    return out
+
+
+def poisson_ppf(q, lam):
+    q, lam = _arrays(q, lam)
+    lo = np.full(q.shape, -1.0)
+    hi = np.ceil(lam + 10 * np.sqrt(lam) + 20)
+    # 上界不够时倍增
+    while (poisson_cdf(hi, lam) < q).any():
+        hi = np.where(poisson_cdf(hi, lam) < q, 2 * hi, hi)
+    while (hi - lo > 1).any():
+        mid = np.floor((lo + hi) / 2)
+        ok = poisson_cdf(mid, lam) >= q
+        hi = np.where(ok & (hi - lo > 1), mid, hi)
+        lo = np.where(~ok & (hi - lo > 1), mid, lo)
+    return hi
+
+
+def self_check():
+    """与标准库、闭式解或往返一致性对比，返回 [(检查项, 最大误差, 点数)]"""
+    rng = np.random.default_rng(0)
+    nd = statistics.NormalDist()
+    x = np.concatenate([rng.uniform(1e-3, 5, 500), rng.uniform(5, 170, 500)])
+    z = rng.uniform(-8, 8, 1000)
+    p = np.concatenate([rng.uniform(1e-12, 1e-3, 200), rng.uniform(1e-3, 1 - 1e-3, 800)])
+    df = rng.integers(1, 60, 1000).astype(float)
+    a, b = rng.uniform(0.2, 20, 1000), rng.uniform(0.2, 20, 1000)
+    u = rng.uniform(0.001, 0.999, 1000)
+    k = rng.integers(0, 40, 1000).astype(float)
+    n = k + rng.integers(0, 40, 1000)
+    lam = rng.uniform(0.1, 30, 1000)
+
+    def rel(got, want):
+        return float(np.max(np.abs(got - want) / np.maximum(np.abs(want), 1e-300)))
+
+    def mixed(got, want):
+        return float(np.max(np.abs(got - want) / np.maximum(np.abs(want), 1)))
+
+    def absolute(got, want):
+        return float(np.max(np.abs(got - want)))
+
+    binom_exact = [sum(math.comb(int(nn), j) * pp ** j * (1 - pp) ** (int(nn) - j) for j in range(int(kk) + 1))
+                   for kk, nn, pp in zip(k, n, u)]
+    poisson_exact = [math.fsum(math.exp(j * math.log(ll) - ll - math.lgamma(j + 1)) for j in range(int(kk) + 1))
+                     for kk, ll in zip(k, lam)]
+    checks = [
+        ("gammaln vs math.lgamma", mixed(gammaln(x), np.array([math.lgamma(v) for v in x]))),
+        ("erf vs math.erf", absolute(erf(z), np.array([math.erf(v) for v in z]))),
+        ("erfc vs math.erfc (相对)", rel(erfc(z[z > 0]), np.array([math.erfc(v) for v in z[z > 0]]))),
+        ("norm_cdf vs NormalDist", absolute(norm_cdf(z), np.array([nd.cdf(v) for v in z]))),
+        ("norm_ppf vs NormalDist (相对)", rel(norm_ppf(p), np.array([nd.inv_cdf(v) for v in p]))),
+        ("t_cdf(df=1) vs Cauchy", absolute(t_cdf(z, 1), 0.5 + np.arctan(z) / math.pi)),
+        ("t_cdf(df=2) 闭式解", absolute(t_cdf(z, 2), 0.5 + z / (2 * np.sqrt(2 + z * z)))),
+        ("chi2_cdf(k=2) vs 1-exp(-x/2)", absolute(chi2_cdf(x[:500], 2), -np.expm1(-x[:500] / 2))),
+        ("beta_cdf(a,1) vs x^a", absolute(beta_cdf(u, a, 1), u ** a)),
+        ("binom_cdf vs 逐项求和", absolute(binom_cdf(k, n, u), np.array(binom_exact))),
+        ("poisson_cdf vs 逐项求和", absolute(poisson_cdf(k, lam), np.array(poisson_exact))),
+        ("t_ppf 往返", absolute(t_cdf(t_ppf(p, df), df), p)),
+        ("chi2_ppf 往返 (相对)", rel(chi2_cdf(chi2_ppf(p, df), df), p)),
+        ("f_ppf 往返", absolute(f_cdf(f_ppf(p, df, df[::-1]), df, df[::-1]), p)),
+        ("beta_ppf 往返", absolute(beta_cdf(beta_ppf(p, a, b), a, b), p)),
+        ("gamma_ppf 往返 (相对)", rel(gamma_cdf(gamma_ppf(p, a, b), a, b), p)),
+        ("binom_ppf 最小性", float(np.max(binom_cdf(binom_ppf(u, n, 0.3) - 1, n, 0.3) >= u))),
+        ("poisson_ppf 最小性", float(np.max(poisson_cdf(poisson_ppf(u, lam) - 1, lam) >= u))),
+    ]
+    return [(name, err, 1000) for name, err in checks]
+
+
+def benchmark(points=1_000_000, repeat=3):
+    """各函数在 points 个点上的最佳耗时 (秒)"""
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0.01, 10, points)
+    p = rng.uniform(0.001, 0.999, points)
+    shape = rng.uniform(0.5, 10, points)
+    df = rng.integers(1, 50, points).astype(float)
+    cases = {
+        "norm_cdf": lambda: norm_cdf(x - 5),
+        "norm_ppf": lambda: norm_ppf(p),
+        "t_cdf": lambda: t_cdf(x - 5, df),
+        "chi2_cdf": lambda: chi2_cdf(x, df),
+        "gamma_cdf": lambda: gamma_cdf(x, shape, 1.0),
+        "beta_cdf": lambda: beta_cdf(p, shape, shape[::-1]),
+        "binom_cdf": lambda: binom_cdf(np.floor(x), 20, p),
+        "poisson_cdf": lambda: poisson_cdf(np.floor(x), shape),
+        "t_ppf": lambda: t_ppf(p[:points // 10], df[:points // 10]),
+    }
+    timings = {}
+    for name, fn in cases.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = (best, points // 10 if name.endswith("ppf") and name != "norm_ppf" else points)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized reference statistics kernels")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("check", help="与标准库 / 闭式解对比")
+    bench = sub.add_parser("bench", help="评估吞吐量")
+    bench.add_argument("--points", type=int, default=1_000_000)
+    bench.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "check":
+        for name, err, count in self_check():
+            mark = "✅" if err < 1e-10 else "⚠️"
+            print(f"  {mark} {name:<32} {err:.2e}")
+    else:
+        for name, (seconds, count) in benchmark(args.points, args.repeat).items():
+            print(f"  {name:<12} {count:>9,} 点 {seconds * 1000:9.1f} ms  {count / seconds / 1e6:8.2f} M点/秒")
+
+
+if __name__ == "__main__":
+    main()
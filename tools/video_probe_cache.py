@@ -0,0 +1,186 @@
+"""
+视频探测结果的持久化缓存 (SQLite)
+
+以 (绝对路径, 文件大小, mtime) 作为文件身份，可选再加头尾各 1MB 的哈希
+(应对拷贝后 mtime 被保留、或同尺寸原地改写的情况)。身份不变时直接返回上次的
+结果，不再启动 ffprobe / ffmpeg 子进程。
+
+每个文件按 kind 存多份结果：
+  - probe   : ffprobe 的原始 JSON (streams + format)
+  - verdict : Alpha 判定摘要
+  - frame   : 抽帧透明度统计
+
+用法:
+    python tools/video_probe_cache.py stats
+    python tools/video_probe_cache.py evict --max-age-days 30 --max-entries 5000
+    python tools/video_probe_cache.py clear [路径 ...]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'video_probe.sqlite')
+
+# 头尾哈希各读取的字节数
+HASH_BYTES = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probe_results (
+    path     TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest   TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    created  REAL NOT NULL,
+    PRIMARY KEY (path, kind)
+)
+"""
+
+
+def head_tail_digest(path, nbytes=HASH_BYTES):
+    """文件开头和结尾各 nbytes 字节的 sha1"""
+    h = hashlib.sha1()
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        h.update(f.read(nbytes))
+        if size > nbytes:
+            f.seek(max(nbytes, size - nbytes))
+            h.update(f.read(nbytes))
+    return h.hexdigest()
+
+
+class ProbeCache:
+    """
+    线程安全的探测结果缓存
+
+    max_age_days / max_entries 为淘汰阈值，None 表示不限；
+    use_hash=True 时文件身份额外包含头尾哈希
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_age_days=None, max_entries=None, use_hash=False):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def _identity(self, video_path):
+        st = os.stat(video_path)
+        digest = head_tail_digest(video_path) if self.use_hash else ''
+        return os.path.abspath(video_path), st.st_size, st.st_mtime_ns, digest
+
+    def get(self, video_path, kind='probe'):
+        """身份匹配且未过期时返回缓存值，否则返回 None"""
+        try:
+            key, size, mtime_ns, digest = self._identity(video_path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, digest, value, created FROM probe_results WHERE path = ? AND kind = ?',
+                (key, kind)).fetchone()
+        fresh = (row is not None and row[0] == size and row[1] == mtime_ns
+                 and (not self.use_hash or row[2] == digest)
+                 and (self.max_age_days is None or time.time() - row[4] <= self.max_age_days * 86400))
+        if not fresh:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[3])
+
+    def put(self, video_path, value, kind='probe'):
+        try:
+            key, size, mtime_ns, digest = self._identity(video_path)
+        except OSError:
+            return
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO probe_results VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, kind, size, mtime_ns, digest, json.dumps(value, ensure_ascii=False), time.time()))
+            self._conn.commit()
+
+    def invalidate(self, video_path=None):
+        """删除某个文件的全部缓存；不传路径时清空整个缓存。返回删除行数"""
+        with self._lock:
+            if video_path is None:
+                cursor = self._conn.execute('DELETE FROM probe_results')
+            else:
+                cursor = self._conn.execute('DELETE FROM probe_results WHERE path = ?',
+                                            (os.path.abspath(video_path),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def evict(self, max_age_days=None, max_entries=None):
+        """
+        按时间和数量淘汰：先删除超龄条目，再只保留最新的 max_entries 个文件
+        (同一文件的各 kind 一起保留或删除)。返回删除行数
+        """
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        max_entries = self.max_entries if max_entries is None else max_entries
+        removed = 0
+        with self._lock:
+            if max_age_days is not None:
+                cursor = self._conn.execute('DELETE FROM probe_results WHERE created < ?',
+                                            (time.time() - max_age_days * 86400,))
+                removed += cursor.rowcount
+            if max_entries is not None:
+                cursor = self._conn.execute(
+                    'DELETE FROM probe_results WHERE path NOT IN ('
+                    ' SELECT path FROM probe_results GROUP BY path ORDER BY MAX(created) DESC LIMIT ?)',
+                    (max_entries,))
+                removed += cursor.rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self):
+        with self._lock:
+            files, rows = self._conn.execute(
+                'SELECT COUNT(DISTINCT path), COUNT(*) FROM probe_results').fetchone()
+            kinds = dict(self._conn.execute(
+                'SELECT kind, COUNT(*) FROM probe_results GROUP BY kind').fetchall())
+        return {'files': files, 'rows': rows, 'kinds': kinds,
+                'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频探测结果缓存维护")
+    parser.add_argument('command', choices=['stats', 'evict', 'clear'])
+    parser.add_argument('paths', nargs='*', help="clear 时只删除这些视频的缓存")
+    parser.add_argument('--cache', type=str, default=DEFAULT_CACHE_PATH, help="缓存数据库路径")
+    parser.add_argument('--max-age-days', type=float, default=None)
+    parser.add_argument('--max-entries', type=int, default=None)
+    args = parser.parse_args()
+
+    cache = ProbeCache(args.cache)
+    if args.command == 'stats':
+        stats = cache.stats()
+        print(f"缓存: {args.cache}")
+        print(f"  文件数: {stats['files']}  记录数: {stats['rows']}  {stats['kinds']}")
+    elif args.command == 'evict':
+        removed = cache.evict(args.max_age_days, args.max_entries)
+        print(f"已淘汰 {removed} 条记录")
+    else:
+        removed = sum(cache.invalidate(p) for p in args.paths) if args.paths else cache.invalidate()
+        print(f"已删除 {removed} 条记录")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
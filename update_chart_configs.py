@@ -3,85 +3,155 @@
 """
 更新理解度追踪图表配置脚本
 根据每个卡片中实际的derivation-step和property-step数量，更新对应的图表配置
+
+配置来自 chart_configs.json (页面文件名 -> 图表函数名 -> labels / data_length)。
+先用 js_functions 为内联脚本建立函数索引，只在对应函数体内定位 labels 与 data 数组，
+按偏移替换，并沿用原数组的引号与换行风格，内容相同时不产生修改。
+
+作为 html_transform 的 chart-config 规则，也可以和其他规则一起批量运行:
+    python html_transform.py --rules ai-help,chart-config
 """
 
-import re
+import json
 import os
+import re
 
-def update_chart_configurations():
-    """更新所有理解度追踪图表的配置"""
-    
-    file_path = "templates/law_of_large_numbers.html"
-    
-    if not os.path.exists(file_path):
-        print(f"错误：文件 {file_path} 不存在")
-        return False
-    
-    # 读取文件内容
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 定义每个图表的新配置
-    chart_configs = {
-        'initUnderstandingChart': {
-            'labels': ['切比雪夫不等式', '样本均值性质', '应用不等式', '取极限', '收敛速度', '样本量要求', '方差未知'],
-            'data_length': 7
-        },
-        'initUnderstandingChart2': {
-            'labels': ['特征函数方法', '泰勒展开', '收敛结果', '普适性', '收敛速度', '统计推断基础', '实际应用示例'],
-            'data_length': 7
-        },
-        'initUnderstandingChart3': {
-            'labels': ['弱大数定律', '强大数定律', '收敛性关系', 'Kolmogorov定理', '切比雪夫方法', '条件差异', '实际意义', '经典实例', '反例分析'],
-            'data_length': 9
-        },
-        'initUnderstandingChart4': {
-            'labels': ['切比雪夫界', 'Hoeffding界', '样本量计算', 'Bernstein不等式', 'Bennett不等式', 'A/B测试', '蒙特卡洛方法', '投票调查示例', 'VaR估计'],
-            'data_length': 9
-        },
-        'initUnderstandingChart5': {
-            'labels': ['多元推广', '函数大数定律', '马尔可夫链', '鞅论应用', '随机场', '机器学习', '时间序列', '网络科学', '量子物理', '生物信息学'],
-            'data_length': 10
-        }
-    }
-    
-    # 更新每个图表函数
-    for func_name, config in chart_configs.items():
-        print(f"更新 {func_name}...")
-        
-        # 构建新的标签数组字符串
-        labels_str = "', '".join(config['labels'])
-        labels_array = f"['{labels_str}']"
-        
-        # 构建新的数据数组
-        data_array = f"[{', '.join(['0'] * config['data_length'])}]"
-        
-        # 查找并替换函数定义
-        pattern = rf'(function {func_name}\(\) \{{.*?labels:\s*)\[[^\]]*\](.*?data:\s*)\[[^\]]*\](.*?\}})'
-        
-        def replacement(match):
-            return f"{match.group(1)}{labels_array}{match.group(2)}{data_array}{match.group(3)}"
-        
-        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-    
-    # 写回文件
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    print("✅ 所有图表配置更新完成！")
-    
-    # 验证更新结果
-    print("\n📊 更新后的配置：")
+from html_transform import Rule, register_rule, transform_file
+from js_functions import JSIndex, match_bracket
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chart_configs.json")
+
+_LABELS_RE = re.compile(r'\blabels\s*:\s*\[')
+_DATA_RE = re.compile(r'\bdata\s*:\s*\[')
+
+_configs = {}
+
+
+def load_chart_configs(path=CONFIG_PATH):
+    """读取图表配置 (同一进程内每个文件只读一次)"""
+    if path not in _configs:
+        with open(path, 'r', encoding='utf-8') as f:
+            _configs[path] = json.load(f)
+    return _configs[path]
+
+
+def _line_indent(text, offset):
+    line_start = text.rfind('\n', 0, offset) + 1
+    line = text[line_start:offset]
+    return line[:len(line) - len(line.lstrip())]
+
+
+def format_array(items, old, indent):
+    """按原数组的风格 (引号、是否逐行) 生成新的数组字面量"""
+    quote = "'" if re.match(r"\[\s*'", old) else '"'
+
+    def literal(item):
+        if not isinstance(item, str):
+            return json.dumps(item)
+        if quote == '"':
+            return json.dumps(item, ensure_ascii=False)
+        return "'" + item.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+    values = [literal(item) for item in items]
+    if '\n' in old:
+        inner = ''.join(f"{indent}  {value},\n" for value in values)
+        return f"[\n{inner}{indent}]"
+    return f"[{', '.join(values)}]"
+
+
+def chart_edits(content, index, func_name, config):
+    """
+    返回某个图表函数的替换列表 [(start, end, 新文本)]
+    labels 取函数体内第一个 labels 数组，data 取其后第一个 data 数组
+    """
+    fn = index.locate(func_name)
+    if fn is None:
+        raise ValueError(f"未找到函数 {func_name}")
+    edits = []
+    labels = _LABELS_RE.search(content, fn.body_start, fn.end)
+    if labels is None:
+        raise ValueError(f"{func_name} 中没有 labels 数组")
+    labels_open = labels.end() - 1
+    labels_end = match_bracket(content, labels_open, fn.end)
+    if labels_end is None:
+        raise ValueError(f"{func_name} 的 labels 数组括号不匹配")
+    edits.append((labels_open, labels_end, config['labels']))
+
+    data = _DATA_RE.search(content, labels_end, fn.end)
+    if data is None:
+        raise ValueError(f"{func_name} 中没有 data 数组")
+    data_open = data.end() - 1
+    data_end = match_bracket(content, data_open, fn.end)
+    if data_end is None:
+        raise ValueError(f"{func_name} 的 data 数组括号不匹配")
+    data_length = config.get('data_length', len(config['labels']))
+    edits.append((data_open, data_end, [0] * data_length))
+
+    return [(start, end, format_array(items, content[start:end], _line_indent(content, start)))
+            for start, end, items in edits]
+
+
+def apply_chart_configs(content, chart_configs):
+    """替换各图表函数中的 labels 与 data 数组，返回 (新内容, 出错信息列表)"""
+    index = JSIndex(content)
+    edits = []
+    errors = []
     for func_name, config in chart_configs.items():
-        print(f"  {func_name}: {config['data_length']}个步骤")
-    
+        try:
+            edits.extend(chart_edits(content, index, func_name, config))
+        except ValueError as e:
+            errors.append(str(e))
+
+    # 从后往前拼接，前面的偏移不受影响
+    for start, end, replacement in sorted(edits, reverse=True):
+        if content[start:end] != replacement:
+            content = content[:start] + replacement + content[end:]
+    return content, errors
+
+
+@register_rule('chart-config')
+class ChartConfigRule(Rule):
+    """按 chart_configs.json 更新理解度追踪图表的标签和数据长度"""
+
+    def __init__(self, configs=None):
+        self.configs = configs
+
+    def rewrite(self, text, ctx):
+        configs = self.configs if self.configs is not None else load_chart_configs()
+        page_configs = configs.get(os.path.basename(ctx.path or ''))
+        if not page_configs:
+            return text
+        text, errors = apply_chart_configs(text, page_configs)
+        for error in errors:
+            print(f"⚠️  {ctx.path}: {error}")
+        return text
+
+
+def update_chart_configurations(template_dir="templates"):
+    """更新所有理解度追踪图表的配置"""
+
+    configs = load_chart_configs()
+    for page, page_configs in configs.items():
+        file_path = os.path.join(template_dir, page)
+        if not os.path.exists(file_path):
+            print(f"错误：文件 {file_path} 不存在")
+            return False
+
+        changes, _ = transform_file(file_path, [ChartConfigRule()])
+        print(f"{'✅ 已更新' if changes else '✅ 已是最新'} {file_path}")
+
+        # 验证更新结果
+        print("📊 更新后的配置：")
+        for func_name, config in page_configs.items():
+            print(f"  {func_name}: {config.get('data_length', len(config['labels']))}个步骤")
+
     return True
 
 if __name__ == "__main__":
     print("🔄 开始更新理解度追踪图表配置...")
     success = update_chart_configurations()
-    
+
     if success:
         print("\n✨ 更新完成！现在每个图表的步骤数量都与对应卡片的实际步骤数量一致了。")
     else:
-        print("\n❌ 更新失败，请检查错误信息。")
\ No newline at end of file
+        print("\n❌ 更新失败，请检查错误信息。")
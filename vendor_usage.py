@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+第三方库使用情况：每个页面实际用到了哪些库和哪些 FontAwesome 图标
+
+static/libs 中的库 (及页面通过 CDN 引入的副本) 都是整包加载的。对每个页面：
+  - 引入：<script src> / <link href> 按 LIBRARIES 中的 URL 模式识别 (本地或 CDN)
+  - 使用：在页面内联脚本、页面引入的本地脚本 (static/js) 和页面正文中查找各库的全局调用
+    (THREE.、new Chart(、gsap.、marked(、renderMathInElement、MathJax、$$ / \\( 数学定界符 …)
+  - 图标：正文、脚本和内联的导航栏 / 页脚中的 fa-* 类名；模板字符串 fa-${a ? "x" : "y"}
+    中的候选值也计入
+据此给出每个页面的最小引入列表、可以去掉的库和节省的字节数 (CDN 引入按同名本地副本的大小估算，
+没有本地副本的记为未知)。
+
+图标子集：解析 font-awesome.min.css，只保留用到的图标规则，并用 fontTools (可选依赖) 把
+solid / regular / brands 字体裁剪为只含这些码位的子集，输出到 --out 目录：
+    <out>/includes.json                         每个页面的最小引入列表
+    <out>/fontawesome/fontawesome.subset.css
+    <out>/fontawesome/webfonts/fa-*.woff2       (未安装 brotli 时为 .woff)
+
+用法:
+    python vendor_usage.py                       # 打印报告
+    python vendor_usage.py --out dist/vendor     # 同时生成引入列表和图标子集
+"""
+
+import argparse
+import glob
+import json
+import os
+import posixpath
+import re
+from collections import namedtuple
+
+from fingerprint_assets import resolve_ref
+from js_functions import iter_inline_scripts
+
+try:
+    from fontTools import subset as ft_subset
+    from fontTools.ttLib import TTFont
+except ImportError:  # 可选依赖
+    ft_subset = None
+
+try:
+    import brotli  # noqa: F401  fontTools 写 woff2 需要
+    FONT_FLAVOR = 'woff2'
+except ImportError:
+    FONT_FLAVOR = 'woff'
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = 'templates'
+PARTIALS = {'include-navbar.js': 'templates/partials/navbar.html',
+            'include-footer.js': 'templates/partials/footer.html'}
+FA_CSS = 'static/libs/fontawesome/font-awesome.min.css'
+FA_FONTS = {'solid': 'static/libs/fontawesome/webfonts/fa-solid-900',
+            'regular': 'static/libs/fontawesome/webfonts/fa-regular-400',
+            'brands': 'static/libs/fontawesome/webfonts/fa-brands-400'}
+
+# local: 本地副本 (可为多个文件)；url: 识别引入的模式；usage: 识别使用的模式
+Library = namedtuple('Library', ['local', 'url', 'usage'])
+
+LIBRARIES = {
+    'three': Library(('static/libs/three/three.min.js',),
+                     r'three(?:\.min)?\.js', r'\bTHREE\.'),
+    'chart': Library(('static/libs/chart/chart.umd.min.js',),
+                     r'chart\.umd(?:\.min)?\.js|/chart\.js@', r'\bnew\s+Chart\s*\(|\bChart\.(?:register|defaults)'),
+    'chart-annotation': Library(('static/libs/chart/chartjs-plugin-annotation.min.js',),
+                                r'chartjs-plugin-annotation', r'\bannotation\s*:\s*\{'),
+    'gsap': Library(('static/libs/gsap/gsap.min.js',),
+                    r'gsap(?:\.min)?\.js', r'\bgsap\.|\b(?:TweenMax|TimelineMax)\b'),
+    'marked': Library(('static/libs/marked/marked.min.js',),
+                      r'marked(?:\.min)?\.js', r'\bmarked(?:\.parse)?\s*\('),
+    'katex': Library(('static/libs/katex/js/katex.min.js', 'static/libs/katex/css/katex.min.css'),
+                     r'katex(?:\.min)?\.(?:js|css)', r'\bkatex\.render|renderMathInElement'),
+    'katex-auto-render': Library(('static/libs/katex/js/auto-render.min.js',),
+                                 r'auto-render(?:\.min)?\.js', r'renderMathInElement'),
+    'mathjax': Library(('static/libs/mathjax/tex-mml-chtml.js',),
+                       r'mathjax|tex-mml-chtml', r'\bMathJax\.(?:typeset|tex2|startup)'),
+    'fontawesome': Library((FA_CSS,),
+                           r'font-?awesome', None),
+    'd3': Library((), r'd3js\.org|/d3(?:-[\w-]+)?(?:\.v\d+)?(?:\.min)?\.js', r'\bd3\.'),
+    'plotly': Library((), r'plotly(?:\.min)?\.js', r'\bPlotly\.'),
+    'jstat': Library((), r'jstat(?:\.min)?\.js', r'\bjStat\b'),
+    'ml-matrix': Library((), r'ml-matrix', r'\bmlMatrix\b|\bML\.Matrix\b'),
+    'fast-check': Library((), r'fast-check', r'\bfc\.(?:assert|property)'),
+}
+
+# 页面正文中出现这些定界符时，自动渲染 (KaTeX auto-render / MathJax) 才有事可做
+_MATH_RE = re.compile(r'\$\$|\\\(|\\\[')
+_INCLUDE_RE = re.compile(r'<(script|link)\b([^>]*)>', re.I)
+_SRC_RE = re.compile(r'''\b(src|href)\s*=\s*(["'])([^"']+)\2''', re.I)
+_ICON_RE = re.compile(r'\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)\b')
+_STYLE_RES = {'brands': re.compile(r'\b(?:fab|fa-brands)\b'), 'regular': re.compile(r'\b(?:far|fa-regular)\b')}
+_DYNAMIC_ICON_RE = re.compile(r'fa-\$\{([^}]*)\}')
+_QUOTED_RE = re.compile(r'''["']([a-z0-9-]+)["']''')
+_CONTENT_RE = re.compile(r'''content\s*:\s*["']\\([0-9a-fA-F]+)["']''')
+_ICON_SELECTOR_RE = re.compile(r'^\.fa-([\w-]+)::?before$')
+_FONT_URL_RE = re.compile(r'url\(\s*["\']?[^)"\']*/(fa-[\w-]+)\.(?:woff2|woff|ttf|eot|svg)[^)]*\)')
+
+
+def _read(rel):
+    with open(os.path.join(ROOT, rel), 'rb') as f:
+        return f.read().decode('utf-8', errors='replace')
+
+
+def _size(rel):
+    path = os.path.join(ROOT, rel)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def page_includes(html, page_rel):
+    """页面中的 <script src> / <link href>，返回 [(原始引用, 仓库内路径或 None)]"""
+    includes = []
+    for m in _INCLUDE_RE.finditer(html):
+        src = _SRC_RE.search(m.group(2))
+        if src and (m.group(1).lower() == 'script' or 'stylesheet' in m.group(2).lower()):
+            includes.append((src.group(3), resolve_ref(src.group(3), page_rel)))
+    return includes
+
+
+def identify_library(ref):
+    for name, lib in LIBRARIES.items():
+        if re.search(lib.url, ref, re.I):
+            return name
+    return None
+
+
+def used_icons(text):
+    icons = set(_ICON_RE.findall(text))
+    for m in _DYNAMIC_ICON_RE.finditer(text):
+        icons.update(_QUOTED_RE.findall(m.group(1)))
+    return icons
+
+
+def analyze_page(page_rel):
+    """返回页面的库引入 / 使用情况和图标集合"""
+    html = _read(page_rel)
+    includes = page_includes(html, page_rel)
+
+    # 页面可见的全部代码：内联脚本 + 引入的本地脚本 (不含第三方库本身)
+    inline_text = '\n'.join(html[start:end] for start, end in iter_inline_scripts(html))
+    code = [inline_text]
+    markup = [html]
+    for ref, rel in includes:
+        if rel and rel.startswith('static/js/') and os.path.isfile(os.path.join(ROOT, rel)):
+            code.append(_read(rel))
+        for script, partial in PARTIALS.items():
+            if ref.split('?')[0].endswith(script):
+                markup.append(_read(partial))
+    code_text = '\n'.join(code)
+    all_text = '\n'.join(markup + code)
+
+    included = {}
+    for ref, rel in includes:
+        name = identify_library(ref)
+        if name:
+            included.setdefault(name, []).append(ref)
+
+    icons = used_icons(all_text)
+    styles = {'solid'} | {style for style, pattern in _STYLE_RES.items() if pattern.search(all_text)}
+    used = set()
+    # 共享脚本 (toolbox.js 等) 对可选库先检测再调用，只有页面自己的内联脚本用到却没引入才算缺失
+    inline_used = set()
+    for name, lib in LIBRARIES.items():
+        if name == 'fontawesome':
+            if icons:
+                used.add(name)
+        elif lib.usage and re.search(lib.usage, code_text):
+            used.add(name)
+            if re.search(lib.usage, inline_text):
+                inline_used.add(name)
+    if _MATH_RE.search(html):
+        # 自动渲染只需要其中一个；优先保留页面已经引入的那个
+        if 'katex-auto-render' in included:
+            used.update(('katex', 'katex-auto-render'))
+        elif 'mathjax' in included:
+            used.add('mathjax')
+    if 'katex-auto-render' in used:
+        used.add('katex')
+    return {'included': included, 'used': used, 'inline_used': inline_used, 'icons': icons, 'styles': styles}
+
+
+def library_bytes(name, refs=None):
+    """库的本地副本字节数，没有本地副本返回 None
+
+    给出 refs 时只计页面实际引入的文件 (按文件名对应到 local 中的条目)，
+    对应不上的引入 (如 CDN 的 chart.js@4) 按整个库估算。
+    """
+    local = LIBRARIES[name].local
+    if not local:
+        return None
+    files = set(local) if refs is None else set()
+    for ref in refs or ():
+        filename = posixpath.basename(ref.split('?')[0].split('#')[0])
+        files.update([rel for rel in local if posixpath.basename(rel) == filename] or local)
+    return sum(_size(rel) for rel in files)
+
+
+# ---- FontAwesome 子集 ----
+
+def split_css_blocks(css):
+    """按顶层花括号拆分 CSS，返回 [(前导, 花括号内的内容)]；块之间的空白归入前导"""
+    blocks = []
+    depth = 0
+    start = 0
+    body_start = None
+    i = 0
+    while i < len(css):
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end < 0 else end + 2
+            continue
+        c = css[i]
+        if c in '"\'':
+            end = i + 1
+            while end < len(css) and css[end] != c:
+                end += 2 if css[end] == '\\' else 1
+            i = end + 1
+            continue
+        if c == '{':
+            if depth == 0:
+                body_start = i + 1
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((css[start:body_start - 1], css[body_start:i]))
+                start = i + 1
+        i += 1
+    return blocks
+
+
+def icon_codepoints(css):
+    """图标名 -> 码位"""
+    codepoints = {}
+    for prelude, body in split_css_blocks(css):
+        content = _CONTENT_RE.findall(body)
+        if not content:
+            continue
+        for selector in prelude.split(','):
+            m = _ICON_SELECTOR_RE.match(selector.strip())
+            if m:
+                codepoints[m.group(1)] = int(content[-1], 16)
+    return codepoints
+
+
+def subset_css(css, icons, fonts):
+    """只保留用到的图标规则；@font-face 改指向子集字体，没有子集的字体整块去掉"""
+    out = []
+    for prelude, body in split_css_blocks(css):
+        selectors = [s.strip() for s in prelude.split(',')]
+        icon_matches = [_ICON_SELECTOR_RE.match(s) for s in selectors]
+        if _CONTENT_RE.search(body) and all(icon_matches):
+            kept = [s for s, m in zip(selectors, icon_matches) if m.group(1) in icons]
+            if kept:
+                out.append(f"{','.join(kept)}{{{body.strip()}}}")
+            continue
+        if prelude.strip().startswith('@font-face'):
+            names = set(_FONT_URL_RE.findall(body))
+            name = next(iter(names), None)
+            if name not in fonts:
+                continue
+            src = f'url(webfonts/{fonts[name]}) format("{FONT_FLAVOR}")'
+            body = re.sub(r'src\s*:[^;]*;?', f'src: {src};', body)
+        out.append(f"{prelude.strip()}{{{body.strip()}}}")
+    return '\n'.join(out) + '\n'
+
+
+def subset_fonts(codepoints, out_dir):
+    """把各字体裁剪为只含 codepoints 的子集，返回 {字体名: 输出文件名}"""
+    written = {}
+    if ft_subset is None:
+        return written
+    os.makedirs(out_dir, exist_ok=True)
+    for style, base in FA_FONTS.items():
+        source = os.path.join(ROOT, base + '.ttf')
+        if not os.path.exists(source):
+            continue
+        font = TTFont(source)
+        present = set(font.getBestCmap()) & set(codepoints)
+        if not present:
+            continue
+        options = ft_subset.Options()
+        options.flavor = FONT_FLAVOR
+        options.drop_tables += ['FFTM']
+        subsetter = ft_subset.Subsetter(options)
+        subsetter.populate(unicodes=sorted(present))
+        subsetter.subset(font)
+        name = os.path.basename(base)
+        filename = f"{name}.{FONT_FLAVOR}"
+        font.flavor = FONT_FLAVOR
+        font.save(os.path.join(out_dir, filename))
+        written[name] = filename
+    return written
+
+
+def build_fontawesome_subset(icons, out_dir):
+    """生成子集 CSS 和字体，返回 (子集总字节数, 图标数)；未安装 fontTools 返回 None"""
+    if ft_subset is None:
+        return None
+    css = _read(FA_CSS)
+    known = icon_codepoints(css)
+    used = {icon for icon in icons if icon in known}
+    fa_dir = os.path.join(out_dir, 'fontawesome')
+    fonts = subset_fonts({known[icon] for icon in used}, os.path.join(fa_dir, 'webfonts'))
+    subset = subset_css(css, used, fonts)
+    with open(os.path.join(fa_dir, 'fontawesome.subset.css'), 'w', encoding='utf-8') as f:
+        f.write(subset)
+    total = len(subset.encode('utf-8')) + sum(
+        os.path.getsize(os.path.join(fa_dir, 'webfonts', filename)) for filename in fonts.values())
+    return total, len(used)
+
+
+def fontawesome_full_bytes(styles):
+    """整包 FontAwesome 的代价：CSS + 页面用到的样式对应的 woff2"""
+    return _size(FA_CSS) + sum(_size(FA_FONTS[style] + '.woff2') for style in styles)
+
+
+def analyze_site(pages):
+    results = {}
+    for page in pages:
+        try:
+            results[page] = analyze_page(page)
+        except UnicodeDecodeError:
+            continue
+    return results
+
+
+def minimal_includes(info):
+    """页面应保留的引入 (沿用页面原有的写法) 和可以去掉的库"""
+    keep = [ref for name, refs in info['included'].items() if name in info['used'] for ref in refs]
+    drop = sorted(name for name in info['included'] if name not in info['used'])
+    missing = sorted(name for name in info['inline_used'] if name not in info['included'])
+    return keep, drop, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-page vendor library and icon usage")
+    parser.add_argument('patterns', nargs='*', default=[f'{TEMPLATE_DIR}/*.html'])
+    parser.add_argument('--out', type=str, help="输出引入列表和 FontAwesome 子集的目录")
+    args = parser.parse_args()
+
+    pages = sorted({os.path.relpath(p, ROOT).replace(os.sep, '/')
+                    for pattern in args.patterns for p in glob.glob(os.path.join(ROOT, pattern))})
+    results = analyze_site(pages)
+    all_icons = set().union(*(info['icons'] for info in results.values())) if results else set()
+
+    subset_bytes = None
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        built = build_fontawesome_subset(all_icons, args.out)
+        if built is None:
+            print("ℹ️  未安装 fontTools，跳过图标子集 (pip install fonttools brotli)")
+        else:
+            subset_bytes, icon_count = built
+            print(f"🔤 FontAwesome 子集: {icon_count} 个图标，{subset_bytes:,} 字节 → {args.out}/fontawesome/")
+
+    report = {}
+    total_saved = 0
+    for page, info in results.items():
+        keep, drop, missing = minimal_includes(info)
+        saved = 0
+        unknown = []
+        for name in drop:
+            size = library_bytes(name, info['included'][name])
+            if size is None:
+                unknown.append(name)
+            else:
+                saved += size
+        icon_saved = 0
+        if 'fontawesome' in info['included'] and 'fontawesome' in info['used'] and subset_bytes is not None:
+            icon_saved = max(0, fontawesome_full_bytes(info['styles']) - subset_bytes)
+        total_saved += saved + icon_saved
+        report[page] = {'include': keep, 'drop': drop, 'missing': missing,
+                        'icons': sorted(info['icons']), 'saved_bytes': saved,
+                        'fontawesome_saved_bytes': icon_saved, 'unknown_size': unknown}
+
+        print(f"\n📄 {page}")
+        for name in sorted(info['included']):
+            mark = '✅' if name in info['used'] else '❌'
+            size = library_bytes(name, info['included'][name])
+            print(f"  {mark} {name:<18} {'?' if size is None else f'{size:,}':>10}  {info['included'][name][0]}")
+        for name in missing:
+            print(f"  ⚠️  {name:<18} 内联脚本使用了但页面没有引入")
+        line = f"  可节省 {saved:,} 字节"
+        if unknown:
+            line += f" (另有 CDN 库 {', '.join(unknown)} 大小未知)"
+        if icon_saved:
+            line += f"，图标子集再省 {icon_saved:,} 字节 ({len(info['icons'])} 个 fa-* 类名)"
+        print(line)
+
+    print(f"\n合计 {len(report)} 个页面，可节省约 {total_saved:,} 字节")
+    if args.out:
+        path = os.path.join(args.out, 'includes.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✅ 引入列表已写入 {path}")
+
+
+if __name__ == "__main__":
+    main()